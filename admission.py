@@ -0,0 +1,298 @@
+import math
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import weakref
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+
+from config import settings
+from monitoring import monitor
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_SIGNAL = 0
+PRIORITY_NEWS = 1
+
+class AdmissionRejected(Exception):
+    """Work turned away because a limiter is saturated"""
+
+    def __init__(self, limiter: str, reason: str, retry_after: int):
+        super().__init__(f"Overloaded: {limiter} limit reached ({reason}), retry after {retry_after}s")
+        self.limiter = limiter
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        """429 when the wait queue is full, 503 when queued work waited too long"""
+        return 429 if self.reason in ('queue_full', 'displaced') else 503
+
+class _Work:
+    """Priority of a unit of admitted work, and how long it may wait for a resource slot"""
+
+    __slots__ = ('priority', 'timeout', 'waits')
+
+    def __init__(self, priority: int, timeout: Optional[float]):
+        self.priority = priority
+        self.timeout = timeout
+        # (limiter, waiter entry) of the slots this work is queued for
+        self.waits: List[Tuple['PriorityLimiter', List[Any]]] = []
+
+class PriorityLimiter:
+    """Concurrency limit whose waiters are served by priority, then arrival.
+
+    Bounded waits give up after a timeout, and when the wait queue is full a
+    new waiter displaces the newest waiter of lower priority or is rejected.
+    Unbounded waits (background work that has nowhere to be rejected to) are
+    neither timed out nor counted against the queue size. A queued waiter can
+    be promoted to a higher priority or an unbounded wait while it waits.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        # Heap of [priority, sequence, future, bounded], mutable so a waiter can be promoted in place
+        self._waiters: List[List[Any]] = []
+        self._bounded_waiters = 0
+        self._sequence = itertools.count()
+        # Smoothed time a slot is held, behind the Retry-After estimate
+        self._hold_time = 1.0
+        self._wait_latency = monitor.histogram('admission_wait', name)
+
+        self._admitted = 0
+        self._queued = 0
+        self._rejected: Dict[str, int] = {}
+        self._wait_max = 0.0
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog is expected to drain"""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._hold_time * backlog / self.limit))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        return AdmissionRejected(self.name, reason, self.retry_after())
+
+    def _remove(self, entry: List[Any]) -> None:
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            if entry[3]:
+                self._bounded_waiters -= 1
+
+    def promote(self, entry: List[Any], priority: int, bounded: bool) -> None:
+        """Move a queued waiter up to a higher priority, or lift its timeout"""
+        if entry not in self._waiters:
+            return
+        if entry[3] and not bounded:
+            entry[3] = False
+            self._bounded_waiters -= 1
+        if priority < entry[0]:
+            entry[0] = priority
+            heapq.heapify(self._waiters)
+
+    async def acquire(self, priority: int, timeout: Optional[float], work: Optional[_Work] = None) -> None:
+        """Take a slot, waiting up to timeout seconds (forever if None); raises AdmissionRejected.
+
+        When waiting on behalf of work, its timeout is followed as it changes
+        and the work can promote the waiter while it is queued.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._admitted += 1
+            self._wait_latency.observe(0.0)
+            return
+
+        bounded = timeout is not None
+        if bounded and self._bounded_waiters >= self.max_queue:
+            displaced = max((entry for entry in self._waiters if entry[3]), default=None)
+            if displaced is None or displaced[0] <= priority:
+                raise self._reject('queue_full')
+            # Make room by turning away the newest waiter of lower priority
+            self._remove(displaced)
+            displaced[2].set_exception(self._reject('displaced'))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future, bounded]
+        heapq.heappush(self._waiters, entry)
+        if bounded:
+            self._bounded_waiters += 1
+        self._queued += 1
+        if work is not None:
+            work.waits.append((self, entry))
+
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"admission.{self.name}", priority=priority):
+                while not future.done():
+                    if work is not None:
+                        timeout = work.timeout
+                    remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+                    if remaining is not None and remaining <= 0:
+                        self._remove(entry)
+                        raise self._reject('timeout')
+                    # Does not cancel the future, so a slot handed over as the wait ends is kept
+                    await asyncio.wait((future,), timeout=remaining)
+                # Raises AdmissionRejected when displaced by a waiter of higher priority
+                future.result()
+        except asyncio.CancelledError:
+            self._remove(entry)
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            raise
+        finally:
+            if work is not None:
+                work.waits = [wait for wait in work.waits if wait[1] is not entry]
+            waited = time.perf_counter() - start
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_latency.observe(waited)
+
+        self._admitted += 1
+
+    def release(self, held: Optional[float] = None) -> None:
+        """Hand the slot to the next waiter, or free it"""
+        if held is not None:
+            self._hold_time = 0.9 * self._hold_time + 0.1 * held
+        while self._waiters:
+            entry = heapq.heappop(self._waiters)
+            if entry[3]:
+                self._bounded_waiters -= 1
+            if not entry[2].done():
+                entry[2].set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int, timeout: Optional[float]) -> AsyncIterator[None]:
+        """Hold a slot for the block"""
+        await self.acquire(priority, timeout)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get occupancy and admission counters"""
+        return {
+            'limit': self.limit,
+            'active': self.active,
+            'waiting': len(self._waiters),
+            'admitted': self._admitted,
+            'queued': self._queued,
+            'rejected': dict(self._rejected),
+            'wait_max_ms': round(self._wait_max * 1000, 1),
+            'avg_hold_ms': round(self._hold_time * 1000, 1)
+        }
+
+# Admitted work running in this context; tasks inherit it when they are created
+_admission: ContextVar[Optional[_Work]] = ContextVar('admission', default=None)
+
+def _current_work() -> _Work:
+    """The admitted work of this context; code outside admit() waits like a background signal"""
+    return _admission.get() or _Work(PRIORITY_SIGNAL, None)
+
+class AdmissionController:
+    """Global concurrency cap plus per-resource-class caps with priorities.
+
+    ``admit()`` wraps a unit of work (a signal pipeline or a /get-news
+    request) and records its priority in a context variable, so the
+    ``slot()`` calls made deeper down for browser pages, AI calls and
+    Telegram sends are ordered by the priority of the work they serve.
+    Work admitted with a bounded wait is rejected quickly under overload;
+    background work (queued, resumed or replayed signals) waits instead.
+    Signals wait for resource slots within their stage timeouts, while
+    lower-priority work gives up after the queue timeout. Single-flight work
+    shared by several callers runs at the highest priority among them.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT,
+        class_limits: Optional[Dict[str, int]] = None
+    ):
+        self.queue_timeout = queue_timeout
+        self.limiter = PriorityLimiter('global', max_concurrency, max_queue)
+        if class_limits is None:
+            class_limits = {
+                'browser': settings.BROWSER_POOL_MAX_CONCURRENCY,
+                'ai': settings.ADMISSION_AI_CONCURRENCY,
+                'telegram': settings.ADMISSION_TELEGRAM_CONCURRENCY
+            }
+        self.classes = {
+            name: PriorityLimiter(name, limit, max_queue)
+            for name, limit in class_limits.items()
+        }
+        # Shared task -> the work it runs as, raised by callers joining it
+        self._shared: 'weakref.WeakKeyDictionary[asyncio.Future, _Work]' = weakref.WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def admit(self, priority: int, bounded: bool = True) -> AsyncIterator[None]:
+        """Run a unit of work under the global cap; raises AdmissionRejected when overloaded"""
+        token = _admission.set(_Work(priority, self.queue_timeout if priority > PRIORITY_SIGNAL else None))
+        try:
+            async with self.limiter.slot(priority, self.queue_timeout if bounded else None):
+                yield
+        finally:
+            _admission.reset(token)
+
+    @asynccontextmanager
+    async def slot(self, resource: str) -> AsyncIterator[None]:
+        """Hold a slot of a resource class at the priority of the current work"""
+        work = _current_work()
+        limiter = self.classes[resource]
+        await limiter.acquire(work.priority, work.timeout, work)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            limiter.release(time.perf_counter() - start)
+
+    def start_shared(self, work: Awaitable[Any]) -> asyncio.Future:
+        """Start single-flight work on behalf of the current caller; see join_shared()"""
+        current = _current_work()
+        shared = _Work(current.priority, current.timeout)
+        token = _admission.set(shared)
+        try:
+            task = asyncio.ensure_future(work)
+        finally:
+            _admission.reset(token)
+        self._shared[task] = shared
+        return task
+
+    def join_shared(self, task: asyncio.Future) -> None:
+        """Raise shared work to the current caller's priority and slot timeout, if higher"""
+        shared = self._shared.get(task)
+        if shared is None:
+            return
+        current = _current_work()
+        if current.priority < shared.priority:
+            shared.priority = current.priority
+        if current.timeout is None:
+            shared.timeout = None
+        elif shared.timeout is not None:
+            shared.timeout = max(shared.timeout, current.timeout)
+        # Waits already queued move up to the new priority now, not when they are next queued
+        for limiter, entry in shared.waits:
+            limiter.promote(entry, shared.priority, shared.timeout is not None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the global and per-class limiter stats"""
+        return {
+            'global': self.limiter.get_stats(),
+            **{name: limiter.get_stats() for name, limiter in self.classes.items()}
+        }
+
+# Create singleton instance
+admission_control = AdmissionController()
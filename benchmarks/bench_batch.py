@@ -0,0 +1,119 @@
+"""Compare the batch webhook with individual /trading-signal calls.
+
+Downstream services are simulated in-process with a fixed latency, so the
+benchmark measures wall time and how many downstream calls each mode makes.
+
+    python -m benchmarks.bench_batch --signals 40 --instruments 4 --latency-ms 50
+"""
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List
+
+import httpx
+
+import main
+from coalescer import news_coalescer, chart_coalescer
+from chart_cache import chart_cache
+from telegram_delivery import TokenBucket
+
+TIMEFRAMES = ["15", "60"]
+
+class FakeDownstream:
+    """Mock transport answering every downstream service after a delay"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        path = request.url.path
+        self.calls[path] = self.calls.get(path, 0) + 1
+        if path == "/chart":
+            return httpx.Response(200, content=b"\x89PNG" + b"\x00" * 20000)
+        if path == "/match-subscribers":
+            return httpx.Response(200, json={"chat_ids": ["1", "2", "3"]})
+        if path == "/analyze-news":
+            return httpx.Response(200, json={"sentiment": "neutral"})
+        if path == "/analyze-signal":
+            return httpx.Response(200, json={"verdict": "ok", "risk_reward_ratio": 2.0})
+        if path == "/format-signal":
+            return httpx.Response(200, json={"formatted_message": "signal"})
+        if path == "/upload-chart":
+            return httpx.Response(200, json={"chart_id": "chart"})
+        return httpx.Response(200, json={})
+
+def make_signals(count: int, instruments: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "instrument": f"PAIR{index % instruments}",
+            "action": "BUY",
+            "price": 1.0 + index / 10000,
+            "stoploss": 0.99,
+            "takeprofit": 1.02,
+            "timeframe": TIMEFRAMES[index % len(TIMEFRAMES)]
+        }
+        for index in range(count)
+    ]
+
+def reset() -> None:
+    """Forget cached and coalesced enrichment so every mode starts cold"""
+    main.news_cache.invalidate()
+    news_coalescer._batches.clear()
+    news_coalescer._sizes.clear()
+    chart_coalescer._batches.clear()
+    chart_coalescer._sizes.clear()
+    chart_cache._entries.clear()
+    main.idempotency_store._entries.clear()
+
+async def run_mode(name: str, signals: List[Dict[str, Any]], downstream: FakeDownstream, concurrency: int) -> None:
+    reset()
+    downstream.calls.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        if name == "batch":
+            response = await client.post("/trading-signals/batch", json=signals)
+            response.raise_for_status()
+        else:
+            semaphore = asyncio.Semaphore(concurrency if name == "individual (concurrent)" else 1)
+
+            async def send(signal: Dict[str, Any]) -> None:
+                async with semaphore:
+                    (await client.post("/trading-signal", json=signal)).raise_for_status()
+
+            await asyncio.gather(*(send(signal) for signal in signals))
+        elapsed = time.perf_counter() - start
+
+    calls = sum(downstream.calls.values())
+    print(f"  {name:<26} {elapsed * 1000:9.0f} ms  {len(signals) / elapsed:7.1f} signals/s  {calls:5d} downstream calls")
+
+async def run(signals: int, instruments: int, latency_ms: float, concurrency: int) -> None:
+    main.settings.SUPABASE_KEY = main.settings.SUPABASE_KEY or "bench"
+    main.settings.BATCH_CONCURRENCY = concurrency
+    # Telegram's broadcast limit would dominate both modes equally
+    main.telegram_delivery.bucket = TokenBucket(rate=1e6, capacity=1e6)
+
+    async def fake_news(instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        await asyncio.sleep(latency_ms / 1000)
+        return [{"title": f"{instrument} news", "content": "content"}]
+
+    main.news_cache.fetcher = fake_news
+    downstream = FakeDownstream(latency_ms / 1000)
+    await main.service_clients.initialize(httpx.MockTransport(downstream.handle))
+
+    payload = make_signals(signals, instruments)
+    print(f"{signals} signals over {instruments} instruments, {latency_ms:.0f} ms downstream latency, concurrency {concurrency}")
+    for name in ("individual (sequential)", "individual (concurrent)", "batch"):
+        await run_mode(name, payload, downstream, concurrency)
+
+    await main.service_clients.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=40)
+    parser.add_argument("--instruments", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.signals, args.instruments, args.latency_ms, args.concurrency))
@@ -0,0 +1,38 @@
+"""Measure the per-observation overhead of ServiceMonitor latency recording.
+
+    python -m benchmarks.bench_monitoring --iterations 1000000
+"""
+import time
+import argparse
+
+from monitoring import LatencyHistogram, monitor
+
+def per_call_ns(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+def main(iterations: int) -> None:
+    histogram = LatencyHistogram()
+    baseline = per_call_ns(lambda: None, iterations)
+
+    def timed_block() -> None:
+        with monitor.timer('bench', 'timer'):
+            pass
+
+    results = {
+        'LatencyHistogram.observe': per_call_ns(lambda: histogram.observe(0.042), iterations),
+        'ServiceMonitor.observe': per_call_ns(lambda: monitor.observe('bench', 'observe', 0.042), iterations),
+        'ServiceMonitor.timer': per_call_ns(timed_block, iterations)
+    }
+
+    print(f"{iterations} iterations (loop overhead {baseline:.0f} ns subtracted)")
+    for name, ns in results.items():
+        print(f"  {name:<26} {ns - baseline:8.0f} ns")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000000)
+    args = parser.parse_args()
+    main(args.iterations)
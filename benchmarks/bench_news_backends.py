@@ -0,0 +1,101 @@
+"""Compare latency and memory of the HTTP and Playwright news scraper backends.
+
+A local server replays the recorded TradingView pages in benchmarks/fixtures,
+optionally with added latency, and both backends scrape it.
+
+    python -m benchmarks.bench_news_backends --runs 20 --articles 3 --latency-ms 50
+"""
+import time
+import asyncio
+import argparse
+import tracemalloc
+from typing import Callable, Awaitable, List, Dict
+
+import psutil
+
+from config import settings
+from scrape_profile import scrape_profile
+from browser_pool import browser_pool
+from http_scraper import HttpNewsScraper
+from news_scraper import PlaywrightNewsBackend
+from benchmarks.fake_services import LatencyProfile
+from benchmarks.fixture_server import FixtureServer
+
+def rss_mb() -> float:
+    """Resident memory of this process and its children (the browser) in MB"""
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 1024 / 1024
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def measure(get_news: Callable[[str, int], Awaitable[list]], runs: int, articles: int) -> Dict[str, float]:
+    """Scrape the fixtures repeatedly and return latency and memory figures"""
+    rss_before = rss_mb()
+    tracemalloc.start()
+    latencies = []
+    found = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        found = len(await get_news('EURUSD', articles))
+        latencies.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'articles': found,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'python_peak_mb': peak / 1024 / 1024,
+        'rss_growth_mb': rss_mb() - rss_before
+    }
+
+async def main(runs: int, articles: int, latency_ms: float, backends: List[str]) -> None:
+    server = FixtureServer(LatencyProfile(latency_ms, latency_ms))
+    settings.TRADINGVIEW_BASE_URL = await server.start()
+    # The fixture server is not on the scraping allow list
+    scrape_profile.allowed_domains = []
+
+    print(f"{runs} runs, {articles} articles, {latency_ms:.0f} ms server latency")
+    try:
+        if 'http' in backends:
+            http = HttpNewsScraper(settings.TRADINGVIEW_BASE_URL)
+            result = await measure(http.get_news, runs, articles)
+            await http.close()
+            print_result('http', result)
+
+        if 'playwright' in backends:
+            try:
+                start = time.perf_counter()
+                await browser_pool.initialize()
+                print(f"  browser launch {(time.perf_counter() - start) * 1000:.0f} ms")
+                result = await measure(PlaywrightNewsBackend().get_news, runs, articles)
+                print_result('playwright', result)
+            except Exception as e:
+                print(f"  playwright skipped: {str(e).splitlines()[0]}")
+            finally:
+                await browser_pool.cleanup()
+    finally:
+        await server.stop()
+
+def print_result(name: str, result: Dict[str, float]) -> None:
+    print(
+        f"  {name:<11} {result['articles']:3d} articles  p50 {result['p50_ms']:8.1f} ms  "
+        f"p95 {result['p95_ms']:8.1f} ms  python peak {result['python_peak_mb']:6.1f} MB  "
+        f"RSS growth {result['rss_growth_mb']:7.1f} MB"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--articles", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--backends", default="http,playwright")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.articles, args.latency_ms, args.backends.split(',')))
@@ -0,0 +1,209 @@
+"""Benchmark the news scraper backends offline across concurrency levels.
+
+A local server replays the recorded TradingView pages in benchmarks/fixtures
+with injectable latency (P50:P99 in ms). For each backend the run reports the
+cold start (launch plus first scrape), then for 1..N instruments scraped at
+once: wall time per round, per-article latency, peak RSS of the browser
+processes and of this process, and the bytes served.
+
+    python -m benchmarks.bench_scraper --concurrency 1,2,4,8 --rounds 3 --latency 50:200
+    python -m benchmarks.bench_scraper --backends http --articles 5
+"""
+import time
+import asyncio
+import logging
+import argparse
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import psutil
+
+from config import settings
+from scrape_profile import scrape_profile
+from browser_pool import browser_pool
+from http_scraper import HttpNewsScraper
+from news_scraper import NewsScraper
+from benchmarks.fake_services import LatencyProfile
+from benchmarks.fixture_server import FixtureServer
+
+GetNews = Callable[[str, int], Awaitable[List[Dict[str, str]]]]
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+class RssSampler:
+    """Samples the RSS of this process and of its children (the browser) in the background"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_browser = 0
+        self.peak_process = 0
+        self._task = None
+
+    def sample(self) -> None:
+        process = psutil.Process()
+        self.peak_process = max(self.peak_process, process.memory_info().rss)
+        browser = 0
+        for child in process.children(recursive=True):
+            try:
+                browser += child.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_browser = max(self.peak_browser, browser)
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak_browser = 0
+        self.peak_process = 0
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> Tuple[float, float]:
+        """Stop sampling and return the peak browser and process RSS in MB"""
+        self.sample()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return self.peak_browser / 1024 / 1024, self.peak_process / 1024 / 1024
+
+def timed(fetch_article: Callable[..., Awaitable[Any]], latencies: List[float]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a backend's fetch_article to record the latency of every article"""
+    async def wrapper(*args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await fetch_article(*args)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+class HttpBench:
+    name = 'http'
+
+    def __init__(self, base_url: str, latencies: List[float]):
+        self.scraper = HttpNewsScraper(base_url)
+        self.scraper.fetch_article = timed(self.scraper.fetch_article, latencies)
+
+    async def launch(self) -> None:
+        self.scraper.start()
+
+    async def get_news(self, instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        return await self.scraper.get_news(instrument, max_articles)
+
+    async def close(self) -> None:
+        await self.scraper.close()
+
+class PlaywrightBench:
+    name = 'playwright'
+
+    def __init__(self, base_url: str, latencies: List[float]):
+        self.latencies = latencies
+
+    async def launch(self) -> None:
+        await browser_pool.initialize()
+
+    async def get_news(self, instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        # One scraper per scrape, as PlaywrightNewsBackend does, since it holds the current page
+        scraper = NewsScraper()
+        scraper.fetch_article = timed(scraper.fetch_article, self.latencies)
+        return await scraper.get_news(instrument, max_articles)
+
+    async def close(self) -> None:
+        await browser_pool.cleanup()
+
+BENCHES = {'http': HttpBench, 'playwright': PlaywrightBench}
+
+async def bench_backend(
+    name: str,
+    server: FixtureServer,
+    levels: List[int],
+    rounds: int,
+    articles: int
+) -> None:
+    latencies: List[float] = []
+    bench = BENCHES[name](server.url, latencies)
+    sampler = RssSampler()
+
+    start = time.perf_counter()
+    try:
+        await bench.launch()
+        launched = time.perf_counter() - start
+        found = len(await bench.get_news('COLD', articles))
+        cold = time.perf_counter() - start
+    except Exception as e:
+        print(f"  {name} skipped: {str(e).splitlines()[0]}")
+        await bench.close()
+        return
+
+    print(f"  {name}: cold start {cold * 1000:.0f} ms (launch {launched * 1000:.0f} ms, {found} articles)")
+    print(
+        f"    {'instruments':>11} {'wall ms':>9} {'articles/s':>10} {'article p50':>11} {'article p95':>11} "
+        f"{'browser MB':>10} {'process MB':>10} {'KB/round':>9}"
+    )
+    try:
+        for level in levels:
+            latencies.clear()
+            server.reset_counters()
+            walls = []
+            found = 0
+            sampler.start()
+            for _ in range(rounds):
+                round_start = time.perf_counter()
+                results = await asyncio.gather(
+                    *(bench.get_news(f"PAIR{index}", articles) for index in range(level))
+                )
+                walls.append(time.perf_counter() - round_start)
+                found += sum(len(result) for result in results)
+            browser_mb, process_mb = await sampler.stop()
+
+            wall = sum(walls) / len(walls)
+            print(
+                f"    {level:>11} {wall * 1000:9.0f} {found / sum(walls):10.1f} "
+                f"{percentile(latencies, 0.5) * 1000:9.1f}ms {percentile(latencies, 0.95) * 1000:9.1f}ms "
+                f"{browser_mb:10.1f} {process_mb:10.1f} {server.bytes_sent / rounds / 1024:9.0f}"
+            )
+    finally:
+        await bench.close()
+
+async def main(levels: List[int], rounds: int, articles: int, latency: LatencyProfile, backends: List[str]) -> None:
+    server = FixtureServer(latency)
+    settings.TRADINGVIEW_BASE_URL = await server.start()
+    # The fixture server is not on the scraping allow list
+    scrape_profile.allowed_domains = []
+
+    print(
+        f"{rounds} rounds per level, {articles} articles per instrument, "
+        f"server latency p50 {latency.p50_ms:.0f} ms / p99 {latency.p99_ms:.0f} ms"
+    )
+    try:
+        for name in backends:
+            await bench_backend(name, server, levels, rounds, articles)
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,2,4,8", help="comma-separated instruments scraped at once")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--articles", type=int, default=3)
+    parser.add_argument("--latency", default="50:200", metavar="P50:P99", help="fixture server latency in ms")
+    parser.add_argument("--backends", default="http,playwright")
+    args = parser.parse_args()
+
+    # Per-scrape INFO logs would drown the table
+    logging.getLogger().setLevel(logging.WARNING)
+    for name in ('http_scraper', 'news_scraper', 'browser_pool'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    asyncio.run(main(
+        [int(level) for level in args.concurrency.split(',')],
+        args.rounds,
+        args.articles,
+        LatencyProfile.parse(args.latency),
+        [name for name in args.backends.split(',') if name in BENCHES]
+    ))
@@ -0,0 +1,107 @@
+"""Measure lock contention on the cross-worker shared state at several worker counts.
+
+Each worker process opens the same SQLite file and runs a mix of cache reads,
+cache writes, dedup claims and metric publishes from concurrent coroutines,
+like a uvicorn worker serving signals. Reports throughput and per-operation
+p50/p99 latency for each worker count.
+
+    python -m benchmarks.bench_shared_state --workers 1,4,8 --duration 5
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from typing import Dict, List
+
+# Operation mix per request-like iteration
+OPERATIONS = {'cache_get': 0.6, 'cache_set': 0.15, 'claim': 0.15, 'publish': 0.1}
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def run_worker(path: str, duration: float, concurrency: int, start_at: float) -> Dict[str, List[float]]:
+    from monitoring import monitor
+    from shared_state import SharedState
+
+    # A realistic amount of metrics to publish
+    for stage in ('news', 'subscribers', 'chart', 'analysis', 'format', 'telegram', 'total'):
+        monitor.observe('pipeline_stage', stage, random.random())
+        monitor.observe('stage', stage, random.random())
+
+    # Publishing is driven by the benchmark, not by the background loop
+    state = SharedState(path, publish_interval=3600)
+    await state.open()
+    payload = os.urandom(20000)
+    latencies: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+    names, weights = list(OPERATIONS), list(OPERATIONS.values())
+
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    deadline = time.monotonic() + duration
+
+    async def client() -> None:
+        while time.monotonic() < deadline:
+            name = random.choices(names, weights)[0]
+            key = f"key-{random.randrange(200)}"
+            start = time.perf_counter()
+            if name == 'cache_get':
+                await state.cache_get('bench', key)
+            elif name == 'cache_set':
+                await state.cache_set('bench', key, payload, 60)
+            elif name == 'claim':
+                await state.claim(f"{key}-{random.getrandbits(32)}", 60)
+            else:
+                await state.publish()
+            latencies[name].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    await state.close()
+    return latencies
+
+def worker_main(path: str, duration: float, concurrency: int, start_at: float, results: multiprocessing.Queue) -> None:
+    results.put(asyncio.run(run_worker(path, duration, concurrency, start_at)))
+
+def bench(workers: int, duration: float, concurrency: int) -> None:
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'shared_state.db')
+        # Start together once every worker has imported the app modules
+        start_at = time.time() + 3.0
+        processes = [
+            context.Process(target=worker_main, args=(path, duration, concurrency, start_at, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        merged: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+        for _ in processes:
+            for name, values in results.get().items():
+                merged[name].extend(values)
+        for process in processes:
+            process.join()
+
+    total = sum(len(values) for values in merged.values())
+    print(f"  {workers} workers: {total / duration:8.0f} ops/s")
+    for name, values in merged.items():
+        print(
+            f"    {name:<10} {len(values):7d} ops  p50 {percentile(values, 0.5) * 1000:7.2f} ms  "
+            f"p99 {percentile(values, 0.99) * 1000:7.2f} ms"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,4,8", help="comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent requests per worker")
+    args = parser.parse_args()
+
+    mix = ", ".join(f"{name} {share:.0%}" for name, share in OPERATIONS.items())
+    print(f"{args.duration:.0f} s per run, {args.concurrency} concurrent requests per worker ({mix})")
+    for count in (int(value) for value in args.workers.split(',')):
+        bench(count, args.duration, args.concurrency)
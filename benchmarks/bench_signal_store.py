@@ -0,0 +1,63 @@
+"""Benchmark signal throughput with the durable signal store on and off.
+
+Each simulated signal is recorded on acceptance, writes one result per
+pipeline stage and is marked completed, mirroring run_signal_pipeline.
+
+    python -m benchmarks.bench_signal_store --signals 2000 --concurrency 64
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Optional
+
+from signal_store import SignalStore
+
+STAGES = ["news", "subscribers", "chart", "analysis", "format", "telegram"]
+
+async def run_signal(store: Optional[SignalStore], index: int) -> None:
+    signal_id = f"bench-{index}"
+    if store:
+        await store.record_signal(signal_id, {"instrument": "EURUSD", "action": "BUY", "price": 1.1})
+    for stage in STAGES:
+        # Stand-in for the stage's downstream call
+        await asyncio.sleep(0)
+        if store:
+            await store.record_stage(signal_id, stage, {"stage": stage})
+    if store:
+        await store.mark_status(signal_id, 'completed')
+
+async def measure(store: Optional[SignalStore], signals: int, concurrency: int) -> float:
+    """Process the signals with bounded concurrency and return signals per second"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> None:
+        async with semaphore:
+            await run_signal(store, index)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(index) for index in range(signals)))
+    return signals / (time.perf_counter() - start)
+
+async def main(signals: int, concurrency: int, commit_interval_ms: float) -> None:
+    print(f"{signals} signals, concurrency {concurrency}")
+    rate = await measure(None, signals, concurrency)
+    print(f"  durability off            {rate:10.1f} signals/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, fsync in (("WAL, no fsync per commit", False), ("WAL, fsync (group commit)", True)):
+            store = SignalStore(os.path.join(directory, f"{fsync}.db"), fsync=fsync, commit_interval_ms=commit_interval_ms)
+            await store.open()
+            rate = await measure(store, signals, concurrency)
+            stats = store.get_stats()
+            await store.close()
+            print(f"  {label:<25} {rate:10.1f} signals/s ({stats['writes_per_commit']:.1f} writes/commit)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--commit-interval-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.signals, args.concurrency, args.commit_interval_ms))
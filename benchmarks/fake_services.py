@@ -0,0 +1,194 @@
+"""In-process stand-ins for the downstream services and the news scraper.
+
+Every fake answers after a latency drawn from a log-normal distribution fitted
+to a p50 and p99, and fails a configurable fraction of requests with a 503
+(or, for the scraper, an exception), so the signal pipeline can be exercised
+end to end without the Railway services or TradingView.
+"""
+import math
+import random
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from http_clients import ServiceClients
+from scraper_backend import NewsBackend
+
+# z-score of the 99th percentile of a standard normal distribution
+Z_P99 = 2.326
+
+class LatencyProfile:
+    """Log-normal latency with the given p50 and p99 (milliseconds) and an error rate"""
+
+    def __init__(self, p50_ms: float, p99_ms: float, error_rate: float = 0.0):
+        self.p50_ms = p50_ms
+        self.p99_ms = max(p99_ms, p50_ms)
+        self.error_rate = error_rate
+        self._mu = math.log(max(p50_ms, 0.001))
+        self._sigma = math.log(self.p99_ms / p50_ms) / Z_P99 if p50_ms > 0 else 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyProfile':
+        """Parse 'P50:P99[:ERROR_RATE]', e.g. '80:400:0.01'"""
+        parts = [float(part) for part in spec.split(':')]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid latency profile {spec!r}, expected P50:P99[:ERROR_RATE]")
+        return cls(*parts)
+
+    def sample(self) -> float:
+        """Draw a latency in seconds"""
+        if self.p50_ms <= 0:
+            return 0.0
+        return random.lognormvariate(self._mu, self._sigma) / 1000
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'p50_ms': self.p50_ms, 'p99_ms': self.p99_ms, 'error_rate': self.error_rate}
+
+# Scaled-down versions of the production latencies, so a run takes seconds
+DEFAULT_PROFILES = {
+    'signal_ai': LatencyProfile(80, 400, 0.01),
+    'news_ai': LatencyProfile(60, 300, 0.01),
+    'matcher': LatencyProfile(15, 60, 0.005),
+    'chart': LatencyProfile(40, 200, 0.01),
+    'telegram': LatencyProfile(20, 100, 0.01),
+    'scraper': LatencyProfile(150, 600, 0.02)
+}
+
+# A small PNG header followed by padding, about the size of a rendered chart
+CHART_PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 40000
+
+Handler = Callable[[web.Request], Awaitable[web.Response]]
+
+class FakeService:
+    """One downstream service served by aiohttp on a free local port"""
+
+    def __init__(self, name: str, routes: Dict[str, Handler], profile: LatencyProfile):
+        self.name = name
+        self.routes = routes
+        self.profile = profile
+        self.url: Optional[str] = None
+        self.calls = 0
+        self.errors = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def _wrap(self, handler: Handler) -> Handler:
+        async def wrapped(request: web.Request) -> web.Response:
+            self.calls += 1
+            await asyncio.sleep(self.profile.sample())
+            if self.profile.should_fail():
+                self.errors += 1
+                return web.json_response({'detail': 'injected failure'}, status=503)
+            return await handler(request)
+        return wrapped
+
+    async def start(self) -> None:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        for route, handler in self.routes.items():
+            method, path = route.split(' ', 1)
+            app.router.add_route(method, path, self._wrap(handler))
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+class FakeDownstreamServices:
+    """The signal AI, news AI, matcher, chart and Telegram services"""
+
+    def __init__(self, profiles: Optional[Dict[str, LatencyProfile]] = None, chats_per_signal: int = 3):
+        profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        chat_ids = [str(1000 + index) for index in range(chats_per_signal)]
+
+        async def analyze_signal(request: web.Request) -> web.Response:
+            return web.json_response({'verdict': 'Signal looks valid', 'risk_reward_ratio': 2.0})
+
+        async def format_signal(request: web.Request) -> web.Response:
+            signal = await request.json()
+            return web.json_response({'formatted_message': f"{signal.get('direction')} {signal.get('instrument')}"})
+
+        async def analyze_news(request: web.Request) -> web.Response:
+            return web.json_response({'sentiment': 'neutral', 'summary': 'No major news'})
+
+        async def match_subscribers(request: web.Request) -> web.Response:
+            return web.json_response({'chat_ids': chat_ids})
+
+        async def chart(request: web.Request) -> web.Response:
+            return web.Response(body=CHART_PNG, content_type='image/png')
+
+        async def send_signal(request: web.Request) -> web.Response:
+            body = await request.json()
+            return web.json_response({'sent': len(body.get('chat_ids', []))})
+
+        async def upload_chart(request: web.Request) -> web.Response:
+            await request.read()
+            return web.json_response({'chart_id': f"chart-{random.getrandbits(32):08x}"})
+
+        self.services = {
+            'signal_ai': FakeService('signal_ai', {
+                'POST /analyze-signal': analyze_signal,
+                'POST /format-signal': format_signal
+            }, profiles['signal_ai']),
+            'news_ai': FakeService('news_ai', {'POST /analyze-news': analyze_news}, profiles['news_ai']),
+            'matcher': FakeService('matcher', {'POST /match-subscribers': match_subscribers}, profiles['matcher']),
+            'chart': FakeService('chart', {'GET /chart': chart}, profiles['chart']),
+            'telegram': FakeService('telegram', {
+                'POST /send-signal': send_signal,
+                'POST /upload-chart': upload_chart
+            }, profiles['telegram'])
+        }
+
+    async def start(self, clients: ServiceClients) -> None:
+        """Start every fake and point the matching service client at it"""
+        for name, service in self.services.items():
+            await service.start()
+            clients.services[name].base_url = service.url
+        await clients.initialize()
+
+    async def stop(self) -> None:
+        for service in self.services.values():
+            await service.stop()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {'calls': service.calls, 'errors': service.errors}
+            for name, service in self.services.items()
+        }
+
+class FakeNewsBackend(NewsBackend):
+    """Scraper backend returning canned articles after a simulated page load"""
+
+    name = 'fake'
+
+    def __init__(self, profile: LatencyProfile = DEFAULT_PROFILES['scraper']):
+        self.profile = profile
+        self.calls = 0
+        self.errors = 0
+
+    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
+        self.calls += 1
+        await asyncio.sleep(self.profile.sample())
+        if self.profile.should_fail():
+            self.errors += 1
+            raise RuntimeError(f"Injected scraper failure for {instrument}")
+        return [
+            {
+                'title': f"{instrument} headline {index}",
+                'content': f"Market commentary on {instrument}. " * 40,
+                'provider': 'Fake Wire',
+                'date': '2024-01-01T00:00:00Z',
+                'url': f"https://example.com/news/{instrument.lower()}-{index}"
+            }
+            for index in range(max_articles)
+        ]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'errors': self.errors}
@@ -0,0 +1,60 @@
+"""Local HTTP server replaying the recorded TradingView pages in benchmarks/fixtures."""
+import os
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+from aiohttp import web
+
+from benchmarks.fake_services import LatencyProfile
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+class FixtureServer:
+    """Serves the news list and article fixtures with injectable latency and counts what it sends"""
+
+    def __init__(self, latency: LatencyProfile):
+        self.latency = latency
+        self.pages = {
+            'list': read_fixture('news_list.html').encode('utf-8'),
+            'article': read_fixture('news_article.html').encode('utf-8')
+        }
+        self.url: Optional[str] = None
+        self.requests = 0
+        self.bytes_sent = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def _page(self, name: str) -> Callable[[web.Request], Awaitable[web.Response]]:
+        async def handler(request: web.Request) -> web.Response:
+            await asyncio.sleep(self.latency.sample())
+            body = self.pages[name]
+            self.requests += 1
+            self.bytes_sent += len(body)
+            return web.Response(body=body, content_type='text/html', charset='utf-8')
+        return handler
+
+    async def start(self) -> str:
+        """Start on a free local port and return the base URL"""
+        app = web.Application()
+        app.router.add_get('/symbols/{instrument}/news/', self._page('list'))
+        app.router.add_get('/news/{article}/', self._page('article'))
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self.url
+
+    def reset_counters(self) -> None:
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'requests': self.requests, 'bytes_sent': self.bytes_sent}
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
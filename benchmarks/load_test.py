@@ -0,0 +1,285 @@
+"""End-to-end load test of /trading-signal against in-process fake services.
+
+The signal AI, news AI, matcher, chart and Telegram services and the news
+scraper are replaced by the fakes in benchmarks/fake_services.py. Signals are
+sent at a fixed rate (open loop, independent of response times) and the run
+reports throughput, request and per-stage p50/p95/p99 and memory growth.
+
+Results can be saved as a named baseline; later runs of the same scenario fail
+(exit status 1) when throughput, p50/p95 latency or memory regress beyond
+tolerance.
+
+    python -m benchmarks.load_test --rps 8 --duration 20
+    python -m benchmarks.load_test --service signal_ai=200:1500:0.05 --scraper 300:2000
+    python -m benchmarks.load_test --save-baseline
+    python -m benchmarks.load_test --baseline default
+"""
+import gc
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from typing import Any, Dict, List, Optional
+
+import httpx
+import psutil
+
+import main
+from monitoring import monitor
+from news_scraper import news_backends
+from benchmarks.fake_services import DEFAULT_PROFILES, FakeDownstreamServices, FakeNewsBackend, LatencyProfile
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines')
+TIMEFRAMES = ["15", "60", "240"]
+PERCENTILES = (50, 95, 99)
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Exact p50/p95/p99 of durations in seconds, in milliseconds"""
+    if not values:
+        return {f"p{q}": 0.0 for q in PERCENTILES}
+    ordered = sorted(values)
+    return {
+        f"p{q}": round(ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] * 1000, 1)
+        for q in PERCENTILES
+    }
+
+def rss_mb() -> float:
+    gc.collect()
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+class LoadRecorder:
+    """Collects request outcomes and the stage timings of every processed signal"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.stages: Dict[str, List[float]] = {}
+
+    def record_request(self, status: str, latency: float) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == '200':
+            self.latencies.append(latency)
+
+    def record_stages(self, timings: Dict[str, float]) -> None:
+        for stage, duration in timings.items():
+            self.stages.setdefault(stage, []).append(duration)
+
+def make_signal(index: int, instruments: int) -> Dict[str, Any]:
+    # A distinct price per signal keeps the idempotency store from deduplicating them
+    return {
+        "instrument": f"PAIR{index % instruments}",
+        "action": "BUY" if index % 2 else "SELL",
+        "price": round(1.0 + index / 100000, 5),
+        "stoploss": 0.99,
+        "takeprofit": 1.02,
+        "timeframe": TIMEFRAMES[index % len(TIMEFRAMES)],
+        "strategy": "load-test"
+    }
+
+async def drive(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    rps: float,
+    duration: float,
+    instruments: int,
+    offset: int
+) -> float:
+    """Send signals at a fixed rate for duration seconds and wait for them; returns the elapsed time"""
+    count = int(rps * duration)
+    tasks = []
+
+    async def send(index: int) -> None:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/trading-signal", json=make_signal(index, instruments))
+            status = str(response.status_code)
+        except Exception as e:
+            status = type(e).__name__
+        recorder.record_request(status, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for index in range(count):
+        # Open loop: a slow response does not delay the next signal
+        delay = start + index / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(offset + index)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+async def run(args: argparse.Namespace, profiles: Dict[str, LatencyProfile]) -> Dict[str, Any]:
+    """Run the scenario and return its results"""
+    main.settings.SUPABASE_KEY = main.settings.SUPABASE_KEY or "load-test"
+
+    services = FakeDownstreamServices(profiles, args.chats)
+    scraper = FakeNewsBackend(profiles['scraper'])
+    news_backends.http = scraper
+    news_backends.mode = 'http'
+    await services.start(main.service_clients)
+
+    recorder = LoadRecorder()
+    log_stage_timings = monitor.log_stage_timings
+
+    def record_stage_timings(timings: Dict[str, float]) -> None:
+        recorder.record_stages(timings)
+        log_stage_timings(timings)
+
+    monitor.log_stage_timings = record_stage_timings
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app),
+            base_url="http://load-test",
+            timeout=None
+        ) as client:
+            if args.warmup:
+                await drive(client, recorder, args.rps, args.warmup, args.instruments, 0)
+            recorder.reset()
+            rss_before = rss_mb()
+            elapsed = await drive(client, recorder, args.rps, args.duration, args.instruments, int(args.rps * args.warmup))
+            rss_after = rss_mb()
+    finally:
+        monitor.log_stage_timings = log_stage_timings
+        await main.service_clients.cleanup()
+        await services.stop()
+
+    completed = recorder.statuses.get('200', 0)
+    return {
+        'throughput_rps': round(completed / elapsed, 2),
+        'requests': dict(sorted(recorder.statuses.items())),
+        'latency_ms': percentiles(recorder.latencies),
+        'stages_ms': {stage: percentiles(values) for stage, values in sorted(recorder.stages.items())},
+        'memory_growth_mb': round(rss_after - rss_before, 1),
+        'downstream': {**services.get_stats(), 'scraper': scraper.get_stats()}
+    }
+
+def print_results(results: Dict[str, Any]) -> None:
+    requests = ", ".join(f"{status}: {count}" for status, count in results['requests'].items())
+    print(f"  throughput      {results['throughput_rps']:8.2f} signals/s  ({requests})")
+    print(f"  memory growth   {results['memory_growth_mb']:8.1f} MB")
+    print(f"  {'':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = [('request', results['latency_ms'])] + list(results['stages_ms'].items())
+    for name, values in rows:
+        print(f"  {name:<22}{values['p50']:10.1f}{values['p95']:10.1f}{values['p99']:10.1f}")
+    downstream = ", ".join(
+        f"{name} {stats['calls']} ({stats['errors']} failed)" for name, stats in results['downstream'].items()
+    )
+    print(f"  downstream calls: {downstream}")
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    """List the regressions of results against a baseline"""
+    tolerance = args.tolerance
+    regressions = []
+
+    floor = baseline['throughput_rps'] * (1 - tolerance)
+    if results['throughput_rps'] < floor:
+        regressions.append(f"throughput {results['throughput_rps']} signals/s < {floor:.2f}")
+
+    # p99 over a short run rests on a handful of samples, so it is reported but not gated.
+    # A small absolute slack keeps millisecond-scale stages from failing on noise.
+    rows = [('request', baseline['latency_ms'], results['latency_ms'])] + [
+        (stage, values, results['stages_ms'].get(stage))
+        for stage, values in baseline['stages_ms'].items()
+    ]
+    for name, expected, actual in rows:
+        if actual is None:
+            continue
+        for q in ('p50', 'p95'):
+            limit = expected[q] * (1 + tolerance) + args.latency_slack_ms
+            if actual[q] > limit:
+                regressions.append(f"{name} {q} {actual[q]} ms > {limit:.1f} ms")
+
+    limit = baseline['memory_growth_mb'] + args.memory_slack_mb
+    if results['memory_growth_mb'] > limit:
+        regressions.append(f"memory growth {results['memory_growth_mb']} MB > {limit:.1f} MB")
+    return regressions
+
+def scenario(args: argparse.Namespace, profiles: Dict[str, LatencyProfile]) -> Dict[str, Any]:
+    return {
+        'rps': args.rps,
+        'duration': args.duration,
+        'instruments': args.instruments,
+        'chats': args.chats,
+        'seed': args.seed,
+        'profiles': {name: profile.to_dict() for name, profile in sorted(profiles.items())}
+    }
+
+def parse_profiles(args: argparse.Namespace) -> Dict[str, LatencyProfile]:
+    profiles = dict(DEFAULT_PROFILES)
+    for spec in args.service:
+        name, _, profile = spec.partition('=')
+        if name not in profiles or name == 'scraper':
+            raise SystemExit(f"Unknown service {name!r}, expected one of {', '.join(sorted(set(profiles) - {'scraper'}))}")
+        profiles[name] = LatencyProfile.parse(profile)
+    if args.scraper:
+        profiles['scraper'] = LatencyProfile.parse(args.scraper)
+    return profiles
+
+def main_cli(args: argparse.Namespace) -> int:
+    # Per-signal INFO logs would dominate the run
+    logging.getLogger().setLevel(logging.ERROR)
+
+    # Seeded so repeated runs draw the same latencies and failures
+    random.seed(args.seed)
+    profiles = parse_profiles(args)
+    current = scenario(args, profiles)
+    path = os.path.join(BASELINES, f"{args.baseline}.json")
+    baseline: Optional[Dict[str, Any]] = None
+    if not args.save_baseline and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['scenario'] != current:
+            print(f"Scenario differs from baseline {args.baseline!r}; run with --save-baseline to record a new one")
+            return 2
+
+    print(
+        f"{args.rps} signals/s for {args.duration:.0f} s after {args.warmup:.0f} s warm-up, "
+        f"{args.instruments} instruments, {args.chats} chats per signal"
+    )
+    results = asyncio.run(run(args, profiles))
+    print_results(results)
+
+    if args.save_baseline:
+        os.makedirs(BASELINES, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'scenario': current, 'results': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline {args.baseline!r} to {path}")
+        return 0
+
+    if baseline is None:
+        return 0
+
+    regressions = compare(baseline['results'], results, args)
+    if regressions:
+        print(f"Regressions against baseline {args.baseline!r}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions against baseline {args.baseline!r} (tolerance {args.tolerance:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=8.0, help="signals sent per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before the run")
+    parser.add_argument("--instruments", type=int, default=10)
+    parser.add_argument("--chats", type=int, default=3, help="subscribers matched per signal")
+    parser.add_argument("--service", action="append", default=[], metavar="NAME=P50:P99[:ERROR_RATE]",
+                        help="latency profile in ms of a fake service (signal_ai, news_ai, matcher, chart, telegram)")
+    parser.add_argument("--scraper", metavar="P50:P99[:ERROR_RATE]", help="latency profile of the fake news scraper")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default="default", help="baseline name in benchmarks/baselines")
+    parser.add_argument("--save-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative regression")
+    parser.add_argument("--latency-slack-ms", type=float, default=25.0)
+    parser.add_argument("--memory-slack-mb", type=float, default=25.0)
+    sys.exit(main_cli(parser.parse_args()))
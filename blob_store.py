@@ -0,0 +1,79 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class BlobStore:
+    """Content-addressed in-memory store for binary payloads such as chart images.
+
+    Blobs are keyed by the SHA-256 of their bytes, so identical content is
+    stored once. The least recently used blobs are evicted once the total size
+    exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = settings.BLOB_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # ref -> bytes, least recently used first
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._deduplicated = 0
+        self._evictions = 0
+
+    @staticmethod
+    def ref_for(data: bytes) -> str:
+        return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+    def put(self, data: bytes) -> str:
+        """Store bytes and return their reference"""
+        ref = self.ref_for(data)
+        if ref in self._blobs:
+            self._deduplicated += 1
+            self._blobs.move_to_end(ref)
+            return ref
+
+        if len(data) > self.max_bytes:
+            logger.warning(f"Blob of {len(data)} bytes exceeds the blob store size of {self.max_bytes} bytes")
+            return ref
+
+        self._blobs[ref] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self._size -= len(evicted)
+            self._evictions += 1
+        return ref
+
+    def get(self, ref: Optional[str]) -> Optional[bytes]:
+        """Get the bytes for a reference, or None if unknown or evicted"""
+        data = self._blobs.get(ref) if ref else None
+        if data is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._blobs.move_to_end(ref)
+        return data
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self._blobs
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size and hit statistics"""
+        return {
+            'blobs': len(self._blobs),
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'deduplicated': self._deduplicated,
+            'evictions': self._evictions
+        }
+
+# Create singleton instance
+blob_store = BlobStore()
@@ -0,0 +1,145 @@
+import logging
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext
+
+from config import settings
+from monitoring import monitor
+from admission import admission_control
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class BrowserPool:
+    """Process-wide Chromium instance handing out isolated browser contexts"""
+
+    def __init__(self):
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self.max_concurrency = settings.BROWSER_POOL_MAX_CONCURRENCY
+        self.health_check_interval = settings.BROWSER_HEALTH_CHECK_INTERVAL
+        self.launch_args = [
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-extensions'
+        ]
+
+        # Created lazily so it binds to the running event loop
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._active_contexts = 0
+        self._relaunches = 0
+
+    def _ensure_primitives(self) -> None:
+        """Create the asyncio synchronization primitives on first use"""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+
+    async def initialize(self) -> None:
+        """Start the Playwright driver, launch Chromium and begin health checks"""
+        self._ensure_primitives()
+        # Started first, so a browser that fails to launch now is retried by the health check
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+        await self._ensure_browser()
+
+    async def _launch(self) -> None:
+        """Launch a new Chromium instance (caller must hold the launch lock)"""
+        with monitor.timer('scraper', 'browser_launch'), tracer.span('browser.launch'):
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+
+            # No browser-wide proxy: each context sets its own, or connects directly without one
+            self.browser = await self.playwright.chromium.launch(
+                headless=True,
+                args=self.launch_args
+            )
+        logger.info("Browser pool launched Chromium")
+
+    async def _ensure_browser(self) -> Browser:
+        """Return a connected browser, relaunching it if it crashed"""
+        self._ensure_primitives()
+        if self.browser and self.browser.is_connected():
+            return self.browser
+
+        async with self._launch_lock:
+            if self.browser and self.browser.is_connected():
+                return self.browser
+
+            if self.browser:
+                logger.warning("Browser disconnected, relaunching")
+                self._relaunches += 1
+                try:
+                    await self.browser.close()
+                except Exception:
+                    pass
+                self.browser = None
+
+            await self._launch()
+            return self.browser
+
+    async def _health_check_loop(self) -> None:
+        """Periodically verify the browser is alive and relaunch it if not"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self._ensure_browser()
+            except Exception as e:
+                logger.error(f"Browser health check failed: {str(e)}")
+
+    @asynccontextmanager
+    async def context(self, **options: Any) -> AsyncIterator[BrowserContext]:
+        """Acquire an isolated browser context, bounded by the 'browser' admission class.
+
+        When contexts are scarce, signal processing is served before /get-news requests.
+        """
+        self._ensure_primitives()
+        async with admission_control.slot('browser'):
+            with tracer.span('browser.new_context'):
+                browser = await self._ensure_browser()
+                context = await browser.new_context(**options)
+            self._active_contexts += 1
+            try:
+                yield context
+            finally:
+                self._active_contexts -= 1
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.debug(f"Error closing browser context: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get browser pool statistics"""
+        return {
+            'connected': bool(self.browser and self.browser.is_connected()),
+            'active_contexts': self._active_contexts,
+            'max_concurrency': self.max_concurrency,
+            'relaunches': self._relaunches
+        }
+
+    async def cleanup(self) -> None:
+        """Close the browser and stop the Playwright driver"""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+
+        try:
+            if self.browser:
+                await self.browser.close()
+                self.browser = None
+        except Exception as e:
+            logger.error(f"Error closing browser: {str(e)}")
+
+        try:
+            if self.playwright:
+                await self.playwright.stop()
+                self.playwright = None
+        except Exception as e:
+            logger.error(f"Error stopping Playwright: {str(e)}")
+
+        logger.info("Browser pool cleaned up")
+
+# Create singleton instance
+browser_pool = BrowserPool()
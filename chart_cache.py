@@ -0,0 +1,126 @@
+import re
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import settings
+from blob_store import blob_store, BlobStore
+from shared_state import shared_state, SharedState
+
+logger = logging.getLogger(__name__)
+
+# Seconds per TradingView interval unit; a bare number is minutes
+TIMEFRAME_UNITS = {
+    '': 60, 'S': 1, 's': 1, 'm': 60, 'h': 3600, 'H': 3600,
+    'D': 86400, 'd': 86400, 'W': 604800, 'w': 604800, 'M': 2592000
+}
+TIMEFRAME_PATTERN = re.compile(r'^(\d*)([A-Za-z]?)$')
+
+ChartKey = Tuple[str, str, int]
+
+def timeframe_seconds(timeframe: Optional[str]) -> Optional[int]:
+    """Length of a candle for a TradingView interval such as '15', '1h', '4H', 'D' or '1W'"""
+    match = TIMEFRAME_PATTERN.match((timeframe or '').strip())
+    if not match or match.group(2) not in TIMEFRAME_UNITS or not (match.group(1) or match.group(2)):
+        return None
+    return int(match.group(1) or 1) * TIMEFRAME_UNITS[match.group(2)]
+
+class ChartCache:
+    """Chart images per (instrument, timeframe, candle), stored as blob references.
+
+    A chart only changes when a new candle opens, so signals for the same
+    instrument and timeframe within one candle reuse the rendered image. When
+    the shared state is open, charts are shared with the other workers until
+    the candle closes.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore = blob_store,
+        max_entries: int = settings.CHART_CACHE_MAX_ENTRIES,
+        shared: SharedState = shared_state
+    ):
+        self.store = store
+        self.max_entries = max_entries
+        self.shared = shared
+        # key -> blob reference, least recently used first
+        self._entries: "OrderedDict[ChartKey, str]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._shared_hits = 0
+
+    @staticmethod
+    def candle_seconds(timeframe: Optional[str]) -> int:
+        return timeframe_seconds(timeframe) or settings.CHART_CACHE_DEFAULT_CANDLE_SECONDS
+
+    @classmethod
+    def key(cls, instrument: str, timeframe: Optional[str], now: Optional[float] = None) -> ChartKey:
+        now = time.time() if now is None else now
+        return (instrument.upper(), timeframe or '', int(now // cls.candle_seconds(timeframe)))
+
+    async def get_or_render(
+        self,
+        instrument: str,
+        timeframe: Optional[str],
+        render: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[str]:
+        """Get the chart reference for the current candle, rendering it on a miss"""
+        key = self.key(instrument, timeframe)
+        ref = self._entries.get(key)
+        if ref and ref in self.store:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return ref
+
+        self._misses += 1
+        shared_key = '|'.join(str(part) for part in key)
+        data = await self._get_shared(shared_key)
+        if data:
+            self._shared_hits += 1
+        else:
+            data = await render()
+            if not data:
+                return None
+            # Shared until the candle closes
+            seconds = self.candle_seconds(timeframe)
+            await self._set_shared(shared_key, data, (key[2] + 1) * seconds - time.time())
+
+        ref = self.store.put(data)
+        self._entries[key] = ref
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return ref
+
+    async def _get_shared(self, key: str) -> Optional[bytes]:
+        """Get a chart another worker rendered for the current candle"""
+        if not self.shared.is_open:
+            return None
+        try:
+            entry = await self.shared.cache_get('chart', key)
+        except Exception as e:
+            logger.warning(f"Error reading shared chart cache: {str(e)}")
+            return None
+        return entry[0] if entry else None
+
+    async def _set_shared(self, key: str, data: bytes, ttl: float) -> None:
+        """Make a rendered chart visible to the other workers"""
+        if not self.shared.is_open or ttl <= 0:
+            return
+        try:
+            await self.shared.cache_set('chart', key, data, ttl)
+        except Exception as e:
+            logger.warning(f"Error writing shared chart cache: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get chart cache statistics"""
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'shared_hits': self._shared_hits
+        }
+
+# Create singleton instance
+chart_cache = ChartCache()
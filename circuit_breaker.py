@@ -0,0 +1,196 @@
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a downstream service whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Per-service circuit breaker with failure-rate and slow-call thresholds.
+
+    The breaker also derives an adaptive request timeout from the recent
+    latency of successful calls, so a slow service is cut off at a multiple of
+    its normal p99 instead of the full configured timeout. A call that hits
+    the adaptive timeout doubles it (up to the configured timeout), so the
+    limit follows latency up as well as down, and half-open probes always get
+    the full configured timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        window_size: int = settings.BREAKER_WINDOW_SIZE,
+        min_calls: int = settings.BREAKER_MIN_CALLS,
+        failure_rate_threshold: float = settings.BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = settings.BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold: float = settings.BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = settings.BREAKER_OPEN_SECONDS,
+        half_open_calls: int = settings.BREAKER_HALF_OPEN_CALLS
+    ):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._half_open_inflight = 0
+        # (failed, slow) of the most recent calls
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        # Latencies of recent successful calls, for the adaptive timeout
+        self._latencies: Deque[float] = deque(maxlen=settings.ADAPTIVE_TIMEOUT_WINDOW)
+        self._timeout = max_timeout
+        self._since_timeout_update = 0
+        self._rejected = 0
+
+    def before_call(self) -> float:
+        """Check whether a call may proceed and get its timeout; raises CircuitOpenError if not"""
+        if self.state == OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.open_seconds:
+                self._rejected += 1
+                raise CircuitOpenError(self.name, self.open_seconds - elapsed)
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._half_open_inflight >= self.half_open_calls:
+                self._rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._half_open_inflight += 1
+            return self.max_timeout
+
+        return self._timeout
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call and its latency in seconds"""
+        slow = latency >= self.slow_call_seconds
+        self._latencies.append(latency)
+        self._update_timeout()
+
+        if self.state == HALF_OPEN:
+            self._half_open_inflight -= 1
+            if slow:
+                self._trip()
+            else:
+                self._transition(CLOSED)
+            return
+
+        self._outcomes.append((False, slow))
+        self._evaluate()
+
+    def record_cancelled(self) -> None:
+        """Release a call abandoned by its caller without counting it as an outcome"""
+        if self.state == HALF_OPEN and self._half_open_inflight > 0:
+            self._half_open_inflight -= 1
+
+    def record_failure(self, timed_out: bool = False) -> None:
+        """Record a failed call (transport error, timeout or 5xx response)"""
+        if timed_out:
+            self._widen_timeout()
+
+        if self.state == HALF_OPEN:
+            self._half_open_inflight -= 1
+            self._trip()
+            return
+
+        self._outcomes.append((True, False))
+        self._evaluate()
+
+    def _rates(self) -> Tuple[float, float]:
+        """Get the failure and slow-call rates over the window"""
+        calls = len(self._outcomes)
+        if not calls:
+            return 0.0, 0.0
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        return failures / calls, slow / calls
+
+    def _evaluate(self) -> None:
+        """Open the circuit when a threshold is exceeded"""
+        if self.state != CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        failure_rate, slow_rate = self._rates()
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._trip()
+
+    def _trip(self) -> None:
+        self._transition(OPEN)
+        self.opened_at = time.monotonic()
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit for {self.name} changed from {self.state} to {state}")
+        self.state = state
+        self._half_open_inflight = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+            self.opened_at = None
+
+    def _update_timeout(self) -> None:
+        """Recompute the adaptive timeout every few successful calls"""
+        self._since_timeout_update += 1
+        if (not settings.ADAPTIVE_TIMEOUT_ENABLED
+                or len(self._latencies) < settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+                or self._since_timeout_update < 10):
+            return
+        self._since_timeout_update = 0
+
+        p99 = self.latency_percentile(0.99)
+        self._timeout = min(
+            self.max_timeout,
+            max(settings.ADAPTIVE_TIMEOUT_MIN, p99 * settings.ADAPTIVE_TIMEOUT_MULTIPLIER)
+        )
+
+    def _widen_timeout(self) -> None:
+        """Double the adaptive timeout after a call ran into it"""
+        if self._timeout < self.max_timeout:
+            self._timeout = min(self.max_timeout, self._timeout * 2)
+            # Let successes at the new limit accumulate before shrinking it again
+            self._since_timeout_update = 0
+
+    def latency_percentile(self, quantile: float, min_samples: int = 1) -> Optional[float]:
+        """Get a percentile of recent successful call latency, if enough calls were seen"""
+        if len(self._latencies) < max(1, min_samples):
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * quantile))]
+
+    @property
+    def timeout(self) -> float:
+        """Current request timeout in seconds"""
+        return self._timeout
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get the breaker state for health reporting"""
+        failure_rate, slow_rate = self._rates()
+        state = {
+            'state': self.state,
+            'failure_rate': round(failure_rate, 3),
+            'slow_call_rate': round(slow_rate, 3),
+            'calls_in_window': len(self._outcomes),
+            'rejected': self._rejected,
+            'timeout_seconds': round(self._timeout, 3)
+        }
+        if self.state == OPEN:
+            state['retry_after_seconds'] = round(max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)), 1)
+        return state
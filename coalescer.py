@@ -0,0 +1,109 @@
+import time
+import logging
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from config import settings
+from tracing import tracer
+from admission import admission_control
+
+logger = logging.getLogger(__name__)
+
+class Coalescer:
+    """Micro-batches calls with the same key arriving within a time window.
+
+    The first call for a key opens a batch and starts the work; calls with the
+    same key arriving before the window closes join the batch and share its
+    result instead of calling the downstream service again.
+    """
+
+    def __init__(self, name: str, window: float = settings.SIGNAL_COALESCE_WINDOW):
+        self.name = name
+        self.window = window
+        # key -> (opened_at, shared task)
+        self._batches: Dict[Hashable, Tuple[float, asyncio.Task]] = {}
+        self._sizes: Dict[Hashable, int] = {}
+
+        self._batch_count = 0
+        self._joined = 0
+        self._max_batch_size = 0
+
+    def _purge(self, now: float) -> None:
+        """Close batches whose window has passed and whose work has finished"""
+        for key in [
+            key for key, (opened_at, task) in self._batches.items()
+            if now - opened_at >= self.window and task.done()
+        ]:
+            del self._batches[key]
+            del self._sizes[key]
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory for the key, or join the open batch for it"""
+        if self.window <= 0:
+            return await factory()
+
+        now = time.monotonic()
+        self._purge(now)
+
+        batch = self._batches.get(key)
+        if batch and now - batch[0] < self.window:
+            self._joined += 1
+            self._sizes[key] += 1
+            self._max_batch_size = max(self._max_batch_size, self._sizes[key])
+            # The shared work is traced by the signal that opened the batch
+            admission_control.join_shared(batch[1])
+            with tracer.span(f"coalesce.{self.name}", joined=True):
+                return await asyncio.shield(batch[1])
+
+        task = admission_control.start_shared(factory())
+        self._batches[key] = (now, task)
+        self._sizes[key] = 1
+        self._batch_count += 1
+        self._max_batch_size = max(self._max_batch_size, 1)
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch sizes and downstream calls saved"""
+        total = self._batch_count + self._joined
+        return {
+            'window_seconds': self.window,
+            'batches': self._batch_count,
+            'avg_batch_size': (total / self._batch_count) if self._batch_count else 0.0,
+            'max_batch_size': self._max_batch_size,
+            'saved_calls': self._joined
+        }
+
+class BatchEnrichment:
+    """Shares enrichment between the signals of one batch request.
+
+    Unlike the time-windowed coalescers, results are shared for the whole
+    lifetime of the batch: news per instrument, and subscribers and the
+    chart per (instrument, timeframe).
+    """
+
+    KINDS = ('news', 'subscribers', 'chart')
+
+    def __init__(self):
+        self.coalescers = {kind: Coalescer(f"batch_{kind}", window=float('inf')) for kind in self.KINDS}
+
+    async def run(self, kind: str, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory once per kind and key within the batch"""
+        return await self.coalescers[kind].run(key, factory)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the downstream calls made and saved per kind of enrichment"""
+        return {
+            kind: {'calls': stats['batches'], 'saved_calls': stats['saved_calls']}
+            for kind, stats in ((kind, coalescer.get_stats()) for kind, coalescer in self.coalescers.items())
+        }
+
+# Create singleton instances
+news_coalescer = Coalescer('news')
+chart_coalescer = Coalescer('chart')
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    """Get statistics of all signal enrichment coalescers"""
+    return {
+        coalescer.name: coalescer.get_stats()
+        for coalescer in (news_coalescer, chart_coalescer)
+    }
@@ -1,6 +1,6 @@
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from pydantic import HttpUrl, Field
 from pydantic_settings import BaseSettings
@@ -27,17 +27,158 @@ class Settings(BaseSettings):
     PROXY_URL: Optional[str] = Field(None)
     PROXY_USERNAME: Optional[str] = Field(None)
     PROXY_PASSWORD: Optional[str] = Field(None)
+    PROXY_PORTS: List[int] = Field(default_factory=lambda: [8000, 8001, 8002, 8003, 8004])
+    PROXY_HEALTH_CHECK_INTERVAL: int = Field(1800)
+    PROXY_TEST_URL: str = Field("https://api.ipify.org?format=json")
+    PROXY_TEST_TIMEOUT: float = Field(10.0)
+    PROXY_SCORE_WINDOW: int = Field(20)
+    PROXY_MAX_CONSECUTIVE_FAILURES: int = Field(3)
     
     # Request Configuration
     MAX_RETRIES: int = Field(3)
     REQUEST_TIMEOUT: int = Field(60)
     
+    # HTTP Connection Pool Configuration
+    HTTP_MAX_CONNECTIONS: int = Field(20)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(10)
+    HTTP_KEEPALIVE_EXPIRY: float = Field(30.0)
+    HTTP_CONNECT_TIMEOUT: float = Field(10.0)
+    HTTP2_ENABLED: bool = Field(False)
+    
+    # Per-service request timeouts (seconds), falling back to REQUEST_TIMEOUT
+    SERVICE_TIMEOUTS: Dict[str, float] = Field(default_factory=lambda: {
+        'signal_ai': 60,
+        'news_ai': 60,
+        'matcher': 15,
+        'telegram': 30,
+        'chart': 30
+    })
+    
+    # Circuit Breaker Configuration (per downstream service)
+    BREAKER_WINDOW_SIZE: int = Field(20)
+    BREAKER_MIN_CALLS: int = Field(5)
+    BREAKER_FAILURE_RATE: float = Field(0.5)
+    BREAKER_SLOW_CALL_SECONDS: float = Field(20.0)
+    BREAKER_SLOW_CALL_RATE: float = Field(0.8)
+    BREAKER_OPEN_SECONDS: float = Field(30.0)
+    BREAKER_HALF_OPEN_CALLS: int = Field(1)
+    
+    # Adaptive timeouts derived from recent latency (p99 x multiplier, capped by SERVICE_TIMEOUTS)
+    ADAPTIVE_TIMEOUT_ENABLED: bool = Field(True)
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = Field(3.0)
+    ADAPTIVE_TIMEOUT_MIN: float = Field(2.0)
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = Field(20)
+    ADAPTIVE_TIMEOUT_WINDOW: int = Field(200)
+    
+    # Retries (up to MAX_RETRIES) with jittered exponential backoff and a per-service budget
+    RETRY_BACKOFF_BASE: float = Field(0.2)
+    RETRY_BACKOFF_MAX: float = Field(5.0)
+    RETRY_BUDGET_MAX_TOKENS: float = Field(10.0)
+    RETRY_BUDGET_TOKEN_RATIO: float = Field(0.1)
+    
+    # Hedged requests for idempotent reads, sent after the observed p95 latency
+    HEDGING_ENABLED: bool = Field(True)
+    HEDGE_PERCENTILE: float = Field(0.95)
+    HEDGE_MIN_SAMPLES: int = Field(20)
+    
+    # In-memory blob store for chart images, and charts cached per candle
+    BLOB_STORE_MAX_BYTES: int = Field(64 * 1024 * 1024)
+    CHART_CACHE_MAX_ENTRIES: int = Field(512)
+    CHART_CACHE_DEFAULT_CANDLE_SECONDS: int = Field(60)
+    
+    # Telegram fan-out: chat ids are sent in chunks under Telegram's broadcast limit
+    TELEGRAM_CHUNK_SIZE: int = Field(25)
+    TELEGRAM_CHUNK_CONCURRENCY: int = Field(4)
+    TELEGRAM_RATE_LIMIT: float = Field(30.0)  # messages per second
+    TELEGRAM_RATE_BURST: float = Field(30.0)
+    TELEGRAM_CHUNK_RETRIES: int = Field(2)
+    TELEGRAM_CHART_UPLOAD_PATH: str = Field("/upload-chart")
+    
+    # Per-stage timeouts (seconds) for the signal pipeline
+    STAGE_TIMEOUTS: Dict[str, float] = Field(default_factory=lambda: {
+        'news': 60,
+        'subscribers': 15,
+        'chart': 30,
+        'analysis': 45,
+        'format': 45,
+        'telegram': 30
+    })
+    
+    # Signal Queue Configuration (accept-and-queue mode for /trading-signal)
+    SIGNAL_QUEUE_ENABLED: bool = Field(False)
+    SIGNAL_QUEUE_WORKERS: int = Field(4)
+    SIGNAL_QUEUE_MAX_SIZE: int = Field(1000)
+    SIGNAL_JOB_HISTORY: int = Field(1000)
+    
+    # Duplicate Signal Suppression
+    IDEMPOTENCY_ENABLED: bool = Field(True)
+    IDEMPOTENCY_TTL: float = Field(300)
+    IDEMPOTENCY_MAX_KEYS: int = Field(10000)
+    
+    # Seconds during which signals for the same instrument share news and charts (0 disables)
+    SIGNAL_COALESCE_WINDOW: float = Field(5.0)
+    
+    # Batch webhook: signals per request and signals processed at once
+    BATCH_MAX_SIGNALS: int = Field(100)
+    BATCH_CONCURRENCY: int = Field(8)
+    
+    # Admission control: signal pipelines and /get-news requests running at once, with signals
+    # served first; a full queue or a wait longer than the timeout is answered with 429/503
+    ADMISSION_MAX_CONCURRENCY: int = Field(32)
+    ADMISSION_MAX_QUEUE: int = Field(100)
+    ADMISSION_QUEUE_TIMEOUT: float = Field(5.0)
+    # Per resource class caps; browser pages are capped by BROWSER_POOL_MAX_CONCURRENCY
+    ADMISSION_AI_CONCURRENCY: int = Field(8)
+    ADMISSION_TELEGRAM_CONCURRENCY: int = Field(8)
+    
+    # Durable Signal Store Configuration
+    SIGNAL_STORE_ENABLED: bool = Field(False)
+    SIGNAL_STORE_PATH: str = Field("data/signals.db")
+    SIGNAL_STORE_FSYNC: bool = Field(True)
+    SIGNAL_STORE_COMMIT_INTERVAL_MS: float = Field(2.0)
+    SIGNAL_STORE_RETENTION_DAYS: float = Field(7)
+    # Seconds without a heartbeat after which another worker may resume a worker's unfinished signals
+    SIGNAL_STORE_CLAIM_TTL: float = Field(60.0)
+    
+    # Cross-worker shared state (SQLite file) for metrics, news/chart caches and dedup
+    SHARED_STATE_ENABLED: bool = Field(False)
+    SHARED_STATE_PATH: str = Field("data/shared_state.db")
+    SHARED_STATE_PUBLISH_INTERVAL: float = Field(1.0)
+    SHARED_STATE_WORKER_TTL: float = Field(30.0)
+    
     # Monitoring Configuration
     LOG_LEVEL: str = Field("INFO")
     ENABLE_MONITORING: bool = Field(True)
     
+    # Event loop lag probe, and a watchdog capturing the stack of callbacks blocking the loop
+    LOOP_LAG_PROBE_INTERVAL: float = Field(0.1)
+    LOOP_LAG_WINDOW: int = Field(600)  # recent samples behind the health status
+    LOOP_LAG_DEGRADED_SECONDS: float = Field(0.25)  # recent p99 lag that degrades /health
+    LOOP_WATCHDOG_ENABLED: bool = Field(False)
+    LOOP_WATCHDOG_THRESHOLD: float = Field(0.5)
+    LOOP_WATCHDOG_MAX_CAPTURES: int = Field(20)
+
+    # In-process tracing: spans per signal, the slowest and most recent traces kept in memory
+    TRACING_ENABLED: bool = Field(True)
+    TRACE_BUFFER_SIZE: int = Field(50)
+    TRACE_MAX_SPANS: int = Field(500)  # per trace; further spans are counted as dropped
+    TRACE_OTLP_FILE: Optional[str] = Field(None)  # append finished traces as OTLP/JSON lines
+    TRACE_SERVICE_NAME: str = Field("tradingview-signal-processor")
+
     # News Scraping Configuration
+    TRADINGVIEW_BASE_URL: str = Field("https://www.tradingview.com")
+    NEWS_SCRAPER_BACKEND: str = Field("auto")  # auto, http or playwright
+    TRADINGVIEW_USERNAME: Optional[str] = Field(None)
+    TRADINGVIEW_PASSWORD: Optional[str] = Field(None)
+    TRADINGVIEW_SESSION_PATH: str = Field("data/tradingview_session.json")
+    TRADINGVIEW_SESSION_MAX_AGE: int = Field(7 * 24 * 3600)
+    TRADINGVIEW_SESSION_COOKIE: str = Field("sessionid")
     MAX_NEWS_ARTICLES: int = Field(3)
+    NEWS_PARALLEL_ARTICLES: bool = Field(True)
+    NEWS_ARTICLE_CONCURRENCY: int = Field(3)
+    NEWS_ARTICLE_TIMEOUT: int = Field(15)
+    NEWS_CACHE_TTL: int = Field(300)
+    NEWS_CACHE_MAX_ENTRIES: int = Field(256)
     WANTED_NEWS_PROVIDERS: set = Field(default_factory=lambda: {
         'reuters',
         'forexlive',
@@ -45,6 +186,23 @@ class Settings(BaseSettings):
         'trading economics'
     })
     
+    # Browser Pool Configuration
+    BROWSER_POOL_MAX_CONCURRENCY: int = Field(4)
+    BROWSER_HEALTH_CHECK_INTERVAL: int = Field(30)
+    
+    # Lightweight scraping profile: request filtering, viewport and motion
+    SCRAPER_BLOCK_RESOURCES: bool = Field(True)
+    SCRAPER_BLOCKED_RESOURCE_TYPES: List[str] = Field(default_factory=lambda: [
+        'image', 'media', 'font', 'stylesheet', 'websocket', 'manifest', 'texttrack'
+    ])
+    SCRAPER_ALLOWED_DOMAINS: List[str] = Field(default_factory=lambda: ['tradingview.com'])
+    SCRAPER_BLOCKED_DOMAINS: List[str] = Field(default_factory=lambda: [
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+        'facebook.net', 'hotjar.com', 'snap.licdn.com', 'telemetry.tradingview.com'
+    ])
+    SCRAPER_VIEWPORT_WIDTH: int = Field(800)
+    SCRAPER_VIEWPORT_HEIGHT: int = Field(600)
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -84,6 +242,9 @@ def validate_settings() -> None:
     if not settings.SUPABASE_KEY:
         logger.warning("SUPABASE_KEY is not set. Some features may be limited.")
     
+    if not settings.TRADINGVIEW_USERNAME or not settings.TRADINGVIEW_PASSWORD:
+        logger.warning("TradingView credentials are not set. Articles behind the login wall will be skipped.")
+    
     if not settings.PROXY_URL or not settings.PROXY_USERNAME or not settings.PROXY_PASSWORD:
         logger.warning("Proxy settings are not complete. Running without proxy support.")
 
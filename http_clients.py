@@ -0,0 +1,352 @@
+import logging
+import time
+import asyncio
+from typing import Any, Callable, Dict, Optional
+import httpx
+
+from config import settings, get_service_headers
+from admission import admission_control
+from circuit_breaker import CircuitBreaker
+from retry import RETRYABLE_STATUS_CODES, RetryBudget, backoff_delay
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees its connection slot once closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper tracking in-flight requests and time spent waiting for a connection"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_connections: int):
+        self.transport = transport
+        self.max_connections = max_connections
+        self.active = 0
+        self.waiting = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._slots = asyncio.Semaphore(max_connections)
+
+    def _release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - start
+        self.wait_count += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.active += 1
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+
+        if isinstance(response.stream, httpx.ByteStream):
+            # Already fully buffered, no connection is held
+            self._release()
+        else:
+            response.stream = _ReleasingStream(response.stream, self._release)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilisation statistics"""
+        stats = {
+            'active': self.active,
+            'waiting': self.waiting,
+            'max_connections': self.max_connections,
+            'wait_avg_ms': (self.wait_total / self.wait_count * 1000) if self.wait_count else 0.0,
+            'wait_max_ms': self.wait_max * 1000
+        }
+
+        # Open/idle connection counts are only available from the httpcore pool
+        pool = getattr(self.transport, '_pool', None)
+        connections = getattr(pool, 'connections', None)
+        if connections is not None:
+            stats['connections_open'] = len(connections)
+            stats['connections_idle'] = sum(1 for connection in connections if connection.is_idle())
+
+        return stats
+
+class ServiceClient:
+    """Long-lived HTTP client for a single downstream service"""
+
+    def __init__(self, name: str, base_url: str, timeout: float, resource_class: Optional[str] = None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        # Admission control class whose concurrency cap this service's calls count against
+        self.resource_class = resource_class
+        self.client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[_MeteredTransport] = None
+        self.breaker = CircuitBreaker(name, max_timeout=timeout)
+        self.retry_budget = RetryBudget()
+
+    async def start(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Create the pooled client"""
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                verify=True,  # Enable SSL verification
+                http2=http2_available(),
+                limits=limits
+            )
+
+        self._transport = _MeteredTransport(transport, settings.HTTP_MAX_CONNECTIONS)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+            # httpx sets Content-Type per request body (JSON or multipart), a client default would override it
+            headers={name: value for name, value in get_service_headers().items() if name != 'Content-Type'},
+            transport=self._transport
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        idempotent: Optional[bool] = None,
+        hedge: bool = False,
+        retry_status: Optional[bool] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request to the service with retries, hedging and a circuit breaker.
+
+        Connection failures are retried for every request; timeouts and
+        429/502/503/504 responses only for idempotent ones (GET by default).
+        retry_status=True also retries those responses for a non-idempotent
+        call, for POSTs that the service rejects before doing any work.
+        Retries back off exponentially with jitter and stop when the service's
+        retry budget runs low. Raises CircuitOpenError without calling the
+        service while the circuit is open. 5xx responses are still returned.
+        Calls to services in an admission resource class first wait for a
+        slot, raising AdmissionRejected when none frees up in time.
+        """
+        if self.client is None:
+            raise RuntimeError(f"HTTP client for {self.name} is not started")
+        if idempotent is None:
+            idempotent = method in ('GET', 'HEAD')
+        if retry_status is None:
+            retry_status = idempotent
+
+        if self.resource_class:
+            async with admission_control.slot(self.resource_class):
+                return await self._request(method, path, idempotent, hedge, retry_status, **kwargs)
+        return await self._request(method, path, idempotent, hedge, retry_status, **kwargs)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool,
+        hedge: bool,
+        retry_status: bool,
+        **kwargs: Any
+    ) -> httpx.Response:
+        attempt = 0
+        with tracer.span(f"http.{self.name}", method=method, path=path) as span:
+            while True:
+                span.set('attempts', attempt + 1)
+                try:
+                    if hedge and idempotent and settings.HEDGING_ENABLED:
+                        response = await self._send_hedged(method, path, **kwargs)
+                    else:
+                        response = await self._send(method, path, **kwargs)
+                except httpx.TransportError as e:
+                    retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                    if not self._should_retry(attempt, retryable):
+                        raise
+                    logger.warning(f"Retrying {method} {self.name}{path} after {type(e).__name__}")
+                else:
+                    if (response.status_code not in RETRYABLE_STATUS_CODES
+                            or not self._should_retry(attempt, retry_status)):
+                        if response.status_code < 500:
+                            self.retry_budget.record_success()
+                        span.set('status_code', response.status_code)
+                        return response
+                    logger.warning(f"Retrying {method} {self.name}{path} after HTTP {response.status_code}")
+                    await response.aclose()
+
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+
+    def _should_retry(self, attempt: int, retryable: bool) -> bool:
+        """Check whether a failed attempt may be retried"""
+        if not retryable or attempt >= settings.MAX_RETRIES:
+            self.retry_budget.record_failure()
+            return False
+        return self.retry_budget.acquire_retry()
+
+    async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send a single attempt through the circuit breaker"""
+        timeout = self.breaker.before_call()
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = httpx.Timeout(timeout, connect=min(timeout, settings.HTTP_CONNECT_TIMEOUT))
+
+        start = time.perf_counter()
+        try:
+            with tracer.span('http.attempt') as span:
+                response = await self.client.request(method, path, **kwargs)
+                span.set('status_code', response.status_code)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except httpx.TimeoutException:
+            self.breaker.record_failure(timed_out=True)
+            raise
+        except BaseException:
+            self.breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success(time.perf_counter() - start)
+        return response
+
+    async def _send_hedged(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send an attempt, plus a second one if the first outlasts the usual p95 latency.
+
+        The first usable response wins and the other request is cancelled.
+        """
+        delay = self.breaker.latency_percentile(settings.HEDGE_PERCENTILE, settings.HEDGE_MIN_SAMPLES)
+        if delay is None:
+            return await self._send(method, path, **kwargs)
+
+        primary = asyncio.ensure_future(self._send(method, path, **kwargs))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done or not self.retry_budget.can_retry():
+                return await primary
+
+            self.retry_budget.hedges += 1
+            hedged = asyncio.ensure_future(self._send(method, path, **kwargs))
+            pending = {primary, hedged}
+            fallback: Optional[asyncio.Future] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code < 500:
+                        if task is hedged:
+                            self.retry_budget.hedge_wins += 1
+                        return task.result()
+                    fallback = fallback or task
+            # Neither attempt succeeded: surface the first failure
+            return fallback.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request('POST', path, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        if self._transport is None:
+            return {}
+        return self._transport.get_stats()
+
+    async def close(self) -> None:
+        """Close the client and its connections"""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+            self._transport = None
+
+def http2_available() -> bool:
+    """Check whether HTTP/2 is enabled and the h2 package is installed"""
+    if not settings.HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("HTTP2_ENABLED is set but the h2 package is not installed. Using HTTP/1.1.")
+        return False
+
+class ServiceClients:
+    """App-scoped registry of downstream service clients"""
+
+    def __init__(self):
+        timeouts = settings.SERVICE_TIMEOUTS
+        self.signal_ai = ServiceClient('signal_ai', settings.SIGNAL_AI_SERVICE_URL, timeouts.get('signal_ai', settings.REQUEST_TIMEOUT), 'ai')
+        self.news_ai = ServiceClient('news_ai', settings.NEWS_AI_SERVICE_URL, timeouts.get('news_ai', settings.REQUEST_TIMEOUT), 'ai')
+        self.matcher = ServiceClient('matcher', settings.SUBSCRIBER_MATCHER_URL, timeouts.get('matcher', settings.REQUEST_TIMEOUT))
+        self.telegram = ServiceClient('telegram', settings.TELEGRAM_SERVICE_URL, timeouts.get('telegram', settings.REQUEST_TIMEOUT), 'telegram')
+        self.chart = ServiceClient('chart', settings.CHART_SERVICE_URL, timeouts.get('chart', settings.REQUEST_TIMEOUT))
+        self.services = {
+            client.name: client
+            for client in (self.signal_ai, self.news_ai, self.matcher, self.telegram, self.chart)
+        }
+
+    async def initialize(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Start all service clients, optionally sharing a custom transport"""
+        for client in self.services.values():
+            await client.start(transport)
+        logger.info(f"Started HTTP clients for {', '.join(self.services)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics per service"""
+        return {name: client.get_stats() for name, client in self.services.items()}
+
+    def get_breaker_states(self) -> Dict[str, Any]:
+        """Get circuit breaker state per service"""
+        states = {name: client.breaker.get_state() for name, client in self.services.items()}
+        return {
+            'healthy': all(state['state'] == 'closed' for state in states.values()),
+            'services': states
+        }
+
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """Get retry and hedging counters per service"""
+        return {name: client.retry_budget.get_stats() for name, client in self.services.items()}
+
+    async def cleanup(self) -> None:
+        """Close all service clients"""
+        for client in self.services.values():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client for {client.name}: {str(e)}")
+
+# Create singleton instance
+service_clients = ServiceClients()
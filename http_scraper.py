@@ -0,0 +1,232 @@
+import time
+import logging
+import asyncio
+from datetime import datetime
+from typing import Any, List, Dict, Optional
+from urllib.parse import urljoin, urlsplit
+import httpx
+import pytz
+
+from config import settings
+from monitoring import monitor
+from tracing import tracer
+from proxy_manager import proxy_manager, ProxyManager
+from session_store import session_store, SessionStore
+from scraper_backend import (
+    NewsBackend, ScraperWallError, HEADLINE_SELECTOR, NEWS_LIST_SELECTOR,
+    ARTICLE_BODY_SELECTOR, PROVIDER_SELECTOR, DATE_SELECTOR
+)
+
+logger = logging.getLogger(__name__)
+
+# Sent so TradingView serves the same server-rendered pages a browser gets
+BROWSER_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9'
+}
+
+def html_parser_available() -> bool:
+    """Check whether the selectolax HTML parser is installed"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _parse(html: str) -> Any:
+    from selectolax.lexbor import LexborHTMLParser
+    return LexborHTMLParser(html)
+
+def _closest(node: Any, tag: str) -> Optional[Any]:
+    """Nearest ancestor-or-self element with the given tag"""
+    while node is not None and node.tag != tag:
+        node = node.parent
+    return node
+
+def parse_headlines(html: str, base_url: str, limit: int) -> List[Dict[str, Optional[str]]]:
+    """Extract link, title, provider and date of the listed headlines.
+
+    Raises ScraperWallError when the news list is not server-rendered.
+    """
+    tree = _parse(html)
+    if tree.css_first(NEWS_LIST_SELECTOR) is None and tree.css_first(HEADLINE_SELECTOR) is None:
+        raise ScraperWallError('js', base_url)
+
+    headlines = []
+    for element in tree.css(HEADLINE_SELECTOR):
+        anchor = _closest(element, 'a')
+        href = anchor.attributes.get('href') if anchor is not None else None
+        if not href:
+            continue
+
+        article = _closest(element, 'article')
+        provider = article.css_first(PROVIDER_SELECTOR) if article is not None else None
+        date = article.css_first(DATE_SELECTOR) if article is not None else None
+        headlines.append({
+            'url': urljoin(base_url, href),
+            'title': element.text(strip=True),
+            'provider': provider.text(strip=True) if provider is not None else None,
+            'date': date.text(strip=True) if date is not None else None
+        })
+        if len(headlines) >= limit:
+            break
+    return headlines
+
+def parse_article(html: str, url: str) -> List[str]:
+    """Extract the article paragraphs; raises ScraperWallError behind a login wall"""
+    tree = _parse(html)
+    body = tree.css_first(ARTICLE_BODY_SELECTOR)
+    if body is None:
+        if tree.css_first('input[name="password"]') is not None:
+            raise ScraperWallError('login', url)
+        return []
+    return [text for text in (p.text(strip=True) for p in body.css('p')) if text]
+
+class HttpNewsScraper(NewsBackend):
+    """Scrapes server-rendered TradingView news pages without a browser.
+
+    Requests go through the same scored proxy pool and stored login session
+    as the browser backend, with one pooled client per proxy.
+    """
+
+    name = 'http'
+
+    def __init__(
+        self,
+        base_url: str = settings.TRADINGVIEW_BASE_URL,
+        proxies: Optional[ProxyManager] = None,
+        session: Optional[SessionStore] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.proxies = proxies or proxy_manager
+        self.session = session or session_store
+        # Pooled clients keyed by proxy server, None for direct connections
+        self.clients: Dict[Optional[str], httpx.AsyncClient] = {}
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._page_latency = monitor.histogram('scraper', 'http_page_load')
+        self._article_latency = monitor.histogram('scraper', 'http_article_extraction')
+
+    def start(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Use the given transport for every client instead of the network"""
+        self._transport = transport
+
+    def _client(self, proxy: Optional[Dict[str, str]]) -> httpx.AsyncClient:
+        """Pooled client connecting through the proxy"""
+        key = proxy['server'] if proxy else None
+        client = self.clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers=BROWSER_HEADERS,
+                timeout=httpx.Timeout(settings.NEWS_ARTICLE_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.NEWS_ARTICLE_CONCURRENCY + 1,
+                    max_keepalive_connections=settings.NEWS_ARTICLE_CONCURRENCY + 1,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+                ),
+                follow_redirects=True,
+                # An injected transport replaces the network, proxies included
+                proxy=self.proxies.get_proxy_url(proxy) if proxy and self._transport is None else None,
+                transport=self._transport
+            )
+            self.clients[key] = client
+        return client
+
+    def _session_headers(self) -> Dict[str, str]:
+        """Cookie header carrying the stored login session, if there is a valid one"""
+        state = self.session.get_state()
+        if not state:
+            return {}
+        host = urlsplit(self.base_url).hostname or ''
+        cookies = [
+            f"{cookie['name']}={cookie['value']}" for cookie in state.get('cookies', [])
+            if host == cookie.get('domain', '').lstrip('.') or host.endswith('.' + cookie.get('domain', '').lstrip('.'))
+        ]
+        return {'Cookie': '; '.join(cookies)} if cookies else {}
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> str:
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        return response.text
+
+    async def fetch_article(
+        self,
+        headline: Dict[str, Optional[str]],
+        client: httpx.AsyncClient,
+        headers: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Fetch a headline's article page and extract its content"""
+        with self._article_latency.time(), tracer.span('scraper.article', url=headline['url']):
+            paragraphs = parse_article(await self._fetch(client, headline['url'], headers), headline['url'])
+
+        return {
+            'title': headline['title'],
+            'content': '\n\n'.join(paragraphs) if paragraphs else headline['title'],
+            'provider': headline['provider'] or "TradingView",
+            'date': headline['date'] or datetime.now(pytz.UTC).isoformat(),
+            'url': headline['url']
+        }
+
+    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
+        """Get news articles over plain HTTP; raises ScraperWallError if a browser is needed for all of them"""
+        with tracer.span('scraper.http', instrument=instrument) as span:
+            articles = await self._get_news(instrument, max_articles)
+            span.set('articles', len(articles))
+            return articles
+
+    async def _get_news(self, instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        with tracer.span('scraper.get_proxy'):
+            proxy = await self.proxies.get_proxy()
+        if not proxy and self.proxies.proxy_pool:
+            logger.warning("No working proxy available, connecting directly")
+        client = self._client(proxy)
+        headers = self._session_headers()
+
+        url = f"{self.base_url}/symbols/{instrument}/news/"
+        start = time.perf_counter()
+        try:
+            with self._page_latency.time(), tracer.span('scraper.page_load', url=url):
+                html = await self._fetch(client, url, headers)
+        except httpx.TransportError:
+            self.proxies.record_result(proxy, False)
+            raise
+        self.proxies.record_result(proxy, True, time.perf_counter() - start)
+        headlines = parse_headlines(html, url, max_articles)
+
+        semaphore = asyncio.Semaphore(settings.NEWS_ARTICLE_CONCURRENCY)
+
+        async def fetch(headline: Dict[str, Optional[str]]) -> Optional[Dict[str, str]]:
+            async with semaphore:
+                try:
+                    return await self.fetch_article(headline, client, headers)
+                except ScraperWallError:
+                    raise
+                except Exception as e:
+                    if isinstance(e, httpx.TransportError):
+                        self.proxies.record_result(proxy, False)
+                    logger.warning(f"Error getting article content: {str(e)}")
+                    return None
+
+        # A wall on one article must not throw away the others that were fetched
+        results = await asyncio.gather(*(fetch(headline) for headline in headlines), return_exceptions=True)
+        walls = [result for result in results if isinstance(result, ScraperWallError)]
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, ScraperWallError):
+                raise result
+        articles = [article for article in results if isinstance(article, dict)]
+        if walls:
+            if not articles:
+                # Nothing came back, so the browser backend has to take over
+                raise walls[0]
+            logger.info(f"Skipped {len(walls)} articles behind a {walls[0].kind} wall for {instrument}")
+        logger.info(f"Found {len(articles)} articles for {instrument} over HTTP")
+        return articles
+
+    async def close(self) -> None:
+        """Close the clients and their connections"""
+        clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            await client.aclose()
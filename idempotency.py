@@ -0,0 +1,131 @@
+import json
+import time
+import hashlib
+import logging
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+
+from config import settings
+from shared_state import shared_state, SharedState
+
+logger = logging.getLogger(__name__)
+
+# Signal fields identifying a re-delivered TradingView alert
+SIGNAL_KEY_FIELDS = ("instrument", "action", "price", "stoploss", "takeprofit", "timeframe", "timestamp")
+
+def signal_key(signal: Any) -> str:
+    """Hash the identifying fields of a signal into an idempotency key"""
+    fields = {field: getattr(signal, field, None) for field in SIGNAL_KEY_FIELDS}
+    encoded = json.dumps(fields, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+class IdempotencyStore:
+    """Bounded, time-windowed store of in-flight and completed request results.
+
+    A duplicate arriving while the original is still running awaits the same
+    task and receives its result instead of running again. Failed requests are
+    forgotten so a retry can run.
+
+    When the shared state is open, keys are also claimed across workers; a
+    duplicate of a request claimed by another worker waits for that worker's
+    result, so results must then be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.IDEMPOTENCY_TTL,
+        max_keys: int = settings.IDEMPOTENCY_MAX_KEYS,
+        shared: SharedState = shared_state
+    ):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.shared = shared
+        # key -> (created_at, task), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, asyncio.Task]]" = OrderedDict()
+        # Shared-state writes scheduled from task callbacks, kept referenced until done
+        self._pending_writes: Set[asyncio.Task] = set()
+        self._duplicates = 0
+        self._inflight_joins = 0
+        self._remote_duplicates = 0
+
+    def _purge(self, now: float) -> None:
+        """Drop expired keys and the oldest keys beyond the size bound"""
+        while self._entries:
+            key, (created_at, task) = next(iter(self._entries.items()))
+            if now - created_at < self.ttl and len(self._entries) <= self.max_keys:
+                break
+            del self._entries[key]
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run factory once per key within the window; returns (result, is_duplicate)"""
+        now = time.monotonic()
+        self._purge(now)
+
+        entry = self._entries.get(key)
+        if entry:
+            task = entry[1]
+            self._duplicates += 1
+            if not task.done():
+                self._inflight_joins += 1
+            logger.info(f"Duplicate request for idempotency key {key[:12]}")
+            return await asyncio.shield(task), True
+
+        # Another worker may own the key; wait for its result unless it fails
+        while self.shared.is_open and not await self._claim(key):
+            entry = self._entries.get(key)
+            if entry:
+                # Claimed by a concurrent request in this worker
+                self._duplicates += 1
+                return await asyncio.shield(entry[1]), True
+
+            completed, result = await self.shared.wait_claim(key, self.ttl)
+            if completed:
+                self._duplicates += 1
+                self._remote_duplicates += 1
+                logger.info(f"Duplicate request for idempotency key {key[:12]} handled by another worker")
+                return result, True
+
+        task = asyncio.ensure_future(factory())
+        self._entries[key] = (time.monotonic(), task)
+        task.add_done_callback(lambda done: self._on_done(key, done))
+        return await asyncio.shield(task), False
+
+    async def _claim(self, key: str) -> bool:
+        """Claim a key across workers; an unavailable shared state falls back to this worker alone"""
+        try:
+            return await self.shared.claim(key, self.ttl)
+        except Exception as e:
+            logger.error(f"Error claiming idempotency key across workers: {str(e)}")
+            return True
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a key whose request failed so a retry is processed again, and publish the outcome"""
+        failed = task.cancelled() or task.exception() is not None
+        if failed:
+            entry = self._entries.get(key)
+            if entry and entry[1] is task:
+                del self._entries[key]
+
+        if self.shared.is_open:
+            write = self.shared.release_claim(key) if failed else self.shared.complete_claim(key, task.result())
+            pending = asyncio.ensure_future(write)
+            self._pending_writes.add(pending)
+            pending.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task) -> None:
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error publishing idempotency result: {str(task.exception())}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get duplicate suppression statistics"""
+        return {
+            'keys': len(self._entries),
+            'duplicates': self._duplicates,
+            'inflight_joins': self._inflight_joins,
+            'remote_duplicates': self._remote_duplicates
+        }
+
+# Create singleton instance
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,162 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from config import settings
+from monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Finer than the request latency buckets: lag that matters starts around a millisecond
+LAG_BUCKETS = (
+    0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+    0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0
+)
+
+# Innermost frames kept from a blocked loop's stack
+MAX_STACK_FRAMES = 20
+
+class LoopMonitor:
+    """Event loop lag probe with an optional slow-callback watchdog thread.
+
+    The probe sleeps for a fixed interval and records how much later than
+    requested it woke up; that delay is time the loop spent running other
+    callbacks. The watchdog thread notices when the probe stops ticking for
+    longer than a threshold and captures the stack of the loop thread, which
+    is the code blocking the loop at that moment.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.LOOP_LAG_PROBE_INTERVAL,
+        window: int = settings.LOOP_LAG_WINDOW,
+        degraded_lag: float = settings.LOOP_LAG_DEGRADED_SECONDS,
+        watchdog: bool = settings.LOOP_WATCHDOG_ENABLED,
+        watchdog_threshold: float = settings.LOOP_WATCHDOG_THRESHOLD,
+        max_captures: int = settings.LOOP_WATCHDOG_MAX_CAPTURES
+    ):
+        self.interval = interval
+        self.degraded_lag = degraded_lag
+        self.watchdog = watchdog
+        self.watchdog_threshold = watchdog_threshold
+        self.histogram = monitor.histogram('event_loop', 'lag', LAG_BUCKETS)
+        # Recent lag samples, so health reflects the last minute rather than the whole uptime
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._captures: Deque[Dict[str, Any]] = deque(maxlen=max_captures)
+
+        self._probe: Optional[asyncio.Task] = None
+        self._watchdog_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # Written by the loop, read by the watchdog thread
+        self._last_tick = time.monotonic()
+        self._stalled = False
+        self._max_lag = 0.0
+        self._stalls = 0
+
+    def start(self) -> None:
+        """Start the lag probe on the running loop, and the watchdog thread if enabled"""
+        if self._probe:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._probe = asyncio.ensure_future(self._probe_loop())
+        if self.watchdog:
+            self._stop.clear()
+            self._watchdog_thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+            self._watchdog_thread.start()
+        logger.info(
+            f"Event loop lag probe started (every {self.interval * 1000:.0f} ms"
+            + (f", watchdog at {self.watchdog_threshold * 1000:.0f} ms)" if self.watchdog else ")")
+        )
+
+    async def _probe_loop(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_tick = now
+            self.record(max(0.0, now - start - self.interval))
+
+    def record(self, lag: float) -> None:
+        """Record one scheduling delay in seconds"""
+        self.histogram.observe(lag)
+        self._recent.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        if self._stalled:
+            # The blocking callback finished: complete the capture with how long it actually took
+            self._stalled = False
+            if self._captures:
+                self._captures[-1]['blocked_ms'] = round(lag * 1000, 1)
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack once per stall"""
+        check_every = min(self.watchdog_threshold / 4, self.interval)
+        while not self._stop.wait(check_every):
+            overdue = time.monotonic() - self._last_tick - self.interval
+            if overdue < self.watchdog_threshold or self._stalled:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._stalled = True
+            self._stalls += 1
+            stack = traceback.format_stack(frame)[-MAX_STACK_FRAMES:]
+            self._captures.append({
+                'detected_at': time.time(),
+                'blocked_ms': round(overdue * 1000, 1),
+                'stack': [line.rstrip() for line in stack]
+            })
+            logger.warning(
+                f"Event loop blocked for over {overdue * 1000:.0f} ms in:\n" + ''.join(stack[-3:]).rstrip()
+            )
+
+    def recent_percentile(self, q: float) -> float:
+        """q-th percentile (0-1) of the recent lag samples in seconds"""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recent lag percentiles, stall count and the captured slow-callback stacks"""
+        return {
+            'lag_p50_ms': round(self.recent_percentile(0.5) * 1000, 2),
+            'lag_p99_ms': round(self.recent_percentile(0.99) * 1000, 2),
+            'lag_max_ms': round(self._max_lag * 1000, 2),
+            'samples': self.histogram.count,
+            'watchdog_enabled': self.watchdog,
+            'stalls': self._stalls,
+            'slow_callbacks': list(self._captures)
+        }
+
+    def get_health(self) -> Dict[str, Any]:
+        """Health check: degraded while recent p99 lag exceeds the threshold"""
+        p99 = self.recent_percentile(0.99)
+        captures: List[Dict[str, Any]] = list(self._captures)
+        return {
+            'healthy': p99 <= self.degraded_lag,
+            'lag_p99_ms': round(p99 * 1000, 2),
+            'threshold_ms': round(self.degraded_lag * 1000, 2),
+            'stalls': self._stalls,
+            'last_slow_callback': captures[-1] if captures else None
+        }
+
+    async def stop(self) -> None:
+        """Stop the probe and the watchdog thread"""
+        self._stop.set()
+        if self._watchdog_thread:
+            self._watchdog_thread.join(timeout=1.0)
+            self._watchdog_thread = None
+        if self._probe:
+            self._probe.cancel()
+            await asyncio.gather(self._probe, return_exceptions=True)
+            self._probe = None
+
+# Create singleton instance
+loop_monitor = LoopMonitor()
@@ -1,17 +1,34 @@
 import logging
 import traceback
 import asyncio
-import base64
-from typing import List, Dict, Any, Optional, Union
-from fastapi import FastAPI, HTTPException, Depends
+import uuid
+from typing import List, Dict, Any, Optional, Union, Awaitable, Callable, Set, Tuple
+from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-import httpx
 from datetime import datetime
 
-from config import settings, get_service_headers, get_supabase_headers
-from news_scraper import get_news_articles
+from config import settings
+from news_cache import news_cache
 from monitoring import monitor
+from loop_monitor import loop_monitor
 from proxy_manager import proxy_manager
+from pipeline import Stage, StageGraph
+from browser_pool import browser_pool
+from scrape_profile import scrape_profile
+from news_scraper import news_backends
+from session_store import session_store
+from telegram_delivery import telegram_delivery
+from blob_store import blob_store
+from chart_cache import chart_cache
+from http_clients import service_clients, ServiceClients, ServiceClient
+from signal_queue import signal_queue, SignalJob
+from signal_store import signal_store
+from shared_state import shared_state
+from tracing import tracer
+from admission import admission_control, AdmissionRejected, PRIORITY_SIGNAL, PRIORITY_NEWS
+from idempotency import idempotency_store, signal_key
+from coalescer import news_coalescer, chart_coalescer, get_coalescing_stats, BatchEnrichment
 
 # Initialize FastAPI app
 app = FastAPI(title="TradingView Signal Processor")
@@ -20,6 +37,9 @@ app = FastAPI(title="TradingView Signal Processor")
 logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+# Keep references to fire-and-forget pipeline runs so they are not garbage collected
+background_tasks: Set[asyncio.Task] = set()
+
 class TradingSignal(BaseModel):
     instrument: str
     action: str
@@ -30,29 +50,26 @@ class TradingSignal(BaseModel):
     stoploss: float
     takeprofit: float
 
-async def get_http_client():
-    """Get HTTP client with default configuration"""
-    async with httpx.AsyncClient(
-        timeout=settings.REQUEST_TIMEOUT,
-        verify=True,  # Enable SSL verification
-        headers=get_service_headers()
-    ) as client:
-        yield client
+def get_service_clients() -> ServiceClients:
+    """Get the app-scoped downstream service clients"""
+    return service_clients
 
-async def process_news(instrument: str, client: httpx.AsyncClient) -> Dict[str, Any]:
+async def process_news(instrument: str, client: ServiceClient) -> Dict[str, Any]:
     """Process news articles for an instrument"""
     try:
-        articles = await get_news_articles(instrument)
-        monitor.log_news_scrape(len(articles))
+        with monitor.timer('stage', 'news_scrape'):
+            articles = await news_cache.get(instrument, settings.MAX_NEWS_ARTICLES)
         
         if not articles:
             return {}
             
-        response = await client.post(
-            f"{settings.NEWS_AI_SERVICE_URL}/analyze-news",
-            json={"instrument": instrument, "articles": articles}
-        )
-        response.raise_for_status()
+        with monitor.timer('stage', 'news_ai'):
+            response = await client.post(
+                "/analyze-news",
+                json={"instrument": instrument, "articles": articles},
+                retry_status=True
+            )
+            response.raise_for_status()
         return response.json()
         
     except Exception as e:
@@ -62,7 +79,7 @@ async def process_news(instrument: str, client: httpx.AsyncClient) -> Dict[str,
 async def match_subscribers(
     instrument: str,
     timeframe: str,
-    client: httpx.AsyncClient
+    client: ServiceClient
 ) -> List[str]:
     """Match signal with subscribers"""
     try:
@@ -71,11 +88,14 @@ async def match_subscribers(
             logger.warning("Supabase key not set. Skipping subscriber matching.")
             return []
 
-        response = await client.post(
-            f"{settings.SUBSCRIBER_MATCHER_URL}/match-subscribers",
-            json={"instrument": instrument, "timeframe": timeframe}
-        )
-        response.raise_for_status()
+        with monitor.timer('stage', 'matcher'):
+            response = await client.post(
+                "/match-subscribers",
+                json={"instrument": instrument, "timeframe": timeframe},
+                idempotent=True,
+                hedge=True
+            )
+            response.raise_for_status()
         result = response.json()
         return result.get("chat_ids", [])
         
@@ -86,21 +106,25 @@ async def match_subscribers(
 async def get_chart_data(
     instrument: str,
     timeframe: str,
-    client: httpx.AsyncClient
+    client: ServiceClient
 ) -> Optional[str]:
-    """Get chart data from chart service"""
+    """Get a blob reference to the chart image, rendering it once per candle"""
+    async def render() -> bytes:
+        with monitor.timer('stage', 'chart'):
+            response = await client.get(
+                "/chart",
+                params={
+                    "symbol": instrument,
+                    "interval": timeframe,
+                    "theme": "dark"
+                },
+                hedge=True
+            )
+            response.raise_for_status()
+        return response.content
+
     try:
-        response = await client.get(
-            f"{settings.CHART_SERVICE_URL}/chart",
-            params={
-                "symbol": instrument,
-                "interval": timeframe,
-                "theme": "dark"
-            }
-        )
-        response.raise_for_status()
-        # Convert bytes to base64 string for JSON serialization
-        return base64.b64encode(response.content).decode('utf-8')
+        return await chart_cache.get_or_render(instrument, timeframe, render)
         
     except Exception as e:
         logger.error(f"Error getting chart: {str(e)}")
@@ -108,20 +132,21 @@ async def get_chart_data(
 
 async def get_ai_analysis(
     signal_data: Dict[str, Any],
-    client: httpx.AsyncClient
+    client: ServiceClient
 ) -> Dict[str, Any]:
     """Get AI analysis of the signal"""
     try:
-        # Create a copy of signal_data without chart_data for AI analysis
+        # Create a copy of signal_data without the chart for AI analysis
         analysis_data = signal_data.copy()
-        if 'chart_data' in analysis_data:
-            del analysis_data['chart_data']
+        analysis_data.pop('chart_ref', None)
 
-        response = await client.post(
-            f"{settings.SIGNAL_AI_SERVICE_URL}/analyze-signal",
-            json=analysis_data
-        )
-        response.raise_for_status()
+        with monitor.timer('stage', 'signal_ai_analysis'):
+            response = await client.post(
+                "/analyze-signal",
+                json=analysis_data,
+                retry_status=True
+            )
+            response.raise_for_status()
         return response.json()
         
     except Exception as e:
@@ -133,27 +158,32 @@ async def get_ai_analysis(
 
 async def format_signal_message(
     signal_data: Dict[str, Any],
-    client: httpx.AsyncClient
+    client: ServiceClient
 ) -> str:
     """Get formatted signal message"""
     try:
-        # Create a copy of signal_data without chart_data for message formatting
+        # Create a copy of signal_data without the chart for message formatting
         message_data = signal_data.copy()
-        if 'chart_data' in message_data:
-            del message_data['chart_data']
+        message_data.pop('chart_ref', None)
 
-        response = await client.post(
-            f"{settings.SIGNAL_AI_SERVICE_URL}/format-signal",
-            json=message_data
-        )
-        response.raise_for_status()
+        with monitor.timer('stage', 'formatting'):
+            response = await client.post(
+                "/format-signal",
+                json=message_data,
+                retry_status=True
+            )
+            response.raise_for_status()
         result = response.json()
         return result["formatted_message"]
         
     except Exception as e:
         logger.error(f"Error formatting signal: {str(e)}")
         # Provide basic formatting if AI service fails
-        return f"""
+        return format_basic_message(signal_data)
+
+def format_basic_message(signal_data: Dict[str, Any]) -> str:
+    """Basic signal message used when the AI formatter is unavailable"""
+    return f"""
 Signal Alert
 
 Instrument: {signal_data['instrument']}
@@ -168,76 +198,318 @@ Strategy: {signal_data.get('strategy', 'Not specified')}
 async def send_telegram_message(
     signal_data: Dict[str, Any],
     chat_ids: List[str],
-    client: httpx.AsyncClient
-) -> None:
-    """Send signal to Telegram service"""
+    client: ServiceClient
+) -> Dict[str, Any]:
+    """Send signal to Telegram service in rate-limited chunks and return the delivery report"""
     if not chat_ids:
         logger.warning("No chat IDs provided. Skipping Telegram message.")
-        return
+        return {}
 
     try:
-        response = await client.post(
-            f"{settings.TELEGRAM_SERVICE_URL}/send-signal",
-            json={"signal_data": signal_data, "chat_ids": chat_ids}
-        )
-        response.raise_for_status()
+        with monitor.timer('stage', 'telegram_send'):
+            report = await telegram_delivery.deliver(signal_data, chat_ids, client)
+        if report["failed"]:
+            logger.error(f"Telegram delivery failed for {report['failed']} of {report['chats']} chats")
+        return report
         
     except Exception as e:
         logger.error(f"Error sending to Telegram: {str(e)}")
         # Don't raise exception, just log the error
+        return {}
+
+def build_signal_data(signal: TradingSignal) -> Dict[str, Any]:
+    """Format initial signal data"""
+    return {
+        "instrument": signal.instrument,
+        "direction": signal.action,
+        "entry_price": str(signal.price),
+        "stop_loss": str(signal.stoploss),
+        "take_profit": str(signal.takeprofit),
+        "timeframe": signal.timeframe,
+        "strategy": signal.strategy,
+        "timestamp": signal.timestamp or datetime.now().isoformat()
+    }
+
+def apply_stage_results(signal_data: Dict[str, Any], results: Dict[str, Any]) -> None:
+    """Copy the stage results available so far into the signal data"""
+    if results.get("news"):
+        signal_data["news_analysis"] = results["news"].get("sentiment")
+    if "subscribers" in results:
+        signal_data["chat_ids"] = results["subscribers"]
+    if "analysis" in results:
+        signal_data["ai_verdict"] = results["analysis"].get("verdict", "Analysis unavailable")
+        signal_data["risk_reward_ratio"] = results["analysis"].get("risk_reward_ratio", 0.0)
+    if "format" in results:
+        signal_data["formatted_message"] = results["format"]
+
+def build_signal_pipeline(
+    signal: TradingSignal,
+    signal_data: Dict[str, Any],
+    clients: ServiceClients,
+    batch: Optional[BatchEnrichment] = None
+) -> StageGraph:
+    """Build the stage graph for a signal.
+
+    News, subscriber matching and the chart are independent and run
+    concurrently; AI analysis waits for news and subscribers, formatting
+    waits for the analysis and the Telegram send waits for everything.
+    """
+    timeouts = settings.STAGE_TIMEOUTS
+
+    # News (scrape + news AI) is shared per instrument and charts per
+    # (instrument, timeframe) across signals arriving in the same window
+    # Signals of one batch request additionally share enrichment with matching inputs
+    def shared(kind: str, key: Any, factory: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+        return batch.run(kind, key, factory) if batch else factory()
+
+    instrument_key = signal.instrument.upper()
+    timeframe_key = (instrument_key, signal.timeframe)
+
+    async def news(results: Dict[str, Any]) -> Dict[str, Any]:
+        return await shared("news", instrument_key, lambda: news_coalescer.run(
+            instrument_key,
+            lambda: process_news(signal.instrument, clients.news_ai)
+        ))
+
+    async def subscribers(results: Dict[str, Any]) -> List[str]:
+        return await shared("subscribers", timeframe_key, lambda: match_subscribers(
+            signal.instrument, signal.timeframe, clients.matcher
+        ))
+
+    async def chart(results: Dict[str, Any]) -> Optional[str]:
+        return await shared("chart", timeframe_key, lambda: chart_coalescer.run(
+            timeframe_key,
+            lambda: get_chart_data(signal.instrument, signal.timeframe, clients.chart)
+        ))
+
+    async def analysis(results: Dict[str, Any]) -> Dict[str, Any]:
+        apply_stage_results(signal_data, results)
+        return await get_ai_analysis(signal_data, clients.signal_ai)
+
+    async def format_message(results: Dict[str, Any]) -> str:
+        apply_stage_results(signal_data, results)
+        return await format_signal_message(signal_data, clients.signal_ai)
+
+    async def telegram(results: Dict[str, Any]) -> Dict[str, Any]:
+        apply_stage_results(signal_data, results)
+        if results["chart"]:
+            signal_data["chart_ref"] = results["chart"]
+
+        # Skips if no chat IDs
+        chat_ids = results["subscribers"]
+        if chat_ids:
+            return await send_telegram_message(signal_data, chat_ids, clients.telegram)
+        return {}
+
+    return StageGraph([
+        Stage("news", news, timeout=timeouts.get("news"), fallback={}),
+        Stage("subscribers", subscribers, timeout=timeouts.get("subscribers"), fallback=lambda results: []),
+        # Chart references point into the in-memory blob store, so they are not persisted
+        Stage("chart", chart, timeout=timeouts.get("chart"), fallback=None, persist=False),
+        Stage(
+            "analysis", analysis,
+            deps=["news", "subscribers"],
+            timeout=timeouts.get("analysis"),
+            fallback={"verdict": "Analysis unavailable", "risk_reward_ratio": 0.0}
+        ),
+        Stage(
+            "format", format_message,
+            deps=["analysis"],
+            timeout=timeouts.get("format"),
+            fallback=lambda results: format_basic_message(signal_data)
+        ),
+        Stage("telegram", telegram, deps=["format", "chart", "subscribers"], timeout=timeouts.get("telegram"))
+    ])
+
+async def run_signal_pipeline(
+    signal: TradingSignal,
+    clients: ServiceClients,
+    signal_id: Optional[str] = None,
+    on_stage: Optional[Callable[[str, str], None]] = None,
+    restored: Optional[Dict[str, Any]] = None,
+    batch: Optional[BatchEnrichment] = None
+) -> Dict[str, float]:
+    """Run the full pipeline for a signal and return its stage timings.
+
+    When the signal store is enabled, every completed stage is persisted so an
+    interrupted signal can resume from its last completed stage.
+    """
+    logger.info(f"Processing signal for {signal.instrument}")
+    
+    durable = signal_store.is_open and signal_id is not None
+
+    async def record_stage(stage: str, result: Any) -> None:
+        await signal_store.record_stage(signal_id, stage, result)
+
+    on_result = record_stage if durable else None
+    
+    signal_data = build_signal_data(signal)
+    pipeline = build_signal_pipeline(signal, signal_data, clients, batch)
+    try:
+        with monitor.timer('pipeline_stage', 'total'), tracer.trace(
+            'signal',
+            instrument=signal.instrument,
+            timeframe=signal.timeframe or '',
+            signal_id=signal_id or '',
+            resumed=bool(restored),
+            batched=batch is not None
+        ):
+            results, timings = await pipeline.run(on_stage, on_result, restored)
+    except Exception as e:
+        if durable:
+            await signal_store.mark_status(signal_id, 'failed', str(e))
+        raise
+    
+    if durable:
+        await signal_store.mark_status(signal_id, 'completed')
+    
+    monitor.log_stage_timings(timings)
+    logger.info(
+        f"Signal for {signal.instrument} stage timings: "
+        + ", ".join(f"{name}={duration:.2f}s" for name, duration in timings.items())
+    )
+    
+    monitor.log_signal_processed()
+    return timings
+
+def overloaded(e: AdmissionRejected) -> HTTPException:
+    """Fast 429/503 answer for work turned away by admission control"""
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def process_signal_job(job: SignalJob) -> None:
+    """Queue worker handler running the pipeline for an accepted signal"""
+    # Already accepted: wait for admission rather than being rejected
+    async with admission_control.admit(PRIORITY_SIGNAL, bounded=False):
+        job.timings = await run_signal_pipeline(
+            job.signal,
+            service_clients,
+            signal_id=job.id,
+            on_stage=job.update_stage,
+            restored=job.restored
+        )
+
+async def run_background_signal(
+    signal: TradingSignal,
+    signal_id: str,
+    restored: Optional[Dict[str, Any]] = None
+) -> None:
+    """Run an accepted signal outside of a request, waiting for admission"""
+    async with admission_control.admit(PRIORITY_SIGNAL, bounded=False):
+        await run_signal_pipeline(signal, service_clients, signal_id=signal_id, restored=restored)
+
+async def accept_signal(signal: TradingSignal) -> str:
+    """Assign an id to a signal and durably record it when the store is enabled"""
+    signal_id = uuid.uuid4().hex
+    if signal_store.is_open:
+        await signal_store.record_signal(signal_id, signal.model_dump())
+    return signal_id
+
+def dispatch_signal(
+    signal: TradingSignal,
+    signal_id: str,
+    restored: Optional[Dict[str, Any]] = None
+) -> None:
+    """Process an accepted signal in the background, through the queue when enabled"""
+    if signal_queue.running:
+        signal_queue.submit(signal, signal_id, restored)
+        return
+    
+    task = asyncio.create_task(run_background_signal(signal, signal_id, restored))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+async def resume_unfinished_signals() -> None:
+    """Resume signals interrupted by a restart from their last completed stage.
+
+    Only signals claimed by this worker are resumed: ones no other live
+    worker is still processing.
+    """
+    unfinished = await signal_store.claim_unfinished()
+    for signal_id, payload, results in unfinished:
+        try:
+            dispatch_signal(TradingSignal(**payload), signal_id, results)
+        except Exception as e:
+            logger.error(f"Error resuming signal {signal_id}: {str(e)}")
+    
+    if unfinished:
+        logger.info(f"Resumed {len(unfinished)} unfinished signals")
+
+async def resume_abandoned_signals() -> None:
+    """Periodically resume signals left behind by workers that stopped"""
+    while True:
+        await asyncio.sleep(signal_store.claim_ttl)
+        try:
+            await resume_unfinished_signals()
+        except Exception as e:
+            logger.error(f"Error resuming abandoned signals: {str(e)}")
+
+async def handle_signal(
+    signal: TradingSignal,
+    clients: ServiceClients,
+    batch: Optional[BatchEnrichment] = None
+) -> Tuple[int, Dict[str, Any]]:
+    """Accept a signal and process or queue it; returns (status code, response body)"""
+    signal_id = await accept_signal(signal)
+    
+    # Accept-and-queue mode: respond immediately and process in the background
+    if signal_queue.running:
+        try:
+            job = signal_queue.submit(signal, signal_id)
+        except asyncio.QueueFull:
+            if signal_store.is_open:
+                await signal_store.mark_status(signal_id, 'rejected', "Signal queue is full")
+            raise HTTPException(
+                status_code=503,
+                detail="Signal queue is full",
+                headers={"Retry-After": str(signal_queue.retry_after())}
+            )
+        logger.info(f"Queued signal for {signal.instrument} as job {job.id}")
+        return 202, {"status": "accepted", "job_id": job.id}
+    
+    try:
+        async with admission_control.admit(PRIORITY_SIGNAL):
+            await run_signal_pipeline(signal, clients, signal_id=signal_id, batch=batch)
+    except AdmissionRejected as e:
+        if signal_store.is_open:
+            await signal_store.mark_status(signal_id, 'rejected', str(e))
+        raise overloaded(e)
+    return 200, {"status": "success", "message": "Signal processed successfully"}
 
 @app.post("/trading-signal")
 async def process_trading_signal(
     signal: TradingSignal,
-    client: httpx.AsyncClient = Depends(get_http_client)
+    clients: ServiceClients = Depends(get_service_clients),
+    idempotency_key: Optional[str] = Header(None)
 ) -> Dict[str, str]:
-    """Process a trading signal and send it to subscribers"""
+    """Process a trading signal and send it to subscribers.
+
+    Re-deliveries of the same signal (or the same Idempotency-Key header)
+    within the idempotency window return the original result.
+    """
     try:
-        monitor.log_request()
-        logger.info(f"Processing signal for {signal.instrument}")
-        
-        # Format initial signal data
-        signal_data = {
-            "instrument": signal.instrument,
-            "direction": signal.action,
-            "entry_price": str(signal.price),
-            "stop_loss": str(signal.stoploss),
-            "take_profit": str(signal.takeprofit),
-            "timeframe": signal.timeframe,
-            "strategy": signal.strategy,
-            "timestamp": signal.timestamp or datetime.now().isoformat()
-        }
-        
-        # Step 1: Process news (non-blocking)
-        news_result = await process_news(signal.instrument, client)
-        if news_result:
-            signal_data["news_analysis"] = news_result.get("sentiment")
-        
-        # Step 2: Match subscribers (continues even if no subscribers found)
-        chat_ids = await match_subscribers(signal.instrument, signal.timeframe, client)
-        signal_data["chat_ids"] = chat_ids
-        
-        # Step 3: Get chart (non-blocking)
-        chart_data = await get_chart_data(signal.instrument, signal.timeframe, client)
-        if chart_data:
-            signal_data["chart_data"] = chart_data
-        
-        # Step 4: Get AI analysis (continues with default if fails)
-        analysis_result = await get_ai_analysis(signal_data, client)
-        signal_data["ai_verdict"] = analysis_result.get("verdict", "Analysis unavailable")
-        signal_data["risk_reward_ratio"] = analysis_result.get("risk_reward_ratio", 0.0)
-        
-        # Step 5: Format message (uses basic format if AI fails)
-        signal_data["formatted_message"] = await format_signal_message(signal_data, client)
+        duplicate = False
+        if settings.IDEMPOTENCY_ENABLED:
+            key = idempotency_key or signal_key(signal)
+            (status_code, content), duplicate = await idempotency_store.run(
+                key,
+                lambda: handle_signal(signal, clients)
+            )
+        else:
+            status_code, content = await handle_signal(signal, clients)
         
-        # Step 6: Send to Telegram (skips if no chat IDs)
-        if chat_ids:
-            await send_telegram_message(signal_data, chat_ids, client)
+        monitor.log_request(success=True)
+        return JSONResponse(
+            status_code=status_code,
+            content=content,
+            headers={"Idempotent-Replay": "true"} if duplicate else None
+        )
         
-        monitor.log_signal_processed()
-        return {"status": "success", "message": "Signal processed successfully"}
+    except HTTPException:
+        monitor.log_request(success=False)
+        raise
         
     except Exception as e:
+        monitor.log_request(success=False)
         monitor.log_error(str(e))
         logger.error(f"Error processing signal: {str(e)}")
         logger.error(f"Full traceback: {traceback.format_exc()}")
@@ -246,18 +518,99 @@ async def process_trading_signal(
             detail=f"Error processing signal: {str(e)}"
         )
 
-@app.get("/get-news")
-async def get_news(
-    instrument: str,
-    client: httpx.AsyncClient = Depends(get_http_client)
+@app.post("/trading-signals/batch")
+async def process_trading_signals_batch(
+    signals: List[TradingSignal],
+    clients: ServiceClients = Depends(get_service_clients)
 ) -> Dict[str, Any]:
+    """Process several trading signals with bounded concurrency.
+
+    News is fetched once per instrument and subscribers and charts once per
+    (instrument, timeframe) for the whole batch. Returns a result per signal.
+    """
+    if len(signals) > settings.BATCH_MAX_SIGNALS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(signals)} signals exceeds the maximum of {settings.BATCH_MAX_SIGNALS}"
+        )
+    
+    batch = BatchEnrichment()
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    
+    async def process(index: int, signal: TradingSignal) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                duplicate = False
+                if settings.IDEMPOTENCY_ENABLED:
+                    (status_code, content), duplicate = await idempotency_store.run(
+                        signal_key(signal),
+                        lambda: handle_signal(signal, clients, batch)
+                    )
+                else:
+                    status_code, content = await handle_signal(signal, clients, batch)
+                monitor.log_request(success=True)
+                return {"index": index, "instrument": signal.instrument, "status_code": status_code, "duplicate": duplicate, **content}
+                
+            except HTTPException as e:
+                monitor.log_request(success=False)
+                return {"index": index, "instrument": signal.instrument, "status_code": e.status_code, "status": "error", "detail": e.detail}
+                
+            except Exception as e:
+                monitor.log_request(success=False)
+                monitor.log_error(str(e))
+                logger.error(f"Error processing batch signal {index}: {str(e)}")
+                return {"index": index, "instrument": signal.instrument, "status_code": 500, "status": "error", "detail": str(e)}
+    
+    results = await asyncio.gather(*(process(index, signal) for index, signal in enumerate(signals)))
+    failed = sum(1 for result in results if result["status_code"] >= 400)
+    logger.info(f"Processed batch of {len(signals)} signals, {failed} failed")
+    return {
+        "status": "success" if not failed else "partial",
+        "processed": len(results) - failed,
+        "failed": failed,
+        "shared": batch.get_stats(),
+        "results": results
+    }
+
+@app.post("/signals/replay")
+async def replay_signals(start: datetime, end: datetime) -> Dict[str, Any]:
+    """Re-run every stored signal received in a time range"""
+    if not signal_store.is_open:
+        raise HTTPException(status_code=400, detail="Signal store is not enabled")
+    
+    try:
+        signal_ids = []
+        for _, payload in await signal_store.load_range(start.timestamp(), end.timestamp()):
+            signal = TradingSignal(**payload)
+            signal_id = await accept_signal(signal)
+            dispatch_signal(signal, signal_id)
+            signal_ids.append(signal_id)
+        
+        logger.info(f"Replaying {len(signal_ids)} signals received between {start} and {end}")
+        return {"status": "success", "replayed": len(signal_ids), "signal_ids": signal_ids}
+        
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Signal queue is full")
+
+@app.get("/signals/{job_id}")
+async def get_signal_status(job_id: str) -> Dict[str, Any]:
+    """Get the processing status of a queued signal"""
+    job = signal_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Signal job not found")
+    return job.to_dict()
+
+@app.get("/get-news")
+async def get_news(instrument: str) -> Dict[str, Any]:
     """Get news articles for a specific instrument"""
     try:
-        monitor.log_request()
         logger.info(f"Getting news for {instrument}")
         
-        articles = await get_news_articles(instrument)
-        monitor.log_news_scrape(len(articles))
+        # Ad-hoc news requests yield to signal processing under load
+        with tracer.trace('get_news', instrument=instrument):
+            async with admission_control.admit(PRIORITY_NEWS):
+                articles = await news_cache.get(instrument, settings.MAX_NEWS_ARTICLES)
+        monitor.log_request(success=True)
         
         if not articles:
             return {
@@ -270,20 +623,62 @@ async def get_news(
             "articles": articles
         }
         
+    except AdmissionRejected as e:
+        monitor.log_request(success=False)
+        raise overloaded(e)
+        
     except Exception as e:
+        monitor.log_request(success=False)
         monitor.log_error(str(e))
         logger.error(f"Error getting news: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_cluster_snapshot() -> Optional[Dict[str, Any]]:
+    """Counters and latency summed over all workers, or None to report this worker only"""
+    if not shared_state.is_open:
+        return None
+    try:
+        return await shared_state.get_cluster_snapshot()
+    except Exception as e:
+        logger.error(f"Error aggregating metrics across workers: {str(e)}")
+        return None
+
 @app.get("/health")
 async def health_check() -> Dict[str, Any]:
     """Health check endpoint"""
-    return monitor.get_health()
+    return monitor.get_health(await get_cluster_snapshot())
 
 @app.get("/metrics")
 async def get_metrics() -> Dict[str, Any]:
-    """Get service metrics"""
-    return monitor.get_metrics()
+    """Get service metrics, aggregated across workers when the shared state is enabled"""
+    return monitor.get_metrics(await get_cluster_snapshot())
+
+@app.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics() -> PlainTextResponse:
+    """Get service metrics in Prometheus text exposition format"""
+    return PlainTextResponse(
+        monitor.get_prometheus_metrics(await get_cluster_snapshot()),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@app.get("/debug/traces")
+async def get_traces(order: str = "slowest", limit: int = 10) -> Dict[str, Any]:
+    """Get the slowest or most recent traces of this worker as span waterfalls"""
+    if order not in ("slowest", "recent"):
+        raise HTTPException(status_code=400, detail="order must be 'slowest' or 'recent'")
+    return {
+        "order": order,
+        "stats": tracer.get_stats(),
+        "traces": tracer.get_traces(order, max(1, limit))
+    }
+
+@app.get("/debug/traces/{trace_id}")
+async def get_trace(trace_id: str) -> Dict[str, Any]:
+    """Get a single buffered trace by id"""
+    trace = tracer.get_trace(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
 
 @app.on_event("startup")
 async def startup_event():
@@ -292,10 +687,61 @@ async def startup_event():
         # Initialize proxy manager
         await proxy_manager.initialize()
         logger.info("Proxy manager initialized")
+        monitor.register_collector('proxies', proxy_manager.get_stats)
+        
+        # Open long-lived connection pools to the downstream services
+        await service_clients.initialize()
+        monitor.register_collector('http_pools', service_clients.get_stats)
+        monitor.register_health_check('circuit_breakers', service_clients.get_breaker_states)
+        monitor.register_collector('retries', service_clients.get_retry_stats)
+        monitor.register_collector('telegram_delivery', telegram_delivery.get_stats)
+        monitor.register_collector('blob_store', blob_store.get_stats)
+        monitor.register_collector('chart_cache', chart_cache.get_stats)
+        monitor.register_collector('browser_pool', browser_pool.get_stats)
+        monitor.register_collector('scrape_profile', scrape_profile.get_stats)
+        monitor.register_collector('news_backends', news_backends.get_stats)
+        monitor.register_collector('tradingview_session', session_store.get_stats)
+        monitor.register_collector('idempotency', idempotency_store.get_stats)
+        monitor.register_collector('coalescing', get_coalescing_stats)
+        monitor.register_collector('tracing', tracer.get_stats)
+        monitor.register_collector('admission', admission_control.get_stats)
+        logger.info("Service HTTP clients initialized")
+        
+        # Start background signal workers in accept-and-queue mode
+        if settings.SIGNAL_QUEUE_ENABLED:
+            signal_queue.start(process_signal_job)
+            monitor.register_collector('signal_queue', signal_queue.get_stats)
+        
+        # Share metrics, caches and dedup with the other uvicorn workers
+        if settings.SHARED_STATE_ENABLED:
+            await shared_state.open()
+            monitor.register_collector('shared_state', shared_state.get_stats)
+        
+        # Open the durable signal log and resume interrupted signals
+        if settings.SIGNAL_STORE_ENABLED:
+            await signal_store.open()
+            await signal_store.prune()
+            monitor.register_collector('signal_store', signal_store.get_stats)
+        
+        # Launch the shared browser used for news scraping; without it the HTTP backend can still serve news
+        try:
+            await browser_pool.initialize()
+            logger.info("Browser pool initialized")
+        except Exception as e:
+            logger.error(f"Error launching the browser pool: {str(e)}")
+        
+        if signal_store.is_open:
+            await resume_unfinished_signals()
+            task = asyncio.create_task(resume_abandoned_signals())
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
         
-        # Start system monitoring if enabled
+        # Start system monitoring and the event loop lag probe if enabled
         if settings.ENABLE_MONITORING:
             asyncio.create_task(monitor.monitor_system_resources())
+            loop_monitor.start()
+            monitor.register_collector('event_loop', loop_monitor.get_stats)
+            monitor.register_health_check('event_loop', loop_monitor.get_health)
             logger.info("System monitoring started")
             
     except Exception as e:
@@ -306,7 +752,15 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     try:
+        await loop_monitor.stop()
+        await signal_queue.stop()
+        await signal_store.close()
+        await shared_state.close()
         await proxy_manager.cleanup()
+        await news_backends.close()
+        await browser_pool.cleanup()
+        await service_clients.cleanup()
+        tracer.close()
         logger.info("Service shutdown completed")
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}")
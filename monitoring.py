@@ -1,12 +1,93 @@
 import logging
 import os
+import re
 import time
 import psutil
 import asyncio
-from typing import Dict, Any
+from bisect import bisect_left
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
+# Default latency bucket upper bounds in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0
+)
+
+# Prefix of every metric in the Prometheus exposition
+PROMETHEUS_PREFIX = 'signal_processor'
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with cheap observation and approximate percentiles"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds: List[float] = list(bounds)
+        # One extra bucket for observations above the largest bound
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record a duration in seconds"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> '_Timer':
+        """Time a block into this histogram; hot paths resolve the histogram once and call this"""
+        return _Timer(self)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100) by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+
+        rank = q / 100 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                if index == len(self.bounds):
+                    # Overflow bucket has no upper bound
+                    return lower
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get count, mean and p50/p95/p99 in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': (self.sum / self.count * 1000) if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000
+        }
+
+class _Timer:
+    """Context manager observing the duration of its block into a histogram"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.start = time.perf_counter()
+
+    def __enter__(self) -> '_Timer':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Inlined LatencyHistogram.observe to keep per-call overhead low
+        histogram = self.histogram
+        value = time.perf_counter() - self.start
+        histogram.counts[bisect_left(histogram.bounds, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
 class ServiceMonitor:
     def __init__(self):
         self.logger = self._setup_logger()
@@ -16,9 +97,24 @@ class ServiceMonitor:
             'requests_failed': 0,
             'news_articles_scraped': 0,
             'signals_processed': 0,
+            'news_cache_hits': 0,
+            'news_cache_misses': 0,
+            'news_cache_stale': 0,
+            'news_cache_coalesced': 0,
+            'news_cache_evictions': 0,
+            'news_cache_shared_hits': 0,
+            'scraper_pages_total': 0,
+            'scraper_bytes_total': 0,
             'last_error': None,
             'start_time': datetime.now().isoformat()
         }
+        # Named callables contributing live statistics to get_metrics
+        self.collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        # Named callables contributing to get_health; a falsy 'healthy' key degrades the status
+        self.health_checks: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        # family -> label value -> histogram, e.g. histograms['stage']['news_scrape']
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._histogram_index: Dict[Tuple[str, str], LatencyHistogram] = {}
         
     def _setup_logger(self) -> logging.Logger:
         """Setup logging configuration"""
@@ -53,6 +149,14 @@ class ServiceMonitor:
 
         return logger
 
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        """Register a callable whose statistics are included in the metrics"""
+        self.collectors[name] = collector
+
+    def register_health_check(self, name: str, check: Callable[[], Dict[str, Any]]) -> None:
+        """Register a callable whose result is included in the health status"""
+        self.health_checks[name] = check
+
     def log_request(self, success: bool = True) -> None:
         """Log a request and update metrics"""
         self.metrics['requests_total'] += 1
@@ -65,10 +169,46 @@ class ServiceMonitor:
         """Log news articles scraped"""
         self.metrics['news_articles_scraped'] += count
 
+    def log_news_cache(self, event: str) -> None:
+        """Log a news cache event (hits, misses, stale, coalesced, evictions, shared_hits)"""
+        self.metrics[f'news_cache_{event}'] += 1
+
+    def log_page_transfer(self, num_bytes: int) -> None:
+        """Log the bytes transferred by a scraped page"""
+        self.metrics['scraper_pages_total'] += 1
+        self.metrics['scraper_bytes_total'] += num_bytes
+
     def log_signal_processed(self) -> None:
         """Log a processed signal"""
         self.metrics['signals_processed'] += 1
 
+    def histogram(self, family: str, name: str, bounds: Sequence[float] = LATENCY_BUCKETS) -> LatencyHistogram:
+        """Get or create the latency histogram for a name within a family"""
+        try:
+            return self._histogram_index[(family, name)]
+        except KeyError:
+            histogram = LatencyHistogram(bounds)
+            self.histograms.setdefault(family, {})[name] = histogram
+            self._histogram_index[(family, name)] = histogram
+            return histogram
+
+    def observe(self, family: str, name: str, seconds: float) -> None:
+        """Record a duration in seconds"""
+        histogram = self._histogram_index.get((family, name)) or self.histogram(family, name)
+        histogram.observe(seconds)
+
+    def timer(self, family: str, name: str) -> _Timer:
+        """Time a block: ``with monitor.timer('stage', 'chart'): ...``
+
+        Looks the histogram up on every call; hot paths keep the histogram and use its ``time()``.
+        """
+        return _Timer(self._histogram_index.get((family, name)) or self.histogram(family, name))
+
+    def log_stage_timings(self, timings: Dict[str, float]) -> None:
+        """Log per-stage durations (seconds) of a processed signal"""
+        for stage, duration in timings.items():
+            self.observe('pipeline_stage', stage, duration)
+
     def log_error(self, error: str) -> None:
         """Log an error"""
         self.metrics['last_error'] = {
@@ -105,9 +245,21 @@ class ServiceMonitor:
             
             await asyncio.sleep(60)  # Monitor every minute
 
-    def get_metrics(self) -> Dict[str, Any]:
-        """Get current metrics"""
+    def get_counters(self) -> Dict[str, float]:
+        """Get the numeric counters, as summed across workers by the shared state"""
+        return {
+            key: value for key, value in self.metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+
+    def get_metrics(self, cluster: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get current metrics, with counters and latency summed over all workers when a cluster snapshot is given"""
         metrics = self.metrics.copy()
+        histograms = self.histograms
+        if cluster:
+            metrics.update(cluster['counters'])
+            histograms = cluster['histograms']
+            metrics['workers'] = len(cluster['workers'])
         
         # Add system metrics
         try:
@@ -120,33 +272,127 @@ class ServiceMonitor:
             })
         except Exception as e:
             self.logger.error(f"Error getting system metrics: {str(e)}")
+        
+        pages = metrics['scraper_pages_total']
+        metrics['scraper_avg_page_bytes'] = metrics['scraper_bytes_total'] / pages if pages else 0.0
+        
+        metrics['latency'] = {
+            family: {name: histogram.snapshot() for name, histogram in named.items()}
+            for family, named in histograms.items()
+        }
+        
+        for name, collector in self.collectors.items():
+            try:
+                metrics[name] = collector()
+            except Exception as e:
+                self.logger.error(f"Error collecting {name} metrics: {str(e)}")
             
         return metrics
 
-    def get_health(self) -> Dict[str, Any]:
+    def get_health(self, cluster: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get service health status"""
-        metrics = self.get_metrics()
+        metrics = self.get_metrics(cluster)
         
         # Calculate error rate
         total_requests = metrics['requests_total']
         error_rate = (metrics['requests_failed'] / total_requests * 100) if total_requests > 0 else 0
         
+        # Run registered health checks
+        checks = {}
+        checks_healthy = True
+        for name, check in self.health_checks.items():
+            try:
+                checks[name] = check()
+                checks_healthy = checks_healthy and checks[name].get('healthy', True)
+            except Exception as e:
+                self.logger.error(f"Error running {name} health check: {str(e)}")
+        
         # Determine status based on metrics
         status = 'healthy'
-        if error_rate > 10:
+        if error_rate > 10 or not checks_healthy:
             status = 'degraded'
         if error_rate > 50:
             status = 'unhealthy'
         if metrics['cpu_percent'] > 90 or metrics['memory_percent'] > 90:
             status = 'resource_critical'
             
-        return {
+        health = {
             'status': status,
             'error_rate': f"{error_rate:.2f}%",
             'last_error': metrics['last_error'],
-            'uptime': f"{metrics['uptime_seconds'] / 3600:.2f} hours",
-            'metrics': metrics
+            'uptime': f"{metrics['uptime_seconds'] / 3600:.2f} hours"
         }
+        health.update(checks)
+        health['metrics'] = metrics
+        return health
+
+    def get_prometheus_metrics(self, cluster: Optional[Dict[str, Any]] = None) -> str:
+        """Render counters, collector gauges and latency histograms in Prometheus text format"""
+        metrics = self.get_metrics(cluster)
+        lines: List[str] = []
+
+        def escape(value: Any) -> str:
+            """Escape a label value per the text exposition format"""
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        def number(value: Any) -> Optional[float]:
+            if isinstance(value, bool):
+                return float(value)
+            if isinstance(value, (int, float)):
+                return float(value)
+            return None
+
+        # Counters and gauges from the flat metrics
+        for key, value in metrics.items():
+            if key in ('latency', 'last_error', 'start_time') or key in self.collectors:
+                continue
+            value = number(value)
+            if value is None:
+                continue
+            kind = 'counter' if key.endswith(('_total', '_success', '_failed', '_scraped', '_processed')) or key.startswith('news_cache_') else 'gauge'
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{key} {kind}")
+            lines.append(f"{PROMETHEUS_PREFIX}_{key} {value}")
+
+        def leaves(stats: Dict[str, Any], path: Tuple[str, ...] = ()):
+            """Yield (enclosing keys, field, value) for every value in the nested stats"""
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    yield from leaves(value, path + (str(key),))
+                else:
+                    yield path, str(key), value
+
+        # Collector statistics as gauges at any depth: the keys of enclosing dicts become
+        # 'key', 'key2', ... labels; samples are grouped per metric so each gets a single TYPE line
+        gauges: Dict[str, List[str]] = {}
+        for collector in self.collectors:
+            for path, field, value in leaves(metrics.get(collector) or {}):
+                value = number(value)
+                if value is None:
+                    continue
+                metric = re.sub(r'[^a-zA-Z0-9_:]', '_', f"{PROMETHEUS_PREFIX}_{collector}_{field}")
+                labels = ','.join(
+                    f'key{index + 1 if index else ""}="{escape(key)}"' for index, key in enumerate(path)
+                )
+                gauges.setdefault(metric, []).append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+        for metric, samples in gauges.items():
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(samples)
+
+        # Latency histograms with cumulative buckets
+        for family, histograms in (cluster['histograms'] if cluster else self.histograms).items():
+            metric = f"{PROMETHEUS_PREFIX}_{family}_duration_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in histograms.items():
+                label = f'{family}="{escape(name)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{{label}}} {histogram.sum}')
+                lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
 
 # Create singleton instance
 monitor = ServiceMonitor()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import json
+import logging
+import time
+import asyncio
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, Callable, Awaitable
+
+from config import settings
+from monitoring import monitor
+from news_scraper import get_news_articles
+from shared_state import shared_state, SharedState
+from tracing import tracer
+from admission import admission_control
+
+logger = logging.getLogger(__name__)
+
+NewsFetcher = Callable[[str, int], Awaitable[List[Dict[str, str]]]]
+CacheKey = Tuple[str, int]
+
+class NewsCache:
+    """In-process TTL/LRU cache of scraped news with single-flight request coalescing.
+
+    When the shared state is open, a miss first looks for news another worker
+    scraped, and every scrape is shared with the other workers.
+    """
+
+    def __init__(
+        self,
+        fetcher: NewsFetcher = get_news_articles,
+        ttl: int = settings.NEWS_CACHE_TTL,
+        max_entries: int = settings.NEWS_CACHE_MAX_ENTRIES,
+        shared: SharedState = shared_state
+    ):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+
+        # key -> (stored_at, articles), least recently used first
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[Dict[str, str]]]]" = OrderedDict()
+        # key -> scrape currently running for that key
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(instrument: str, max_articles: int) -> CacheKey:
+        return (instrument.upper(), max_articles)
+
+    async def get(self, instrument: str, max_articles: int = settings.MAX_NEWS_ARTICLES) -> List[Dict[str, str]]:
+        """Get news for an instrument, scraping at most once per key concurrently"""
+        key = self._key(instrument, max_articles)
+        entry = self._entries.get(key)
+
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            self._entries.move_to_end(key)
+            monitor.log_news_cache('hits')
+            return entry[1]
+
+        result = 'stale' if entry else 'misses'
+        monitor.log_news_cache(result)
+
+        with tracer.span('news_cache.fetch', instrument=key[0]) as span:
+            task = self._inflight.get(key)
+            if task:
+                monitor.log_news_cache('coalesced')
+                result = 'coalesced'
+                admission_control.join_shared(task)
+            else:
+                # The scrape task inherits this span, so its spans nest under it
+                task = admission_control.start_shared(self._fetch(key, instrument, max_articles))
+                self._inflight[key] = task
+            span.set('cache', result)
+
+            # Shield so one cancelled caller does not abort the scrape for the others
+            return await asyncio.shield(task)
+
+    async def _fetch(self, key: CacheKey, instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        """Scrape news, unless another worker already did, and store non-empty results"""
+        try:
+            articles = await self._get_shared(key)
+            if articles:
+                monitor.log_news_cache('shared_hits')
+                return articles
+
+            articles = await self.fetcher(instrument, max_articles)
+            monitor.log_news_scrape(len(articles))
+
+            if articles:
+                self._store(key, articles)
+                await self._set_shared(key, articles)
+                return articles
+
+            # Fall back to stale articles rather than returning nothing
+            stale = self._entries.get(key)
+            if stale:
+                logger.info(f"Serving stale news for {instrument}")
+                return stale[1]
+            return articles
+
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _get_shared(self, key: CacheKey) -> Optional[List[Dict[str, str]]]:
+        """Get news another worker scraped, keeping it locally for the rest of its TTL"""
+        if not self.shared.is_open:
+            return None
+        try:
+            entry = await self.shared.cache_get('news', f"{key[0]}:{key[1]}")
+        except Exception as e:
+            logger.warning(f"Error reading shared news cache: {str(e)}")
+            return None
+        if not entry:
+            return None
+
+        value, remaining = entry
+        articles = json.loads(value)
+        self._store(key, articles, time.monotonic() - max(0.0, self.ttl - remaining))
+        return articles
+
+    async def _set_shared(self, key: CacheKey, articles: List[Dict[str, str]]) -> None:
+        """Make scraped news visible to the other workers"""
+        if not self.shared.is_open:
+            return
+        try:
+            await self.shared.cache_set('news', f"{key[0]}:{key[1]}", json.dumps(articles).encode('utf-8'), self.ttl)
+        except Exception as e:
+            logger.warning(f"Error writing shared news cache: {str(e)}")
+
+    def _store(self, key: CacheKey, articles: List[Dict[str, str]], stored_at: Optional[float] = None) -> None:
+        """Store articles, evicting the least recently used entries when full"""
+        self._entries[key] = (time.monotonic() if stored_at is None else stored_at, articles)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            monitor.log_news_cache('evictions')
+
+    def invalidate(self, instrument: Optional[str] = None) -> None:
+        """Drop cached news for an instrument, or everything"""
+        if instrument is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == instrument.upper()]:
+            del self._entries[key]
+
+# Create singleton instance
+news_cache = NewsCache()
@@ -1,51 +1,113 @@
+import time
 import logging
 import traceback
-from typing import List, Dict, Optional
-from playwright.async_api import async_playwright, Browser, Page
+from typing import Any, List, Dict, Optional
+from playwright.async_api import Page
 import asyncio
 from datetime import datetime
 import pytz
 
+from config import settings
+from browser_pool import browser_pool, BrowserPool
+from monitoring import monitor
+from proxy_manager import proxy_manager, ProxyManager
+from scrape_profile import scrape_profile, ScrapeProfile, PageMeter
+from session_store import session_store, SessionStore
+from tracing import tracer
+from scraper_backend import (
+    NewsBackend, ScraperWallError, HEADLINE_SELECTOR, NEWS_LIST_SELECTOR,
+    ARTICLE_BODY_SELECTOR, LOGIN_BUTTON_SELECTOR
+)
+from http_scraper import HttpNewsScraper, html_parser_available
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Resolved once: these are timed for every article
+ARTICLE_READY_LATENCY = monitor.histogram('scraper', 'article_ready')
+ARTICLE_EXTRACTION_LATENCY = monitor.histogram('scraper', 'article_extraction')
+
+# Links collected from the news list; failed articles are replaced by later ones
+MAX_HEADLINE_CANDIDATES = 50
+
+# Playwright error text of a failed navigation: the proxy or network failed, not the page
+NETWORK_ERROR_MARKERS = ('net::ERR_', 'NS_ERROR_', 'navigating to')
+
+def is_network_error(error: Exception) -> bool:
+    """Check whether a scraping error is a navigation or network failure the proxy is to blame for"""
+    return any(marker in str(error) for marker in NETWORK_ERROR_MARKERS)
+
+# Collects link, title, provider and date of every headline in one round trip
+COLLECT_HEADLINES_JS = """
+(args) => {
+    const [selector, limit] = args;
+    const headlines = [];
+    for (const element of document.querySelectorAll(selector)) {
+        const anchor = element.closest('a');
+        if (!anchor || !anchor.href) continue;
+        const article = element.closest('article');
+        const provider = article && article.querySelector('.provider-TUPxzdRV');
+        const date = article && article.querySelector('.date-TUPxzdRV');
+        headlines.push({
+            url: anchor.href,
+            title: (element.textContent || '').trim(),
+            provider: provider ? provider.textContent.trim() : null,
+            date: date ? date.textContent.trim() : null
+        });
+        if (headlines.length >= limit) break;
+    }
+    return headlines;
+}
+"""
+
+# Extracts the article paragraphs in one round trip
+EXTRACT_PARAGRAPHS_JS = """
+(selector) => {
+    const body = document.querySelector(selector);
+    if (!body) return [];
+    return Array.from(body.querySelectorAll('p'))
+        .map((p) => (p.textContent || '').trim())
+        .filter((text) => text.length > 0);
+}
+"""
+
 class NewsScraper:
-    def __init__(self):
-        self.browser = None
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        proxies: Optional[ProxyManager] = None,
+        profile: Optional[ScrapeProfile] = None,
+        session: Optional[SessionStore] = None
+    ):
+        self.pool = pool or browser_pool
+        self.proxies = proxies or proxy_manager
+        self.profile = profile or scrape_profile
+        self.session = session or session_store
+        self.proxy: Optional[Dict[str, str]] = None
         self.page = None
-        
-    async def initialize(self) -> None:
-        """Initialize browser with optimized settings"""
-        try:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-extensions'
-                ]
-            )
-            logger.info("Browser initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize browser: {str(e)}")
-            raise
 
-    async def login(self) -> bool:
+    async def login(self, page: Optional[Page] = None) -> bool:
         """Login to TradingView when encountering login wall"""
+        page = page or self.page
+        if not settings.TRADINGVIEW_USERNAME or not settings.TRADINGVIEW_PASSWORD:
+            logger.warning("TradingView credentials are not set. Skipping login.")
+            return False
+
         try:
             # Fill in credentials
-            await self.page.fill('input[name="username"]', 'contact@jomarcello.com')
-            await self.page.fill('input[name="password"]', 'JmT!102710')
+            await page.fill('input[name="username"]', settings.TRADINGVIEW_USERNAME)
+            await page.fill('input[name="password"]', settings.TRADINGVIEW_PASSWORD)
             
             # Click sign in button
-            await self.page.click('button[type="submit"]')
+            await page.click(LOGIN_BUTTON_SELECTOR)
             
-            # Wait for login to complete
-            await self.page.wait_for_load_state('networkidle')
-            await asyncio.sleep(2)
+            # Wait for the login form to go away
+            await page.wait_for_selector(
+                'input[name="password"]',
+                state='detached',
+                timeout=settings.NEWS_ARTICLE_TIMEOUT * 1000
+            )
             
             logger.info("Successfully logged in")
             return True
@@ -54,6 +116,33 @@ class NewsScraper:
             logger.error(f"Login failed: {str(e)}")
             return False
 
+    async def ensure_login(self, page: Page) -> bool:
+        """Get past a login wall, reusing a session another scrape just created if possible"""
+        version = self.session.version
+        with tracer.span('scraper.login'):
+            return await self._ensure_login(page, version)
+
+    async def _ensure_login(self, page: Page, version: int) -> bool:
+        async with self.session.lock:
+            if self.session.version != version:
+                # Someone logged in while we waited: adopt their cookies instead of logging in again
+                state = self.session.get_state()
+                if state:
+                    await page.context.add_cookies(state.get('cookies', []))
+                    await page.reload(timeout=30000, wait_until='domcontentloaded')
+                    await self.wait_for_article(page)
+                    if not await page.query_selector(LOGIN_BUTTON_SELECTOR):
+                        return True
+            else:
+                self.session.invalidate()
+
+            if await self.login(page):
+                await self.session.save(page.context)
+                return True
+
+            self.session.record_login_failure()
+            return False
+
     async def get_article_content(self, headline_element) -> Optional[Dict[str, str]]:
         """Get full article content by navigating to the article page"""
         try:
@@ -78,19 +167,19 @@ class NewsScraper:
             if date_element:
                 date = date_element['textContent'].strip()
 
-            # Navigate to article
-            await self.page.goto(link, timeout=30000)
-            await asyncio.sleep(2)
+            # Navigate to article and wait for its body (or a login wall)
+            await self.page.goto(link, timeout=30000, wait_until='domcontentloaded')
+            await self.wait_for_article(self.page)
 
             # Check for login wall
-            login_button = await self.page.query_selector('button[type="submit"]')
+            login_button = await self.page.query_selector(LOGIN_BUTTON_SELECTOR)
             if login_button:
-                await self.login()
-                await asyncio.sleep(2)
+                await self.ensure_login(self.page)
+                await self.wait_for_article(self.page)
 
             # Get full article content
             content = title  # Default to title if we can't get content
-            body_element = await self.page.query_selector('.body-KX2tCBZq')
+            body_element = await self.page.query_selector(ARTICLE_BODY_SELECTOR)
             if body_element:
                 paragraphs = await body_element.query_selector_all('p')
                 content_parts = []
@@ -102,8 +191,8 @@ class NewsScraper:
                     content = '\n\n'.join(content_parts)
 
             # Go back to news list
-            await self.page.goto(f"https://www.tradingview.com/symbols/{self.current_instrument}/news/", timeout=30000)
-            await self.page.wait_for_selector('.news-headline-card', timeout=10000)
+            await self.page.goto(f"{settings.TRADINGVIEW_BASE_URL}/symbols/{self.current_instrument}/news/", timeout=30000)
+            await self.page.wait_for_selector(NEWS_LIST_SELECTOR, timeout=10000)
 
             return {
                 'title': title,
@@ -115,62 +204,186 @@ class NewsScraper:
 
         except Exception as e:
             logger.warning(f"Error getting article content: {str(e)}")
+            if is_network_error(e):
+                self.proxies.record_result(self.proxy, False)
             # Try to go back to news list
             try:
-                await self.page.goto(f"https://www.tradingview.com/symbols/{self.current_instrument}/news/", timeout=30000)
-                await self.page.wait_for_selector('.news-headline-card', timeout=10000)
+                await self.page.goto(f"{settings.TRADINGVIEW_BASE_URL}/symbols/{self.current_instrument}/news/", timeout=30000)
+                await self.page.wait_for_selector(NEWS_LIST_SELECTOR, timeout=10000)
             except Exception:
                 pass
             return None
 
-    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
-        """Get news articles from TradingView"""
+    async def wait_for_article(self, page: Page) -> None:
+        """Wait until the article body or a login wall is rendered"""
         try:
-            if not self.browser:
-                await self.initialize()
+            await page.wait_for_selector(
+                f"{ARTICLE_BODY_SELECTOR}, {LOGIN_BUTTON_SELECTOR}",
+                timeout=settings.NEWS_ARTICLE_TIMEOUT * 1000
+            )
+        except Exception as e:
+            logger.debug(f"Article body did not appear: {str(e)}")
 
-            self.current_instrument = instrument
-            logger.info(f"Getting news for {instrument}")
-            
-            # Create new page
-            self.page = await self.browser.new_page()
-            
-            # Navigate to TradingView news page
-            url = f"https://www.tradingview.com/symbols/{instrument}/news/"
-            try:
-                await self.page.goto(url, timeout=30000)
-                logger.info(f"Navigated to {url}")
-                
-                # Wait for news content
-                await self.page.wait_for_selector('.news-headline-card', timeout=10000)
-                
-            except Exception as e:
-                logger.error(f"Error loading page: {str(e)}")
-                return []
+    async def collect_headlines(self, page: Page, limit: int) -> List[Dict[str, Optional[str]]]:
+        """Collect link, title, provider and date of the listed headlines in one evaluate call"""
+        with tracer.span('scraper.collect_headlines') as span:
+            headlines = await page.evaluate(COLLECT_HEADLINES_JS, [HEADLINE_SELECTOR, limit])
+            span.set('headlines', len(headlines))
+            return headlines
 
-            articles = []
-            articles_found = 0
+    async def fetch_article(self, context, headline: Dict[str, Optional[str]]) -> Optional[Dict[str, str]]:
+        """Open a headline in its own tab and extract the article content"""
+        with tracer.span('scraper.article', url=headline['url'] or '') as span:
+            article = await self._fetch_article(context, headline)
+            span.set('found', article is not None)
+            return article
 
-            # Get all headlines
-            headlines = await self.page.query_selector_all('[data-name="news-headline-title"]')
-            
-            for headline in headlines:
-                if articles_found >= max_articles:
-                    break
+    async def _fetch_article(self, context, headline: Dict[str, Optional[str]]) -> Optional[Dict[str, str]]:
+        page = await context.new_page()
+        meter = PageMeter(page)
+        try:
+            with ARTICLE_READY_LATENCY.time(), tracer.span('scraper.article_ready'):
+                await page.goto(headline['url'], timeout=30000, wait_until='domcontentloaded')
+                await self.wait_for_article(page)
+
+            # Check for login wall
+            if await page.query_selector(LOGIN_BUTTON_SELECTOR):
+                await self.ensure_login(page)
+                await self.wait_for_article(page)
+
+            paragraphs = await page.evaluate(EXTRACT_PARAGRAPHS_JS, ARTICLE_BODY_SELECTOR)
+
+            return {
+                'title': headline['title'],
+                'content': '\n\n'.join(paragraphs) if paragraphs else headline['title'],
+                'provider': headline['provider'] or "TradingView",
+                'date': headline['date'] or datetime.now(pytz.UTC).isoformat(),
+                'url': headline['url']
+            }
+
+        except Exception as e:
+            logger.warning(f"Error getting article content: {str(e)}")
+            if is_network_error(e):
+                self.proxies.record_result(self.proxy, False)
+            return None
+
+        finally:
+            await meter.record()
+            await page.close()
 
+    async def get_articles_parallel(self, context, max_articles: int) -> List[Dict[str, str]]:
+        """Extract articles concurrently, each in its own tab, refilling from later links when one fails"""
+        headlines = await self.collect_headlines(self.page, MAX_HEADLINE_CANDIDATES)
+        candidates = iter(enumerate(headlines))
+        found: Dict[int, Dict[str, str]] = {}
+        in_flight = 0
+
+        async def worker() -> None:
+            nonlocal in_flight
+            # Start another link only while the ones found or in flight could still fall short
+            while len(found) + in_flight < max_articles:
+                index, headline = next(candidates, (None, None))
+                if headline is None:
+                    return
+                in_flight += 1
                 try:
+                    with ARTICLE_EXTRACTION_LATENCY.time():
+                        article = await self.fetch_article(context, headline)
+                finally:
+                    in_flight -= 1
+                if article:
+                    found[index] = article
+
+        await asyncio.gather(*(worker() for _ in range(min(settings.NEWS_ARTICLE_CONCURRENCY, max_articles))))
+        # Keep the order of the news list, like the sequential path
+        articles = [found[index] for index in sorted(found)][:max_articles]
+        for article in articles:
+            logger.info(f"Found article: {article['title']}")
+        return articles
+
+    async def get_articles_sequential(self, max_articles: int) -> List[Dict[str, str]]:
+        """Extract articles one at a time, navigating back to the list after each"""
+        articles = []
+        articles_found = 0
+
+        # Get all headlines
+        headlines = await self.page.query_selector_all(HEADLINE_SELECTOR)
+        
+        for headline in headlines:
+            if articles_found >= max_articles:
+                break
+
+            try:
+                with ARTICLE_EXTRACTION_LATENCY.time():
                     article_data = await self.get_article_content(headline)
-                    if article_data:
-                        articles.append(article_data)
-                        articles_found += 1
-                        logger.info(f"Found article: {article_data['title']}")
+                if article_data:
+                    articles.append(article_data)
+                    articles_found += 1
+                    logger.info(f"Found article: {article_data['title']}")
+
+            except Exception as e:
+                logger.warning(f"Error processing headline: {str(e)}")
+                continue
+
+        return articles
+
+    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
+        """Get news articles from TradingView"""
+        with tracer.span('scraper.playwright', instrument=instrument) as span:
+            articles = await self._get_news(instrument, max_articles)
+            span.set('articles', len(articles))
+            return articles
 
+    async def _get_news(self, instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        try:
+            self.current_instrument = instrument
+            logger.info(f"Getting news for {instrument}")
+            
+            # Borrow an isolated context from the shared browser pool, routed through a scored proxy
+            with tracer.span('scraper.get_proxy'):
+                self.proxy = await self.proxies.get_proxy()
+            options = self.profile.context_options()
+            if self.proxy:
+                options['proxy'] = self.proxy
+            elif self.proxies.proxy_pool:
+                logger.warning("No working proxy available, connecting directly")
+            # Start logged in when a stored session is still valid
+            state = self.session.get_state()
+            if state:
+                options['storage_state'] = state
+            async with self.pool.context(**options) as context:
+                with tracer.span('scraper.new_page'):
+                    await self.profile.install(context)
+                    self.page = await context.new_page()
+                meter = PageMeter(self.page)
+                
+                # Navigate to TradingView news page
+                url = f"{settings.TRADINGVIEW_BASE_URL}/symbols/{instrument}/news/"
+                start = time.perf_counter()
+                try:
+                    with monitor.timer('scraper', 'page_load'), tracer.span('scraper.page_load', url=url):
+                        await self.page.goto(url, timeout=30000, wait_until='domcontentloaded')
+                        logger.info(f"Navigated to {url}")
+                        
+                        # Wait for news content
+                        await self.page.wait_for_selector(NEWS_LIST_SELECTOR, timeout=10000)
+                    
                 except Exception as e:
-                    logger.warning(f"Error processing headline: {str(e)}")
-                    continue
+                    logger.error(f"Error loading page: {str(e)}")
+                    if is_network_error(e):
+                        self.proxies.record_result(self.proxy, False)
+                    return []
 
-            logger.info(f"Found {len(articles)} relevant articles")
-            return articles[:max_articles]
+                self.proxies.record_result(self.proxy, True, time.perf_counter() - start)
+
+                if settings.NEWS_PARALLEL_ARTICLES:
+                    articles = await self.get_articles_parallel(context, max_articles)
+                else:
+                    articles = await self.get_articles_sequential(max_articles)
+                await meter.record()
+
+                logger.info(f"Found {len(articles)} relevant articles")
+                return articles[:max_articles]
 
         except Exception as e:
             logger.error(f"Error getting news: {str(e)}")
@@ -178,23 +391,72 @@ class NewsScraper:
             return []
 
         finally:
-            if self.page:
-                await self.page.close()
+            # The page is closed together with its context
+            self.page = None
 
-    async def cleanup(self) -> None:
-        """Clean up browser resources"""
-        try:
-            if self.browser:
-                await self.browser.close()
-                self.browser = None
-                logger.info("Browser resources cleaned up")
-        except Exception as e:
-            logger.error(f"Error cleaning up browser: {str(e)}")
+class PlaywrightNewsBackend(NewsBackend):
+    """Scrapes TradingView news with the shared headless browser"""
+
+    name = 'playwright'
+
+    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
+        return await NewsScraper().get_news(instrument, max_articles)
+
+class NewsBackendRouter:
+    """Chooses the scraper backend per NEWS_SCRAPER_BACKEND.
+
+    In 'auto' mode news is fetched over plain HTTP first and the browser is
+    only used when the HTTP backend hits a JS or login wall or fails.
+    """
+
+    def __init__(self, mode: str = settings.NEWS_SCRAPER_BACKEND):
+        self.http = HttpNewsScraper()
+        self.playwright = PlaywrightNewsBackend()
+        if mode in ('auto', 'http') and not html_parser_available():
+            logger.warning(f"NEWS_SCRAPER_BACKEND is {mode} but selectolax is not installed. Using Playwright.")
+            mode = 'playwright'
+        self.mode = mode
+
+        self._served: Dict[str, int] = {'http': 0, 'playwright': 0}
+        self._fallbacks: Dict[str, int] = {}
+
+    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
+        """Get news articles from the configured backend"""
+        if self.mode != 'playwright':
+            try:
+                articles = await self.http.get_news(instrument, max_articles)
+                self._served['http'] += 1
+                return articles
+            except ScraperWallError as e:
+                reason = e.kind
+                logger.info(f"HTTP scraper hit a {e.kind} wall for {instrument}")
+            except Exception as e:
+                reason = 'error'
+                logger.warning(f"HTTP scraper failed for {instrument}: {str(e)}")
+
+            if self.mode == 'http':
+                return []
+            self._fallbacks[reason] = self._fallbacks.get(reason, 0) + 1
+
+        self._served['playwright'] += 1
+        return await self.playwright.get_news(instrument, max_articles)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the requests served by each backend and the reasons for falling back"""
+        return {
+            'mode': self.mode,
+            'served': dict(self._served),
+            'fallbacks': dict(self._fallbacks)
+        }
+
+    async def close(self) -> None:
+        """Close the backends"""
+        await self.http.close()
+        await self.playwright.close()
+
+# Create singleton instance
+news_backends = NewsBackendRouter()
 
 async def get_news_articles(instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
-    """Helper function to get news articles"""
-    scraper = NewsScraper()
-    try:
-        return await scraper.get_news(instrument, max_articles)
-    finally:
-        await scraper.cleanup()
\ No newline at end of file
+    """Helper function to get news articles from the configured scraper backend"""
+    return await news_backends.get_news(instrument, max_articles)
@@ -0,0 +1,149 @@
+import logging
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+StageResults = Dict[str, Any]
+StageFunc = Callable[[StageResults], Awaitable[Any]]
+# Called with (stage name, status) as stages start and finish
+StageCallback = Callable[[str, str], None]
+# Awaited with (stage name, result) after a stage completes successfully
+ResultCallback = Callable[[str, Any], Awaitable[None]]
+
+class Stage:
+    """A named pipeline step with dependencies, a timeout and a fallback value"""
+
+    def __init__(
+        self,
+        name: str,
+        func: StageFunc,
+        deps: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Any = None,
+        persist: bool = True
+    ):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        # Either a value or a callable building one from the results so far
+        self.fallback = fallback
+        # Results only valid in this process (e.g. in-memory references) are not passed to on_result
+        self.persist = persist
+
+    def get_fallback(self, results: StageResults) -> Any:
+        """Get the value used when the stage fails or times out"""
+        if callable(self.fallback):
+            return self.fallback(results)
+        return self.fallback
+
+class StageGraph:
+    """Runs stages as soon as their dependencies complete"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        self._validate()
+
+    def _validate(self) -> None:
+        """Ensure every dependency exists and the graph has no cycles"""
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        tasks: Dict[str, asyncio.Task],
+        results: StageResults,
+        timings: Dict[str, float],
+        on_stage: Optional[StageCallback],
+        on_result: Optional[ResultCallback]
+    ) -> None:
+        """Wait for a stage's dependencies, then run it with its timeout and fallback"""
+        if stage.deps:
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+
+        # Results restored from an earlier run are not recomputed
+        if stage.name in results:
+            if on_stage:
+                on_stage(stage.name, 'restored')
+            return
+
+        if on_stage:
+            on_stage(stage.name, 'running')
+
+        start = time.perf_counter()
+        status = 'done'
+        with tracer.span(f"stage.{stage.name}") as span:
+            try:
+                results[stage.name] = await asyncio.wait_for(stage.func(results), stage.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stage '{stage.name}' timed out after {stage.timeout}s, using fallback")
+                results[stage.name] = stage.get_fallback(results)
+                status = 'timeout'
+            except Exception as e:
+                logger.error(f"Stage '{stage.name}' failed: {str(e)}, using fallback")
+                results[stage.name] = stage.get_fallback(results)
+                status = 'failed'
+            finally:
+                timings[stage.name] = time.perf_counter() - start
+            span.set('status', status)
+
+        if on_result and status == 'done' and stage.persist:
+            try:
+                await on_result(stage.name, results[stage.name])
+            except Exception as e:
+                logger.error(f"Error recording result of stage '{stage.name}': {str(e)}")
+
+        if on_stage:
+            on_stage(stage.name, status)
+
+    async def run(
+        self,
+        on_stage: Optional[StageCallback] = None,
+        on_result: Optional[ResultCallback] = None,
+        restored: Optional[StageResults] = None
+    ) -> Tuple[StageResults, Dict[str, float]]:
+        """Run all stages and return their results and durations in seconds.
+
+        Stages whose results are passed in ``restored`` are skipped.
+        """
+        results: StageResults = {name: value for name, value in (restored or {}).items() if name in self.stages}
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        if on_stage:
+            for name in self.stages:
+                on_stage(name, 'pending')
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage, tasks, results, timings, on_stage, on_result))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        return results, timings
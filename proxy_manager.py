@@ -1,150 +1,214 @@
 import os
+import time
 import logging
 import aiohttp
 import asyncio
-from typing import Optional, Dict
-from datetime import datetime, timedelta
+from collections import deque
+from typing import Optional, Dict, Any, Deque, List, Tuple
+from urllib.parse import urlsplit
+from datetime import datetime
 import random
 
+from config import settings
+
 logger = logging.getLogger(__name__)
 
+class ProxyScore:
+    """Rolling success rate and latency of a single proxy"""
+
+    def __init__(self, window: int = settings.PROXY_SCORE_WINDOW):
+        # (succeeded, latency in seconds) of the most recent uses and health checks
+        self.outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.last_checked: Optional[datetime] = None
+
+    def record(self, success: bool, latency: float = 0.0) -> None:
+        self.outcomes.append((success, latency))
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+
+    @property
+    def success_rate(self) -> float:
+        # Smoothed so an unused proxy starts at 0.5 instead of 0 or 1
+        successes = sum(1 for success, _ in self.outcomes if success)
+        return (successes + 1) / (len(self.outcomes) + 2)
+
+    @property
+    def latency(self) -> float:
+        latencies = [latency for success, latency in self.outcomes if success]
+        return sum(latencies) / len(latencies) if latencies else 1.0
+
+    @property
+    def weight(self) -> float:
+        """Selection weight favouring reliable, fast proxies"""
+        return self.success_rate ** 2 / max(self.latency, 0.05)
+
 class ProxyManager:
     def __init__(self):
         self.proxy_url = os.getenv('PROXY_URL')
         self.proxy_username = os.getenv('PROXY_USERNAME')
         self.proxy_password = os.getenv('PROXY_PASSWORD')
-        
+
         # Proxy pool management
-        self.proxy_pool = []
+        self.proxy_pool: List[Dict[str, str]] = []
+        self.scores: Dict[str, ProxyScore] = {}
         self.last_refresh = None
-        self.refresh_interval = timedelta(minutes=30)
-        self.max_retries = 3
+        self.refresh_interval = settings.PROXY_HEALTH_CHECK_INTERVAL
+        self.max_failures = settings.PROXY_MAX_CONSECUTIVE_FAILURES
         self.current_proxy = None
-        
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._health_task: Optional[asyncio.Task] = None
+
     async def initialize(self) -> None:
-        """Initialize the proxy manager and fetch initial proxies"""
-        if not all([self.proxy_url, self.proxy_username, self.proxy_password]):
+        """Build the proxy pool and start background health checks"""
+        if not await self.should_use_proxies():
             logger.warning("Proxy configuration not complete. Running without proxies.")
             return
-            
-        await self.refresh_proxy_pool()
-        
+
+        self.proxy_pool = self.build_proxy_pool()
+        self.scores = {proxy['server']: ProxyScore() for proxy in self.proxy_pool}
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+
+    def build_proxy_pool(self) -> List[Dict[str, str]]:
+        """Build proxy configs for each port of the main proxy"""
+        url = self.proxy_url if '://' in self.proxy_url else f"http://{self.proxy_url}"
+        parts = urlsplit(url)
+        return [
+            {
+                'server': f"{parts.scheme}://{parts.hostname}:{port}",
+                'username': self.proxy_username,
+                'password': self.proxy_password
+            }
+            for port in settings.PROXY_PORTS
+        ]
+
+    async def _health_check_loop(self) -> None:
+        """Periodically test every proxy in the background"""
+        while True:
+            await self.refresh_proxy_pool()
+            await asyncio.sleep(self.refresh_interval)
+
     async def refresh_proxy_pool(self) -> None:
-        """Refresh the pool of available proxies"""
+        """Test all proxies concurrently and update their scores"""
         try:
-            if not all([self.proxy_url, self.proxy_username, self.proxy_password]):
+            if not self.proxy_pool:
                 return
-                
-            # Basic proxy rotation using the main proxy with different ports
-            base_ports = [8000, 8001, 8002, 8003, 8004]
-            self.proxy_pool = []
-            
-            for port in base_ports:
-                proxy_config = {
-                    'server': f"{self.proxy_url.split(':')[0]}:{port}",
-                    'username': self.proxy_username,
-                    'password': self.proxy_password
-                }
-                
-                # Test the proxy
-                if await self.test_proxy(proxy_config):
-                    self.proxy_pool.append(proxy_config)
-                    
+
+            results = await asyncio.gather(*(self.test_proxy(proxy) for proxy in self.proxy_pool))
             self.last_refresh = datetime.now()
-            logger.info(f"Refreshed proxy pool. {len(self.proxy_pool)} working proxies available.")
-            
+            logger.info(f"Refreshed proxy pool. {sum(results)}/{len(results)} working proxies available.")
+
         except Exception as e:
             logger.error(f"Error refreshing proxy pool: {str(e)}")
-            
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the session shared by all proxy health checks"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.PROXY_TEST_TIMEOUT)
+            )
+        return self._session
+
     async def test_proxy(self, proxy_config: Dict[str, str]) -> bool:
-        """Test if a proxy is working"""
+        """Test if a proxy is working and record the outcome in its score"""
+        start = time.perf_counter()
         try:
-            proxy_url = f"http://{proxy_config['username']}:{proxy_config['password']}@{proxy_config['server']}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    'https://api.ipify.org?format=json',
-                    proxy=proxy_url,
-                    timeout=10
-                ) as response:
-                    if response.status == 200:
-                        return True
-            return False
-            
+            async with self._get_session().get(
+                settings.PROXY_TEST_URL,
+                proxy=self.get_proxy_url(proxy_config)
+            ) as response:
+                success = response.status == 200
+
         except Exception as e:
             logger.debug(f"Proxy test failed: {str(e)}")
-            return False
-            
+            success = False
+
+        self.record_result(proxy_config, success, time.perf_counter() - start)
+        score = self.scores.get(proxy_config['server'])
+        if score:
+            score.last_checked = datetime.now()
+        return success
+
+    def record_result(self, proxy_config: Optional[Dict[str, str]], success: bool, latency: float = 0.0) -> None:
+        """Feed the outcome of a request made through a proxy back into its score"""
+        if not proxy_config:
+            return
+        score = self.scores.get(proxy_config['server'])
+        if score:
+            score.record(success, latency)
+
+    def is_available(self, proxy_config: Dict[str, str]) -> bool:
+        """A proxy is skipped after too many consecutive failures until a health check passes"""
+        score = self.scores.get(proxy_config['server'])
+        return score is None or score.consecutive_failures < self.max_failures
+
     async def get_proxy(self) -> Optional[Dict[str, str]]:
-        """Get a working proxy from the pool"""
+        """Pick a proxy from the pool, weighted by its recent success rate and latency"""
         try:
-            if not self.proxy_pool:
-                if not await self.should_use_proxies():
-                    return None
-                await self.refresh_proxy_pool()
-                if not self.proxy_pool:
-                    return None
-                    
-            # Check if we need to refresh the pool
-            if self.last_refresh and datetime.now() - self.last_refresh > self.refresh_interval:
-                await self.refresh_proxy_pool()
-                
-            # Rotate through proxies
-            if self.proxy_pool:
-                self.current_proxy = random.choice(self.proxy_pool)
-                return self.current_proxy
-                
-            return None
-            
+            candidates = [proxy for proxy in self.proxy_pool if self.is_available(proxy)]
+            if not candidates:
+                return None
+
+            weights = [self.scores[proxy['server']].weight for proxy in candidates]
+            self.current_proxy = random.choices(candidates, weights=weights)[0]
+            return self.current_proxy
+
         except Exception as e:
             logger.error(f"Error getting proxy: {str(e)}")
             return None
-            
+
     async def should_use_proxies(self) -> bool:
         """Determine if proxies should be used"""
         return all([self.proxy_url, self.proxy_username, self.proxy_password])
-        
+
     async def mark_proxy_failed(self, proxy_config: Dict[str, str]) -> None:
-        """Mark a proxy as failed and remove it from the pool"""
-        try:
-            if proxy_config in self.proxy_pool:
-                self.proxy_pool.remove(proxy_config)
-                logger.warning(f"Removed failed proxy: {proxy_config['server']}")
-                
-            # Refresh pool if running low on proxies
-            if len(self.proxy_pool) < 2:
-                await self.refresh_proxy_pool()
-                
-        except Exception as e:
-            logger.error(f"Error marking proxy as failed: {str(e)}")
-            
-    async def get_working_proxy(self, max_attempts: int = 3) -> Optional[Dict[str, str]]:
-        """Get a working proxy with retry logic"""
-        for attempt in range(max_attempts):
-            proxy = await self.get_proxy()
-            if not proxy:
-                return None
-                
-            if await self.test_proxy(proxy):
-                return proxy
-                
-            await self.mark_proxy_failed(proxy)
-            await asyncio.sleep(1)
-            
-        return None
-        
+        """Record a failure for a proxy, lowering its selection weight"""
+        self.record_result(proxy_config, False)
+        if proxy_config and not self.is_available(proxy_config):
+            logger.warning(f"Proxy {proxy_config['server']} skipped until its next health check")
+
+    async def get_working_proxy(self) -> Optional[Dict[str, str]]:
+        """Get a proxy that is currently considered healthy"""
+        # Health is tracked by background checks and request outcomes, no re-test needed
+        return await self.get_proxy()
+
     def get_proxy_url(self, proxy_config: Dict[str, str]) -> str:
         """Convert proxy config to URL format"""
         if not proxy_config:
             return None
-            
-        return f"http://{proxy_config['username']}:{proxy_config['password']}@{proxy_config['server']}"
-        
+
+        parts = urlsplit(proxy_config['server'])
+        return f"{parts.scheme}://{proxy_config['username']}:{proxy_config['password']}@{parts.netloc}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get score and availability per proxy"""
+        return {
+            'enabled': bool(self.proxy_pool),
+            'last_refresh': self.last_refresh.isoformat() if self.last_refresh else None,
+            'proxies': {
+                server: {
+                    'available': score.consecutive_failures < self.max_failures,
+                    'success_rate': round(score.success_rate, 3),
+                    'latency_ms': round(score.latency * 1000, 1),
+                    'weight': round(score.weight, 3)
+                }
+                for server, score in self.scores.items()
+            }
+        }
+
     async def cleanup(self) -> None:
         """Cleanup resources"""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        if self._session:
+            await self._session.close()
+            self._session = None
         self.proxy_pool = []
+        self.scores = {}
         self.current_proxy = None
         logger.info("Proxy manager cleaned up")
 
 # Create singleton instance
-proxy_manager = ProxyManager()
\ No newline at end of file
+proxy_manager = ProxyManager()
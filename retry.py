@@ -0,0 +1,66 @@
+import random
+from typing import Any, Dict
+
+from config import settings
+
+# Responses worth retrying: the gateway or service was briefly unavailable
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+def backoff_delay(
+    attempt: int,
+    base: float = settings.RETRY_BACKOFF_BASE,
+    cap: float = settings.RETRY_BACKOFF_MAX
+) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class RetryBudget:
+    """Token-bucket retry throttle per downstream service.
+
+    Every retryable failure costs one token and every success earns back a
+    fraction of one. Retries (and hedged requests) are only allowed while the
+    bucket is more than half full, so during an outage retries stop instead
+    of multiplying the load on the failing service.
+    """
+
+    def __init__(
+        self,
+        max_tokens: float = settings.RETRY_BUDGET_MAX_TOKENS,
+        token_ratio: float = settings.RETRY_BUDGET_TOKEN_RATIO
+    ):
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.tokens = max_tokens
+
+        self.retries = 0
+        self.denied = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record_success(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def record_failure(self) -> None:
+        self.tokens = max(0.0, self.tokens - 1)
+
+    def can_retry(self) -> bool:
+        return self.tokens > self.max_tokens / 2
+
+    def acquire_retry(self) -> bool:
+        """Account for a retryable failure and check whether a retry may be sent"""
+        self.record_failure()
+        if not self.can_retry():
+            self.denied += 1
+            return False
+        self.retries += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry and hedging counters"""
+        return {
+            'retries': self.retries,
+            'retries_denied': self.denied,
+            'budget_tokens': round(self.tokens, 2),
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins
+        }
@@ -0,0 +1,116 @@
+import logging
+import asyncio
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from playwright.async_api import BrowserContext, Page, Request, Route
+
+from config import settings
+from monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+def _matches(hostname: str, domains: List[str]) -> bool:
+    """Check whether a hostname is one of the domains or a subdomain of one"""
+    return any(hostname == domain or hostname.endswith(f".{domain}") for domain in domains)
+
+class ScrapeProfile:
+    """Lightweight browser profile for scraping text.
+
+    Requests are routed through a filter that aborts non-essential resource
+    types, denied domains and (when an allow list is set) third-party domains.
+    Contexts use a small viewport with reduced motion.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.SCRAPER_BLOCK_RESOURCES,
+        blocked_resource_types: Optional[List[str]] = None,
+        allowed_domains: Optional[List[str]] = None,
+        blocked_domains: Optional[List[str]] = None
+    ):
+        self.enabled = enabled
+        self.blocked_resource_types = set(
+            settings.SCRAPER_BLOCKED_RESOURCE_TYPES if blocked_resource_types is None else blocked_resource_types
+        )
+        self.allowed_domains = settings.SCRAPER_ALLOWED_DOMAINS if allowed_domains is None else allowed_domains
+        self.blocked_domains = settings.SCRAPER_BLOCKED_DOMAINS if blocked_domains is None else blocked_domains
+
+        self._allowed_requests = 0
+        self._blocked_by_type: Dict[str, int] = {}
+        self._blocked_by_domain = 0
+
+    def context_options(self) -> Dict[str, Any]:
+        """Options for new browser contexts using this profile"""
+        return {
+            'viewport': {'width': settings.SCRAPER_VIEWPORT_WIDTH, 'height': settings.SCRAPER_VIEWPORT_HEIGHT},
+            'reduced_motion': 'reduce'
+        }
+
+    async def install(self, context: BrowserContext) -> None:
+        """Route all requests of a context through the resource filter"""
+        if self.enabled:
+            await context.route('**/*', self._route)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Decide whether a request is non-essential for reading headlines and articles"""
+        if resource_type in self.blocked_resource_types:
+            self._blocked_by_type[resource_type] = self._blocked_by_type.get(resource_type, 0) + 1
+            return True
+
+        hostname = urlsplit(url).hostname or ''
+        if hostname and (
+            _matches(hostname, self.blocked_domains)
+            or (self.allowed_domains and not _matches(hostname, self.allowed_domains))
+        ):
+            self._blocked_by_domain += 1
+            return True
+
+        self._allowed_requests += 1
+        return False
+
+    async def _route(self, route: Route) -> None:
+        request = route.request
+        try:
+            if self.should_block(request.resource_type, request.url):
+                await route.abort()
+            else:
+                await route.continue_()
+        except Exception as e:
+            logger.debug(f"Error routing {request.url}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counts of allowed and blocked requests"""
+        return {
+            'enabled': self.enabled,
+            'requests_allowed': self._allowed_requests,
+            'requests_blocked_by_domain': self._blocked_by_domain,
+            'requests_blocked_by_type': dict(self._blocked_by_type)
+        }
+
+class PageMeter:
+    """Counts the bytes a page transferred over the network"""
+
+    def __init__(self, page: Page):
+        self._sizes: List[asyncio.Future] = []
+        page.on('requestfinished', self._on_request_finished)
+
+    def _on_request_finished(self, request: Request) -> None:
+        self._sizes.append(asyncio.ensure_future(request.sizes()))
+
+    async def total_bytes(self) -> int:
+        """Sum of request and response sizes, headers included"""
+        total = 0
+        for sizes in await asyncio.gather(*self._sizes, return_exceptions=True):
+            if isinstance(sizes, dict):
+                total += sum(max(0, value) for value in sizes.values())
+        return total
+
+    async def record(self) -> None:
+        """Record the page's transferred bytes in the scraper metrics"""
+        try:
+            monitor.log_page_transfer(await self.total_bytes())
+        except Exception as e:
+            logger.debug(f"Error measuring page transfer: {str(e)}")
+
+# Create singleton instance
+scrape_profile = ScrapeProfile()
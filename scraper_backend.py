@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict
+
+# TradingView page structure shared by the scraper backends
+HEADLINE_SELECTOR = '[data-name="news-headline-title"]'
+NEWS_LIST_SELECTOR = '.news-headline-card'
+ARTICLE_BODY_SELECTOR = '.body-KX2tCBZq'
+LOGIN_BUTTON_SELECTOR = 'button[type="submit"]'
+PROVIDER_SELECTOR = '.provider-TUPxzdRV'
+DATE_SELECTOR = '.date-TUPxzdRV'
+
+class ScraperWallError(Exception):
+    """Raised by a backend when a page needs JavaScript or a login to show its content"""
+
+    def __init__(self, kind: str, url: str):
+        super().__init__(f"{kind} wall at {url}")
+        self.kind = kind
+        self.url = url
+
+class NewsBackend(ABC):
+    """Interface of a TradingView news scraper backend"""
+
+    name = 'base'
+
+    @abstractmethod
+    async def get_news(self, instrument: str, max_articles: int = 3) -> List[Dict[str, str]]:
+        """Get up to max_articles articles (title, content, provider, date, url) for an instrument"""
+
+    async def close(self) -> None:
+        """Release resources held by the backend"""
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import logging
+import asyncio
+from typing import Any, Dict, Optional
+from playwright.async_api import BrowserContext
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class SessionStore:
+    """Authenticated TradingView browser session shared by all contexts.
+
+    The Playwright storage state (cookies and localStorage) captured after a
+    login is kept in memory and on disk, so new contexts and restarts reuse it
+    until it expires instead of logging in again.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.TRADINGVIEW_SESSION_PATH,
+        max_age: float = settings.TRADINGVIEW_SESSION_MAX_AGE,
+        session_cookie: str = settings.TRADINGVIEW_SESSION_COOKIE
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.session_cookie = session_cookie
+        # Incremented on every saved login, so waiters can tell a session was refreshed
+        self.version = 0
+
+        self._state: Optional[Dict[str, Any]] = None
+        self._saved_at = 0.0
+        self._loaded = False
+        self._lock: Optional[asyncio.Lock] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._logins = 0
+        self._login_failures = 0
+        self._expired = 0
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Lock serializing logins, created on first use in the running loop"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _read(self) -> None:
+        """Load the persisted session once"""
+        self._loaded = True
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                stored = json.load(f)
+            self._state = stored['state']
+            self._saved_at = stored['saved_at']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read TradingView session from {self.path}: {str(e)}")
+
+    def _is_valid(self) -> bool:
+        if self._state is None:
+            return False
+        if time.time() - self._saved_at > self.max_age:
+            return False
+        for cookie in self._state.get('cookies', []):
+            expires = cookie.get('expires', -1)
+            if cookie.get('name') == self.session_cookie and 0 < expires < time.time():
+                return False
+        return True
+
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        """Get the stored session for a new context, or None if there is no valid one"""
+        if not self._loaded:
+            self._read()
+        if self._is_valid():
+            self._hits += 1
+            return self._state
+        if self._state is not None:
+            self._expired += 1
+            self._state = None
+        self._misses += 1
+        return None
+
+    def invalidate(self) -> None:
+        """Forget a session the site no longer accepts"""
+        if self._state is not None:
+            logger.info("Stored TradingView session was rejected, logging in again")
+            self._expired += 1
+            self._state = None
+
+    async def save(self, context: BrowserContext) -> None:
+        """Capture the context's authenticated state and persist it"""
+        self._state = await context.storage_state()
+        self._saved_at = time.time()
+        self.version += 1
+        self._logins += 1
+
+        payload = {'saved_at': self._saved_at, 'state': self._state}
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write, payload)
+        except Exception as e:
+            logger.warning(f"Could not persist TradingView session to {self.path}: {str(e)}")
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        """Atomically write the session file, readable by the owner only"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(temp_path, self.path)
+
+    def record_login_failure(self) -> None:
+        self._login_failures += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session reuse statistics"""
+        return {
+            'session_hits': self._hits,
+            'session_misses': self._misses,
+            'sessions_expired': self._expired,
+            'logins': self._logins,
+            'login_failures': self._login_failures,
+            'session_age_seconds': round(time.time() - self._saved_at, 1) if self._state else None
+        }
+
+# Create singleton instance
+session_store = SessionStore()
@@ -0,0 +1,435 @@
+import os
+import json
+import time
+import socket
+import logging
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from monitoring import monitor, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS workers (
+        worker TEXT PRIMARY KEY,
+        pid INTEGER NOT NULL,
+        started_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS counters (
+        worker TEXT NOT NULL,
+        name TEXT NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (worker, name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS histograms (
+        worker TEXT NOT NULL,
+        family TEXT NOT NULL,
+        name TEXT NOT NULL,
+        bounds TEXT NOT NULL,
+        counts TEXT NOT NULL,
+        sum REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (worker, family, name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cache (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value BLOB NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)",
+    """
+    CREATE TABLE IF NOT EXISTS claims (
+        key TEXT PRIMARY KEY,
+        worker TEXT NOT NULL,
+        result TEXT,
+        expires_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_claims_expires_at ON claims (expires_at)"
+]
+
+# Pseudo-worker holding the final counters and histograms of workers that are gone
+RETIRED_WORKER = 'retired'
+
+# Snapshot of one worker's histograms: (family, name) -> (bounds, counts, sum, count)
+HistogramSnapshot = Dict[Tuple[str, str], Tuple[List[float], List[int], float, int]]
+
+class SharedState:
+    """Counters, histograms, cache entries and dedup claims shared by all uvicorn workers.
+
+    State lives in a local SQLite (WAL) file. Workers keep counting in memory
+    and publish a snapshot every publish_interval seconds, so the hot path takes
+    no cross-process lock and /metrics sums the snapshots of live workers. The
+    last snapshot of a worker that stopped or expired is folded into a retired
+    total, so cluster counters never go down when a worker goes away. Cache
+    entries and claims are read and written directly, so a cache fill or a
+    claimed signal in one worker is visible to the others at once.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.SHARED_STATE_PATH,
+        publish_interval: float = settings.SHARED_STATE_PUBLISH_INTERVAL,
+        worker_ttl: float = settings.SHARED_STATE_WORKER_TTL
+    ):
+        self.path = path
+        self.publish_interval = publish_interval
+        self.worker_ttl = worker_ttl
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.started_at = time.time()
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._publisher: Optional[asyncio.Task] = None
+        self._latency = {
+            operation: monitor.histogram('shared_state', operation)
+            for operation in ('cache_get', 'cache_set', 'claim')
+        }
+
+        self._publishes = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._claims_won = 0
+        self._claims_lost = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._connection is not None
+
+    async def open(self) -> None:
+        """Open the shared database and start publishing this worker's metrics"""
+        if self._connection:
+            return
+        # The worker id is taken here, after uvicorn forked the worker process
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shared-state')
+        await self._run(self._open)
+        await self.publish()
+        self._publisher = asyncio.ensure_future(self._publish_loop())
+        logger.info(f"Shared state opened at {self.path} as worker {self.worker}")
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10.0)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Shared state is rebuilt by the workers, it does not need to survive a power loss
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            connection.execute(statement)
+        self._connection = connection
+
+    async def _run(self, func, *args):
+        """Run a blocking database call on this worker's database thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _transaction(
+        self,
+        statements: List[Tuple[str, Tuple[Any, ...]]],
+        retire: Optional[Tuple[str, Tuple[Any, ...]]] = None
+    ) -> None:
+        """Run the statements atomically, first retiring the workers matched by the optional (where, params)"""
+        connection = self._connection
+        # IMMEDIATE takes the write lock up front instead of failing to upgrade a read lock
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if retire:
+                self._retire(*retire)
+            for sql, params in statements:
+                connection.execute(sql, params)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _retire(self, where: str, params: Tuple[Any, ...]) -> None:
+        """Fold the metrics of the matching workers into the retired totals and remove them.
+
+        Runs inside a write transaction, so a worker is retired exactly once
+        even when several workers notice it expired at the same time.
+        """
+        connection = self._connection
+        workers = tuple(row[0] for row in connection.execute(f"SELECT worker FROM workers WHERE {where}", params))
+        if not workers:
+            return
+        placeholders = ','.join('?' * len(workers))
+
+        connection.execute(
+            f"INSERT INTO counters (worker, name, value) "
+            f"SELECT ?, name, SUM(value) FROM counters WHERE worker IN ({placeholders}) GROUP BY name "
+            f"ON CONFLICT(worker, name) DO UPDATE SET value = value + excluded.value",
+            (RETIRED_WORKER,) + workers
+        )
+
+        merged: Dict[Tuple[str, str], List[Any]] = {}
+        for family, name, bounds, counts, total, count in connection.execute(
+            f"SELECT family, name, bounds, counts, sum, count FROM histograms WHERE worker IN (?, {placeholders})",
+            (RETIRED_WORKER,) + workers
+        ):
+            counts = json.loads(counts)
+            entry = merged.get((family, name))
+            if entry is None:
+                merged[(family, name)] = [bounds, counts, total, count]
+                continue
+            entry[1] = [left + right for left, right in zip(entry[1], counts)]
+            entry[2] += total
+            entry[3] += count
+        connection.executemany(
+            "INSERT OR REPLACE INTO histograms (worker, family, name, bounds, counts, sum, count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (RETIRED_WORKER, family, name, bounds, json.dumps(counts), total, count)
+                for (family, name), (bounds, counts, total, count) in merged.items()
+            ]
+        )
+
+        for table in ('counters', 'histograms', 'workers'):
+            connection.execute(f"DELETE FROM {table} WHERE worker IN ({placeholders})", workers)
+        logger.info(f"Retired shared metrics of workers {', '.join(workers)}")
+
+    # Metrics
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Error publishing shared metrics: {str(e)}")
+
+    @staticmethod
+    def _snapshot() -> Tuple[Dict[str, float], HistogramSnapshot]:
+        """Copy this worker's counters and histograms.
+
+        Copied on the event loop thread so the database thread never sees a half-updated histogram.
+        """
+        counters = monitor.get_counters()
+        histograms: HistogramSnapshot = {
+            (family, name): (histogram.bounds, list(histogram.counts), histogram.sum, histogram.count)
+            for family, named in monitor.histograms.items()
+            for name, histogram in named.items()
+        }
+        return counters, histograms
+
+    async def publish(self) -> None:
+        """Publish this worker's counters and histograms and drop expired cache entries and claims"""
+        await self._run(self._publish, *self._snapshot())
+        self._publishes += 1
+
+    def _publish(self, counters: Dict[str, float], histograms: HistogramSnapshot) -> None:
+        """Write this worker's snapshot, retiring workers that stopped publishing"""
+        now = time.time()
+        statements = [
+            (
+                "INSERT OR REPLACE INTO workers (worker, pid, started_at, updated_at) VALUES (?, ?, ?, ?)",
+                (self.worker, os.getpid(), self.started_at, now)
+            ),
+            ("DELETE FROM cache WHERE expires_at < ?", (now,)),
+            ("DELETE FROM claims WHERE expires_at < ?", (now,))
+        ]
+        statements.extend(
+            ("INSERT OR REPLACE INTO counters (worker, name, value) VALUES (?, ?, ?)", (self.worker, name, value))
+            for name, value in counters.items()
+        )
+        statements.extend(
+            (
+                "INSERT OR REPLACE INTO histograms (worker, family, name, bounds, counts, sum, count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.worker, family, name, json.dumps(bounds), json.dumps(counts), total, count)
+            )
+            for (family, name), (bounds, counts, total, count) in histograms.items()
+        )
+        self._transaction(statements, retire=("updated_at < ? AND worker != ?", (now - self.worker_ttl, self.worker)))
+
+    async def get_cluster_snapshot(self) -> Dict[str, Any]:
+        """Get counters and histograms summed over all live and retired workers.
+
+        Other workers contribute what they last published; this worker's live
+        values are merged in memory, so reading metrics never writes to the database.
+        Workers that expired but were not retired yet are counted as retired already.
+        """
+        return await self._run(self._aggregate, *self._snapshot())
+
+    def _aggregate(self, local_counters: Dict[str, float], local_histograms: HistogramSnapshot) -> Dict[str, Any]:
+        connection = self._connection
+        cutoff = time.time() - self.worker_ttl
+        workers = connection.execute(
+            "SELECT worker, pid, started_at, updated_at FROM workers WHERE updated_at >= ? ORDER BY worker",
+            (cutoff,)
+        ).fetchall()
+        # Expired workers still count until the next publish moves them into the retired totals
+        others = tuple(
+            row[0] for row in connection.execute("SELECT worker FROM workers WHERE worker != ?", (self.worker,))
+        ) + (RETIRED_WORKER,)
+        placeholders = ','.join('?' * len(others))
+
+        counters: Dict[str, float] = dict(local_counters)
+        for name, value in connection.execute(
+            f"SELECT name, SUM(value) FROM counters WHERE worker IN ({placeholders}) GROUP BY name", others
+        ):
+            total = counters.get(name, 0) + value
+            counters[name] = int(total) if float(total).is_integer() else total
+
+        histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+
+        def merge(family: str, name: str, bounds: List[float], counts: List[int], total: float, count: int) -> None:
+            histogram = histograms.setdefault(family, {}).get(name)
+            if histogram is None:
+                histogram = histograms[family][name] = LatencyHistogram(bounds)
+            for index, bucket_count in enumerate(counts[:len(histogram.counts)]):
+                histogram.counts[index] += bucket_count
+            histogram.sum += total
+            histogram.count += count
+
+        for (family, name), (bounds, counts, total, count) in local_histograms.items():
+            merge(family, name, bounds, counts, total, count)
+        for family, name, bounds, counts, total, count in connection.execute(
+            f"SELECT family, name, bounds, counts, sum, count FROM histograms WHERE worker IN ({placeholders})", others
+        ):
+            merge(family, name, json.loads(bounds), json.loads(counts), total, count)
+
+        return {
+            'workers': [
+                {'worker': worker, 'pid': pid, 'started_at': started_at, 'updated_at': updated_at}
+                for worker, pid, started_at, updated_at in workers
+            ],
+            'counters': counters,
+            'histograms': histograms
+        }
+
+    # Cache
+
+    async def cache_get(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        """Get a shared cache entry as (value, seconds left), or None if missing or expired"""
+        with self._latency['cache_get'].time():
+            row = await self._run(self._cache_get, namespace, key)
+        if row is None:
+            self._cache_misses += 1
+            return None
+        self._cache_hits += 1
+        return row
+
+    def _cache_get(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        row = self._connection.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        remaining = row[1] - time.time()
+        return (bytes(row[0]), remaining) if remaining > 0 else None
+
+    async def cache_set(self, namespace: str, key: str, value: bytes, ttl: float) -> None:
+        """Store a cache entry visible to all workers for ttl seconds"""
+        with self._latency['cache_set'].time():
+            await self._run(self._transaction, [(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(value), time.time() + ttl)
+            )])
+
+    # Dedup claims
+
+    async def claim(self, key: str, ttl: float) -> bool:
+        """Claim a key for this worker; False if another worker holds an unexpired claim"""
+        with self._latency['claim'].time():
+            won = await self._run(self._claim, key, ttl)
+        if won:
+            self._claims_won += 1
+        else:
+            self._claims_lost += 1
+        return won
+
+    def _claim(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        cursor = self._connection.execute(
+            "INSERT INTO claims (key, worker, result, expires_at) VALUES (?, ?, NULL, ?) "
+            "ON CONFLICT(key) DO UPDATE SET worker = excluded.worker, result = NULL, expires_at = excluded.expires_at "
+            "WHERE claims.expires_at < ?",
+            (key, self.worker, now + ttl, now)
+        )
+        return cursor.rowcount > 0
+
+    async def complete_claim(self, key: str, result: Any) -> None:
+        """Store the JSON-serializable result of a claimed key for duplicates in other workers"""
+        await self._run(self._transaction, [(
+            "UPDATE claims SET result = ? WHERE key = ? AND worker = ?",
+            (json.dumps(result), key, self.worker)
+        )])
+
+    async def release_claim(self, key: str) -> None:
+        """Release a claim whose work failed, so a retry can run in any worker"""
+        await self._run(self._transaction, [(
+            "DELETE FROM claims WHERE key = ? AND worker = ?",
+            (key, self.worker)
+        )])
+
+    async def wait_claim(self, key: str, timeout: float, poll_interval: float = 0.1) -> Tuple[bool, Any]:
+        """Wait for another worker's claim to complete; returns (completed, result)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            row = await self._run(self._get_claim, key)
+            if row is None:
+                # Released or expired: the original failed
+                return False, None
+            if row[0] is not None:
+                return True, json.loads(row[0])
+            await asyncio.sleep(poll_interval)
+        return False, None
+
+    def _get_claim(self, key: str) -> Optional[Tuple[Optional[str]]]:
+        return self._connection.execute(
+            "SELECT result FROM claims WHERE key = ? AND expires_at >= ?",
+            (key, time.time())
+        ).fetchone()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get this worker's shared state statistics"""
+        return {
+            'path': self.path,
+            'worker': self.worker,
+            'publishes': self._publishes,
+            'cache_hits': self._cache_hits,
+            'cache_misses': self._cache_misses,
+            'claims_won': self._claims_won,
+            'claims_lost': self._claims_lost
+        }
+
+    async def close(self) -> None:
+        """Stop publishing, fold this worker's metrics into the retired totals and close the database"""
+        if self._publisher:
+            self._publisher.cancel()
+            await asyncio.gather(self._publisher, return_exceptions=True)
+            self._publisher = None
+        if self._connection:
+            try:
+                # The final snapshot, so counts since the last publish are not lost
+                await self.publish()
+                await self._run(self._transaction, [], ("worker = ?", (self.worker,)))
+            except Exception as e:
+                logger.error(f"Error removing worker {self.worker} from shared state: {str(e)}")
+            await self._run(self._connection.close)
+            self._connection = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info("Shared state closed")
+
+# Create singleton instance
+shared_state = SharedState()
@@ -0,0 +1,180 @@
+import math
+import logging
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class SignalJob:
+    """A trading signal accepted for background processing"""
+
+    def __init__(self, signal: Any, job_id: Optional[str] = None, restored: Optional[Dict[str, Any]] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.signal = signal
+        # Stage results recovered from the signal store, skipped when processing
+        self.restored = restored
+        self.status = 'queued'
+        self.stages: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.enqueued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def update_stage(self, stage: str, status: str) -> None:
+        """Record the progress of a pipeline stage"""
+        self.stages[stage] = status
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the job status as a JSON-serializable dict"""
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'instrument': getattr(self.signal, 'instrument', None),
+            'stages': self.stages,
+            'timings': self.timings,
+            'error': self.error,
+            'enqueued_at': iso(self.enqueued_at),
+            'started_at': iso(self.started_at),
+            'finished_at': iso(self.finished_at)
+        }
+
+JobHandler = Callable[[SignalJob], Awaitable[None]]
+
+class SignalQueue:
+    """Bounded in-memory queue of signals drained by a pool of asyncio workers"""
+
+    def __init__(
+        self,
+        workers: int = settings.SIGNAL_QUEUE_WORKERS,
+        max_size: int = settings.SIGNAL_QUEUE_MAX_SIZE,
+        history: int = settings.SIGNAL_JOB_HISTORY
+    ):
+        self.workers = workers
+        self.max_size = max_size
+        self.history = history
+
+        self.jobs: "OrderedDict[str, SignalJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._handler: Optional[JobHandler] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        # Smoothed time a job takes, behind the Retry-After estimate
+        self._job_time = 1.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, handler: JobHandler) -> None:
+        """Start the worker pool"""
+        if self._tasks:
+            return
+        self._handler = handler
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        logger.info(f"Signal queue started with {self.workers} workers")
+
+    def submit(
+        self,
+        signal: Any,
+        job_id: Optional[str] = None,
+        restored: Optional[Dict[str, Any]] = None
+    ) -> SignalJob:
+        """Enqueue a signal; raises asyncio.QueueFull when the queue is at capacity"""
+        if self._queue is None:
+            raise RuntimeError("Signal queue is not started")
+
+        job = SignalJob(signal, job_id, restored)
+        self._queue.put_nowait(job)
+        self._remember(job)
+        return job
+
+    def retry_after(self) -> int:
+        """Seconds until the workers are expected to have drained the queue"""
+        backlog = (self._queue.qsize() if self._queue else 0) + 1
+        return max(1, math.ceil(self._job_time * backlog / max(1, self.workers)))
+
+    def get_job(self, job_id: str) -> Optional[SignalJob]:
+        """Get a job by id"""
+        return self.jobs.get(job_id)
+
+    def _remember(self, job: SignalJob) -> None:
+        """Track a job, forgetting the oldest finished ones beyond the history size"""
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.history:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if oldest.status in ('queued', 'running'):
+                break
+            del self.jobs[oldest_id]
+
+    async def _worker(self, index: int) -> None:
+        """Process jobs until cancelled"""
+        while True:
+            job = await self._queue.get()
+            waited = time.time() - job.enqueued_at
+            self._wait_count += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+            self._busy += 1
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                await self._handler(job)
+                job.status = 'completed'
+                self._completed += 1
+            except asyncio.CancelledError:
+                job.status = 'cancelled'
+                raise
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+                self._failed += 1
+                logger.error(f"Signal job {job.id} failed: {str(e)}")
+            finally:
+                job.finished_at = time.time()
+                self._job_time = 0.9 * self._job_time + 0.1 * (job.finished_at - job.started_at)
+                self._busy -= 1
+                self._queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, wait time and worker saturation"""
+        return {
+            'enabled': self.running,
+            'depth': self._queue.qsize() if self._queue else 0,
+            'max_size': self.max_size,
+            'workers': self.workers,
+            'busy_workers': self._busy,
+            'saturation': self._busy / self.workers if self.workers else 0.0,
+            'completed': self._completed,
+            'failed': self._failed,
+            'wait_avg_ms': (self._wait_total / self._wait_count * 1000) if self._wait_count else 0.0,
+            'wait_max_ms': self._wait_max * 1000
+        }
+
+    async def stop(self) -> None:
+        """Cancel the workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Signal queue stopped")
+
+# Create singleton instance
+signal_queue = SignalQueue()
@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+Statement = Tuple[str, Tuple[Any, ...]]
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS signals (
+        id TEXT PRIMARY KEY,
+        received_at REAL NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        error TEXT,
+        updated_at REAL NOT NULL,
+        owner TEXT,
+        claimed_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_signals_status ON signals (status)",
+    "CREATE INDEX IF NOT EXISTS idx_signals_received_at ON signals (received_at)",
+    """
+    CREATE TABLE IF NOT EXISTS stage_results (
+        signal_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        result TEXT,
+        completed_at REAL NOT NULL,
+        PRIMARY KEY (signal_id, stage)
+    )
+    """
+]
+
+# Added after the first release; older databases are migrated on open
+OWNERSHIP_COLUMNS = {'owner': 'TEXT', 'claimed_at': 'REAL'}
+
+class SignalStore:
+    """Append-only SQLite (WAL) log of accepted signals and their stage results.
+
+    Writes are queued and committed in batches by a single writer thread
+    (group commit), so concurrent signals share one fsync per batch.
+
+    Every unfinished signal is owned by the worker processing it, which keeps
+    its claims fresh with a heartbeat. Workers sharing the database only
+    resume signals that are unowned or whose owner stopped refreshing them.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.SIGNAL_STORE_PATH,
+        fsync: bool = settings.SIGNAL_STORE_FSYNC,
+        commit_interval_ms: float = settings.SIGNAL_STORE_COMMIT_INTERVAL_MS,
+        claim_ttl: float = settings.SIGNAL_STORE_CLAIM_TTL
+    ):
+        self.path = path
+        self.fsync = fsync
+        self.commit_interval = commit_interval_ms / 1000
+        self.claim_ttl = claim_ttl
+        # Unique per process: a restarted container can reuse both hostname and pid
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[List[Statement], asyncio.Future]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+        self._commits = 0
+        self._writes = 0
+        self._claimed = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._connection is not None
+
+    async def open(self) -> None:
+        """Open the database and create the schema"""
+        if self._connection:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='signal-store')
+        await self._run(self._open)
+        self._heartbeat = asyncio.ensure_future(self._heartbeat_loop())
+        logger.info(f"Signal store opened at {self.path} as {self.owner}")
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # FULL fsyncs the WAL on every commit; NORMAL only at checkpoints
+        connection.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+        for statement in SCHEMA:
+            connection.execute(statement)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(signals)")}
+        for column, column_type in OWNERSHIP_COLUMNS.items():
+            if column not in columns:
+                connection.execute(f"ALTER TABLE signals ADD COLUMN {column} {column_type}")
+        self._connection = connection
+
+    async def _run(self, func, *args):
+        """Run a blocking database call on the writer thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _write(self, statements: List[Statement]) -> None:
+        """Queue statements for the next group commit and wait until they are durable"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((statements, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush())
+        await future
+
+    async def _flush(self) -> None:
+        """Commit queued writes in batches until none are left"""
+        while self._pending:
+            if self.commit_interval:
+                # Give concurrent writers a moment to join the batch
+                await asyncio.sleep(self.commit_interval)
+
+            batch, self._pending = self._pending, []
+            try:
+                await self._run(self._commit, [statement for statements, _ in batch for statement in statements])
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            except Exception as e:
+                logger.error(f"Signal store commit failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _heartbeat_loop(self) -> None:
+        """Keep this worker's claims on its unfinished signals fresh"""
+        while True:
+            await asyncio.sleep(self.claim_ttl / 3)
+            try:
+                await self._write([(
+                    "UPDATE signals SET claimed_at = ? WHERE owner = ? AND status = 'accepted'",
+                    (time.time(), self.owner)
+                )])
+            except Exception as e:
+                logger.error(f"Error refreshing signal claims: {str(e)}")
+
+    def _commit(self, statements: List[Statement]) -> None:
+        connection = self._connection
+        connection.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                connection.execute(sql, params)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._commits += 1
+        self._writes += len(statements)
+
+    async def record_signal(self, signal_id: str, payload: Dict[str, Any]) -> None:
+        """Durably record an accepted signal"""
+        now = time.time()
+        await self._write([(
+            "INSERT OR IGNORE INTO signals (id, received_at, payload, status, updated_at, owner, claimed_at) "
+            "VALUES (?, ?, ?, 'accepted', ?, ?, ?)",
+            (signal_id, now, json.dumps(payload), now, self.owner, now)
+        )])
+
+    async def record_stage(self, signal_id: str, stage: str, result: Any) -> None:
+        """Record the result of a completed pipeline stage"""
+        await self._write([(
+            "INSERT OR REPLACE INTO stage_results (signal_id, stage, result, completed_at) VALUES (?, ?, ?, ?)",
+            (signal_id, stage, json.dumps(result), time.time())
+        )])
+
+    async def mark_status(self, signal_id: str, status: str, error: Optional[str] = None) -> None:
+        """Mark a signal as completed or failed"""
+        await self._write([(
+            "UPDATE signals SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, error, time.time(), signal_id)
+        )])
+
+    async def claim_unfinished(self) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """Claim unfinished signals no live worker owns; returns their (id, payload, completed stage results)"""
+        return await self._run(self._claim_unfinished)
+
+    def _claim_unfinished(self) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        now = time.time()
+        connection = self._connection
+        # IMMEDIATE takes the write lock up front, so two workers cannot claim the same rows
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT id, payload FROM signals WHERE status = 'accepted' "
+                "AND (owner IS NULL OR (owner != ? AND claimed_at < ?)) ORDER BY received_at",
+                (self.owner, now - self.claim_ttl)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE signals SET owner = ?, claimed_at = ? WHERE id = ?",
+                [(self.owner, now, signal_id) for signal_id, _ in rows]
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._claimed += len(rows)
+
+        unfinished = []
+        for signal_id, payload in rows:
+            stages = self._connection.execute(
+                "SELECT stage, result FROM stage_results WHERE signal_id = ?",
+                (signal_id,)
+            ).fetchall()
+            results = {stage: json.loads(result) for stage, result in stages}
+            unfinished.append((signal_id, json.loads(payload), results))
+        return unfinished
+
+    async def load_range(self, start: float, end: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """Get (id, payload) of signals received between two Unix timestamps"""
+        return await self._run(self._load_range, start, end)
+
+    def _load_range(self, start: float, end: float) -> List[Tuple[str, Dict[str, Any]]]:
+        rows = self._connection.execute(
+            "SELECT id, payload FROM signals WHERE received_at >= ? AND received_at < ? ORDER BY received_at",
+            (start, end)
+        ).fetchall()
+        return [(signal_id, json.loads(payload)) for signal_id, payload in rows]
+
+    async def prune(self, retention_days: float = settings.SIGNAL_STORE_RETENTION_DAYS) -> None:
+        """Delete finished signals older than the retention period"""
+        cutoff = time.time() - retention_days * 86400
+        await self._write([
+            (
+                "DELETE FROM stage_results WHERE signal_id IN "
+                "(SELECT id FROM signals WHERE status != 'accepted' AND received_at < ?)",
+                (cutoff,)
+            ),
+            ("DELETE FROM signals WHERE status != 'accepted' AND received_at < ?", (cutoff,))
+        ])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get group commit statistics"""
+        return {
+            'path': self.path,
+            'fsync': self.fsync,
+            'commits': self._commits,
+            'writes': self._writes,
+            'writes_per_commit': (self._writes / self._commits) if self._commits else 0.0,
+            'pending': len(self._pending),
+            'claimed': self._claimed
+        }
+
+    async def close(self) -> None:
+        """Flush pending writes and close the database"""
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        if self._flusher:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._connection:
+            await self._run(self._connection.close)
+            self._connection = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info("Signal store closed")
+
+# Create singleton instance
+signal_store = SignalStore()
@@ -0,0 +1,252 @@
+import time
+import base64
+import logging
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+
+from config import settings
+from monitoring import monitor
+from retry import backoff_delay
+from blob_store import blob_store
+from tracing import tracer
+from circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of sending a chunk
+DELIVERED = 'delivered'
+RETRY = 'retry'
+FAILED = 'failed'
+
+# Errors raised before the request reached Telegram, so resending cannot duplicate it
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, CircuitOpenError)
+
+def rate_limit_delay(response: httpx.Response) -> float:
+    """Seconds Telegram asked to wait in a 429, from parameters.retry_after or Retry-After"""
+    try:
+        return float(response.json()['parameters']['retry_after'])
+    except Exception:
+        pass
+    try:
+        return float(response.headers.get('Retry-After', 0))
+    except ValueError:
+        return 0.0
+
+class TokenBucket:
+    """Async token bucket allowing `rate` tokens per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """Wait until the tokens are available and take them; returns the seconds waited"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # A request larger than the bucket waits for a full bucket instead of forever
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+class TelegramDelivery:
+    """Chunked, rate-limited fan-out of a signal to its Telegram subscribers.
+
+    Chat ids are split into chunks sent concurrently to the Telegram service
+    under a token bucket matching Telegram's broadcast limit. Only failed
+    chunks are retried. The chart is uploaded once and referenced by id in
+    every chunk, or sent inline as base64 when the upload is not possible.
+
+    A chunk is only resent when it cannot have been delivered already: on a
+    connection error, a 429 (after the wait Telegram asked for) or a 5xx.
+    Other 4xx responses and read timeouts fail the chunk without a retry.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = settings.TELEGRAM_CHUNK_SIZE,
+        concurrency: int = settings.TELEGRAM_CHUNK_CONCURRENCY,
+        rate: float = settings.TELEGRAM_RATE_LIMIT,
+        burst: float = settings.TELEGRAM_RATE_BURST,
+        retries: int = settings.TELEGRAM_CHUNK_RETRIES
+    ):
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.bucket = TokenBucket(rate, burst)
+        # Set once the Telegram service turns out not to support chart uploads
+        self._upload_supported = True
+        # chart blob reference -> id returned by the upload, least recently used first
+        self._uploaded: "OrderedDict[str, str]" = OrderedDict()
+        self._chunk_latency = monitor.histogram('telegram', 'chunk')
+
+        self._chunks_sent = 0
+        self._chunks_failed = 0
+        self._chunk_retries = 0
+        self._chunks_rejected = 0
+        self._rate_limited = 0
+        self._delivered = 0
+        self._failed = 0
+        self._charts_uploaded = 0
+        self._charts_referenced = 0
+        self._charts_inline = 0
+        self._rate_limit_wait = 0.0
+
+    async def upload_chart(self, chart_ref: str, chart: bytes, client: Any) -> Optional[str]:
+        """Upload the chart image once and return its reference, or None to send it inline"""
+        chart_id = self._uploaded.get(chart_ref)
+        if chart_id:
+            self._uploaded.move_to_end(chart_ref)
+            return chart_id
+        if not self._upload_supported:
+            return None
+
+        try:
+            response = await client.post(
+                settings.TELEGRAM_CHART_UPLOAD_PATH,
+                files={"chart": ("chart.png", chart, "image/png")},
+                idempotent=True
+            )
+            if response.status_code in (404, 405):
+                logger.info("Telegram service does not support chart uploads. Sending charts inline.")
+                self._upload_supported = False
+                return None
+            response.raise_for_status()
+            chart_id = response.json().get("chart_id")
+        except Exception as e:
+            logger.warning(f"Chart upload failed, sending it inline: {str(e)}")
+            return None
+
+        # The same chart is shared by signals within a candle, upload it only once
+        if chart_id:
+            self._charts_uploaded += 1
+            self._uploaded[chart_ref] = chart_id
+            while len(self._uploaded) > settings.CHART_CACHE_MAX_ENTRIES:
+                self._uploaded.popitem(last=False)
+        return chart_id
+
+    async def _send_chunk(self, payload: Dict[str, Any], chat_ids: List[str], client: Any) -> Tuple[str, float, float]:
+        """Send one chunk under the rate limit; returns its outcome, latency and the seconds to wait before a retry"""
+        with tracer.span('telegram.rate_limit', chats=len(chat_ids)):
+            self._rate_limit_wait += await self.bucket.acquire(len(chat_ids))
+        start = time.perf_counter()
+        outcome, retry_after = FAILED, 0.0
+        try:
+            response = await client.post(
+                "/send-signal",
+                json={"signal_data": {**payload, "chat_ids": chat_ids}, "chat_ids": chat_ids}
+            )
+            if response.status_code < 400:
+                outcome = DELIVERED
+            elif response.status_code == 429:
+                outcome, retry_after = RETRY, rate_limit_delay(response)
+                self._rate_limited += 1
+                logger.warning(f"Telegram chunk of {len(chat_ids)} chats was rate limited, retry after {retry_after}s")
+            elif response.status_code >= 500:
+                outcome = RETRY
+                logger.warning(f"Telegram chunk of {len(chat_ids)} chats failed with {response.status_code}")
+            else:
+                self._chunks_rejected += 1
+                logger.error(f"Telegram rejected a chunk of {len(chat_ids)} chats with {response.status_code}: {response.text}")
+        except UNSENT_ERRORS as e:
+            outcome = RETRY
+            logger.warning(f"Telegram chunk of {len(chat_ids)} chats was not sent: {str(e)}")
+        except Exception as e:
+            # Telegram may already have delivered it, resending could duplicate the messages
+            logger.warning(f"Telegram chunk of {len(chat_ids)} chats failed and is not retried: {type(e).__name__} {str(e)}")
+        latency = time.perf_counter() - start
+        self._chunk_latency.observe(latency)
+        return outcome, latency, retry_after
+
+    async def deliver(self, signal_data: Dict[str, Any], chat_ids: List[str], client: Any) -> Dict[str, Any]:
+        """Deliver a signal to all chat ids and return a delivery report"""
+        # The full subscriber list must not ride along with every chunk; each chunk sets its own
+        payload = {key: value for key, value in signal_data.items() if key not in ("chart_ref", "chat_ids")}
+        chart_ref = signal_data.get("chart_ref")
+        chart_bytes = blob_store.get(chart_ref) if chart_ref else None
+        chart = "none"
+        if chart_bytes:
+            chart_id = await self.upload_chart(chart_ref, chart_bytes, client)
+            if chart_id:
+                payload["chart_id"] = chart_id
+                chart = "reference"
+                self._charts_referenced += 1
+            else:
+                # Encoded once here rather than carried as base64 through the pipeline
+                payload["chart_data"] = base64.b64encode(chart_bytes).decode('utf-8')
+                chart = "inline"
+                self._charts_inline += 1
+
+        pending = [chat_ids[i:i + self.chunk_size] for i in range(0, len(chat_ids), self.chunk_size)]
+        chunk_count = len(pending)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        latencies: List[float] = []
+
+        async def send(chunk: List[str]) -> Tuple[str, float, float]:
+            async with semaphore:
+                return await self._send_chunk(payload, chunk, client)
+
+        failed_chunks: List[List[str]] = []
+        retry_after = 0.0
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._chunk_retries += len(pending)
+                await asyncio.sleep(max(backoff_delay(attempt - 1), retry_after))
+            results = await asyncio.gather(*(send(chunk) for chunk in pending))
+            latencies.extend(latency for _, latency, _ in results)
+            self._chunks_sent += len(pending)
+            self._chunks_failed += sum(1 for outcome, _, _ in results if outcome != DELIVERED)
+            failed_chunks.extend(chunk for chunk, (outcome, _, _) in zip(pending, results) if outcome == FAILED)
+            retry_after = max((delay for outcome, _, delay in results if outcome == RETRY), default=0.0)
+            pending = [chunk for chunk, (outcome, _, _) in zip(pending, results) if outcome == RETRY]
+            if not pending:
+                break
+
+        # Chunks still failing after the last attempt and those that could not be retried
+        pending.extend(failed_chunks)
+        failed = sum(len(chunk) for chunk in pending)
+        self._delivered += len(chat_ids) - failed
+        self._failed += failed
+        return {
+            "chats": len(chat_ids),
+            "delivered": len(chat_ids) - failed,
+            "failed": failed,
+            "chunks": chunk_count,
+            "failed_chunks": len(pending),
+            "chunk_latencies_ms": [round(latency * 1000, 1) for latency in latencies],
+            "chart": chart
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get delivery counters (chunk latency is the telegram/chunk histogram)"""
+        return {
+            'chunks_sent': self._chunks_sent,
+            'chunks_failed': self._chunks_failed,
+            'chunk_retries': self._chunk_retries,
+            'chunks_rejected': self._chunks_rejected,
+            'chunks_rate_limited': self._rate_limited,
+            'messages_delivered': self._delivered,
+            'messages_failed': self._failed,
+            'charts_uploaded': self._charts_uploaded,
+            'charts_referenced': self._charts_referenced,
+            'charts_inline': self._charts_inline,
+            'rate_limit_wait_seconds': round(self._rate_limit_wait, 3)
+        }
+
+# Create singleton instance
+telegram_delivery = TelegramDelivery()
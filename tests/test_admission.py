@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, PriorityLimiter, PRIORITY_NEWS, PRIORITY_SIGNAL
+
+async def hold(limiter: PriorityLimiter, release: asyncio.Event) -> None:
+    async with limiter.slot(PRIORITY_SIGNAL, None):
+        await release.wait()
+
+async def settle() -> None:
+    """Let queued tasks run up to their next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_waiters_served_by_priority_then_arrival():
+    limiter = PriorityLimiter('test', limit=1, max_queue=10)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(limiter, release))
+    await settle()
+
+    order = []
+
+    async def wait(label: str, priority: int) -> None:
+        async with limiter.slot(priority, None):
+            order.append(label)
+
+    waiters = [
+        asyncio.ensure_future(wait('news-1', PRIORITY_NEWS)),
+        asyncio.ensure_future(wait('signal-1', PRIORITY_SIGNAL)),
+        asyncio.ensure_future(wait('news-2', PRIORITY_NEWS)),
+        asyncio.ensure_future(wait('signal-2', PRIORITY_SIGNAL))
+    ]
+    await settle()
+    assert limiter.get_stats()['waiting'] == 4
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+    assert order == ['signal-1', 'signal-2', 'news-1', 'news-2']
+    assert limiter.active == 0
+
+@pytest.mark.asyncio
+async def test_bounded_wait_times_out_with_503():
+    limiter = PriorityLimiter('test', limit=1, max_queue=10)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(limiter, release))
+    await settle()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await limiter.acquire(PRIORITY_NEWS, 0.05)
+    assert excinfo.value.reason == 'timeout'
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.retry_after >= 1
+    assert limiter.get_stats()['waiting'] == 0
+
+    release.set()
+    await holder
+    assert limiter.active == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_displaces_lower_priority_waiter():
+    limiter = PriorityLimiter('test', limit=1, max_queue=1)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(limiter, release))
+    await settle()
+
+    news = asyncio.ensure_future(limiter.acquire(PRIORITY_NEWS, 10))
+    await settle()
+    signal = asyncio.ensure_future(limiter.acquire(PRIORITY_SIGNAL, 10))
+    await settle()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await news
+    assert excinfo.value.reason == 'displaced'
+    assert excinfo.value.status_code == 429
+
+    # Same priority as the remaining waiter: nothing to displace
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await limiter.acquire(PRIORITY_SIGNAL, 10)
+    assert excinfo.value.reason == 'queue_full'
+
+    release.set()
+    await holder
+    await signal
+    limiter.release()
+    assert limiter.active == 0
+
+@pytest.mark.asyncio
+async def test_unbounded_waiters_do_not_fill_the_queue():
+    limiter = PriorityLimiter('test', limit=1, max_queue=1)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(limiter, release))
+    await settle()
+
+    background = [asyncio.ensure_future(limiter.acquire(PRIORITY_SIGNAL, None)) for _ in range(3)]
+    bounded = asyncio.ensure_future(limiter.acquire(PRIORITY_NEWS, 10))
+    await settle()
+    assert not bounded.done()
+
+    release.set()
+    await holder
+    for task in background + [bounded]:
+        await task
+        limiter.release()
+    assert limiter.active == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = PriorityLimiter('test', limit=1, max_queue=10)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(limiter, release))
+    await settle()
+
+    waiter = asyncio.ensure_future(limiter.acquire(PRIORITY_SIGNAL, None))
+    await settle()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.get_stats()['waiting'] == 0
+
+    release.set()
+    await holder
+    assert limiter.active == 0
+
+@pytest.mark.asyncio
+async def test_news_slots_time_out_but_signal_slots_wait():
+    control = AdmissionController(max_concurrency=10, max_queue=10, queue_timeout=0.05, class_limits={'browser': 1})
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(control.classes['browser'], release))
+    await settle()
+
+    async def use_browser(priority: int) -> str:
+        async with control.admit(priority):
+            async with control.slot('browser'):
+                return 'done'
+
+    with pytest.raises(AdmissionRejected):
+        await use_browser(PRIORITY_NEWS)
+
+    signal = asyncio.ensure_future(use_browser(PRIORITY_SIGNAL))
+    await asyncio.sleep(0.1)
+    assert not signal.done()
+    release.set()
+    await holder
+    assert await signal == 'done'
+
+@pytest.mark.asyncio
+async def test_shared_work_runs_at_priority_of_joining_signal():
+    control = AdmissionController(max_concurrency=10, max_queue=10, queue_timeout=0.05, class_limits={'browser': 1})
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(control.classes['browser'], release))
+    await settle()
+
+    async def scrape() -> str:
+        async with control.slot('browser'):
+            return 'articles'
+
+    async with control.admit(PRIORITY_NEWS):
+        task = control.start_shared(scrape())
+
+    async def join() -> str:
+        async with control.admit(PRIORITY_SIGNAL):
+            control.join_shared(task)
+            return await asyncio.shield(task)
+
+    signal = asyncio.ensure_future(join())
+    # Outlast the news queue timeout before the slot frees up
+    await asyncio.sleep(0.15)
+    release.set()
+    await holder
+    assert await signal == 'articles'
+    assert await task == 'articles'
+
+@pytest.mark.asyncio
+async def test_joined_shared_work_moves_ahead_of_queued_waiters():
+    control = AdmissionController(max_concurrency=10, max_queue=10, queue_timeout=10, class_limits={'browser': 1})
+    browser = control.classes['browser']
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(browser, release))
+    await settle()
+    order = []
+
+    async def use_browser(label: str) -> None:
+        async with control.slot('browser'):
+            order.append(label)
+
+    async def low_priority_scrape() -> None:
+        async with control.admit(2):
+            task = control.start_shared(use_browser('shared'))
+        await task
+
+    async def mid_priority_request() -> None:
+        async with control.admit(1):
+            await use_browser('mid')
+
+    scrape = asyncio.ensure_future(low_priority_scrape())
+    await settle()
+    mid = asyncio.ensure_future(mid_priority_request())
+    await settle()
+    assert browser.get_stats()['waiting'] == 2
+
+    # A signal joins the queued low-priority scrape
+    async with control.admit(PRIORITY_SIGNAL):
+        control.join_shared(next(iter(control._shared.keys())))
+
+    release.set()
+    await asyncio.gather(holder, scrape, mid)
+    assert order == ['shared', 'mid']
+    assert browser.get_stats()['rejected'] == {}
@@ -0,0 +1,146 @@
+from typing import Optional
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return clock
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        max_timeout=30.0,
+        window_size=10,
+        min_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_seconds=5.0,
+        slow_call_rate_threshold=0.8,
+        open_seconds=10.0,
+        half_open_calls=1
+    )
+    options.update(overrides)
+    return CircuitBreaker('test', **options)
+
+def call(breaker: CircuitBreaker, latency: Optional[float] = None) -> float:
+    """Run one call through the breaker; a latency records a success, None a failure"""
+    timeout = breaker.before_call()
+    if latency is None:
+        breaker.record_failure()
+    else:
+        breaker.record_success(latency)
+    return timeout
+
+def trip(breaker: CircuitBreaker) -> None:
+    while breaker.state == CLOSED:
+        call(breaker)
+    assert breaker.state == OPEN
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        call(breaker)
+    assert breaker.state == CLOSED
+
+def test_opens_on_failure_rate(clock):
+    breaker = make_breaker()
+    call(breaker, 0.1)
+    call(breaker, 0.1)
+    call(breaker)
+    assert breaker.state == CLOSED
+    call(breaker)
+    assert breaker.state == OPEN
+
+def test_opens_on_slow_call_rate(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        call(breaker, 6.0)
+    assert breaker.state == OPEN
+
+def test_rejects_while_open(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 4
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == pytest.approx(6.0)
+    assert breaker.get_state()['rejected'] == 1
+
+def test_half_open_probe_success_closes(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    call(breaker, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.get_state()['calls_in_window'] == 0
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    call(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_half_open_slow_probe_reopens(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    call(breaker, 6.0)
+    assert breaker.state == OPEN
+
+def test_half_open_limits_concurrent_probes(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_cancelled()
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+def test_adaptive_timeout_follows_p99(clock):
+    breaker = make_breaker()
+    for _ in range(50):
+        call(breaker, 1.0)
+    assert breaker.timeout == pytest.approx(3.0)
+    assert call(breaker, 1.0) == pytest.approx(3.0)
+
+def test_timeout_doubles_up_to_max(clock):
+    breaker = make_breaker(min_calls=100)
+    for _ in range(50):
+        call(breaker, 0.1)
+    assert breaker.timeout == 2.0
+
+    for expected in (4.0, 8.0, 16.0, 30.0, 30.0):
+        breaker.before_call()
+        breaker.record_failure(timed_out=True)
+        assert breaker.timeout == expected
+
+def test_half_open_probe_gets_max_timeout(clock):
+    breaker = make_breaker()
+    for _ in range(50):
+        call(breaker, 0.1)
+    assert breaker.timeout == 2.0
+    trip(breaker)
+    clock.now += 10
+    assert breaker.before_call() == 30.0
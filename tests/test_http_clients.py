@@ -0,0 +1,123 @@
+import asyncio
+from typing import Callable, List
+
+import httpx
+import pytest
+
+import http_clients
+import main
+from http_clients import ServiceClient
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_clients, 'backoff_delay', lambda attempt: 0)
+
+async def make_client(handler: Callable[[httpx.Request], httpx.Response], name: str = 'test') -> ServiceClient:
+    client = ServiceClient(name, 'http://service', timeout=5.0)
+    await client.start(httpx.MockTransport(handler))
+    return client
+
+def responses(*statuses: int) -> Callable[[httpx.Request], httpx.Response]:
+    """Handler answering with the given statuses in turn, then 200"""
+    remaining: List[int] = list(statuses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = remaining.pop(0) if remaining else 200
+        return httpx.Response(status, json={'sentiment': 'bullish'} if status == 200 else {})
+    return handler
+
+@pytest.mark.asyncio
+async def test_news_analysis_survives_a_gateway_503(monkeypatch):
+    async def cached_news(instrument: str, max_articles: int) -> list:
+        return [{'title': 'EURUSD rallies', 'content': '...'}]
+
+    monkeypatch.setattr(main.news_cache, 'get', cached_news)
+    client = await make_client(responses(503), 'news_ai')
+    try:
+        assert await main.process_news('EURUSD', client) == {'sentiment': 'bullish'}
+    finally:
+        await client.close()
+
+def counting(handler: Callable[[httpx.Request], httpx.Response], calls: List[str]) -> Callable[[httpx.Request], httpx.Response]:
+    def wrapped(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        return handler(request)
+    return wrapped
+
+@pytest.mark.asyncio
+async def test_get_is_retried_on_a_503():
+    calls: List[str] = []
+    client = await make_client(counting(responses(503, 503), calls))
+    try:
+        response = await client.get('/news')
+    finally:
+        await client.close()
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_on_a_503_by_default():
+    calls: List[str] = []
+    client = await make_client(counting(responses(503), calls))
+    try:
+        response = await client.post('/send-signal', json={})
+    finally:
+        await client.close()
+    assert response.status_code == 503
+    assert calls == ['POST']
+
+@pytest.mark.asyncio
+async def test_post_is_retried_when_the_connection_failed():
+    calls: List[str] = []
+    ok = responses()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if len(calls) == 1:
+            raise httpx.ConnectError('connection refused', request=request)
+        return ok(request)
+
+    client = await make_client(counting(handler, calls))
+    try:
+        response = await client.post('/send-signal', json={})
+    finally:
+        await client.close()
+    assert response.status_code == 200
+    assert calls == ['POST', 'POST']
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_after_a_read_timeout():
+    calls: List[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout('no response', request=request)
+
+    client = await make_client(counting(handler, calls))
+    try:
+        with pytest.raises(httpx.ReadTimeout):
+            await client.post('/send-signal', json={})
+    finally:
+        await client.close()
+    # The service may have processed the request already
+    assert calls == ['POST']
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins_over_a_slow_primary():
+    calls: List[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={'attempt': 'primary'})
+        return httpx.Response(200, json={'attempt': 'hedge'})
+
+    client = await make_client(handler)
+    # Pretend the service's p95 latency is 10ms
+    client.breaker.latency_percentile = lambda percentile, min_samples: 0.01
+    try:
+        response = await client.get('/news', hedge=True)
+    finally:
+        await client.close()
+    assert response.json() == {'attempt': 'hedge'}
+    assert calls == ['GET', 'GET']
+    assert client.retry_budget.hedge_wins == 1
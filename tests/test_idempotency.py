@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from idempotency import IdempotencyStore, signal_key
+from shared_state import SharedState
+
+def make_signal(**overrides) -> SimpleNamespace:
+    fields = dict(
+        instrument='EURUSD', action='BUY', price=1.1, stoploss=1.09,
+        takeprofit=1.12, timeframe='1h', timestamp='2024-01-01T00:00:00'
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+def test_signal_key_covers_identifying_fields():
+    assert signal_key(make_signal()) == signal_key(make_signal())
+    assert signal_key(make_signal()) != signal_key(make_signal(price=1.2))
+    assert signal_key(make_signal()) != signal_key(make_signal(timestamp='2024-01-01T01:00:00'))
+
+@pytest.mark.asyncio
+async def test_completed_request_is_replayed():
+    store = IdempotencyStore(ttl=60, max_keys=10, shared=SharedState(':memory:'))
+    calls = []
+
+    async def process() -> dict:
+        calls.append(1)
+        return {'status': 'success'}
+
+    assert await store.run('key', process) == ({'status': 'success'}, False)
+    assert await store.run('key', process) == ({'status': 'success'}, True)
+    assert len(calls) == 1
+    assert store.get_stats()['duplicates'] == 1
+
+@pytest.mark.asyncio
+async def test_duplicate_joins_in_flight_request():
+    store = IdempotencyStore(ttl=60, max_keys=10, shared=SharedState(':memory:'))
+    release = asyncio.Event()
+    calls = []
+
+    async def process() -> str:
+        calls.append(1)
+        await release.wait()
+        return 'done'
+
+    original = asyncio.ensure_future(store.run('key', process))
+    await asyncio.sleep(0)
+    duplicate = asyncio.ensure_future(store.run('key', process))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await original == ('done', False)
+    assert await duplicate == ('done', True)
+    assert len(calls) == 1
+    assert store.get_stats()['inflight_joins'] == 1
+
+@pytest.mark.asyncio
+async def test_failed_request_can_be_retried():
+    store = IdempotencyStore(ttl=60, max_keys=10, shared=SharedState(':memory:'))
+
+    async def fail() -> None:
+        raise RuntimeError('downstream failed')
+
+    async def succeed() -> str:
+        return 'done'
+
+    with pytest.raises(RuntimeError):
+        await store.run('key', fail)
+    assert await store.run('key', succeed) == ('done', False)
+
+@pytest.mark.asyncio
+async def test_keys_expire_after_ttl():
+    store = IdempotencyStore(ttl=0.05, max_keys=10, shared=SharedState(':memory:'))
+
+    async def process() -> str:
+        return 'done'
+
+    await store.run('key', process)
+    await asyncio.sleep(0.1)
+    assert await store.run('key', process) == ('done', False)
+
+@pytest.mark.asyncio
+async def test_duplicate_in_another_worker_gets_the_original_result(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    first, second = SharedState(path, publish_interval=60), SharedState(path, publish_interval=60)
+    await first.open()
+    await second.open()
+    second.worker = 'other-worker'
+    try:
+        original = IdempotencyStore(ttl=60, max_keys=10, shared=first)
+        replica = IdempotencyStore(ttl=60, max_keys=10, shared=second)
+        calls = []
+
+        async def process() -> dict:
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {'status': 'success'}
+
+        # Either worker may win the claim; the other waits for its result
+        results = await asyncio.gather(original.run('key', process), replica.run('key', process))
+        assert sorted(results, key=lambda result: result[1]) == [({'status': 'success'}, False), ({'status': 'success'}, True)]
+        assert len(calls) == 1
+        assert original.get_stats()['remote_duplicates'] + replica.get_stats()['remote_duplicates'] == 1
+    finally:
+        await first.close()
+        await second.close()
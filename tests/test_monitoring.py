@@ -0,0 +1,24 @@
+from monitoring import ServiceMonitor
+
+def test_prometheus_exports_every_nested_collector_value():
+    monitor = ServiceMonitor()
+    monitor.register_collector('proxies', lambda: {
+        'enabled': True,
+        'last_refresh': '2024-01-01T00:00:00',
+        'proxies': {
+            'http://proxy-1:8080': {'available': True, 'success_rate': 0.75, 'latency_ms': 120.5}
+        }
+    })
+    monitor.register_collector('admission', lambda: {
+        'ai': {'active': 2, 'rejected': {'signal': 3, 'news': 1}}
+    })
+
+    lines = monitor.get_prometheus_metrics().splitlines()
+    assert 'signal_processor_proxies_enabled 1.0' in lines
+    assert 'signal_processor_proxies_success_rate{key="proxies",key2="http://proxy-1:8080"} 0.75' in lines
+    assert 'signal_processor_proxies_latency_ms{key="proxies",key2="http://proxy-1:8080"} 120.5' in lines
+    assert 'signal_processor_admission_active{key="ai"} 2.0' in lines
+    assert 'signal_processor_admission_signal{key="ai",key2="rejected"} 3.0' in lines
+    assert 'signal_processor_admission_news{key="ai",key2="rejected"} 1.0' in lines
+    assert not any('last_refresh' in line for line in lines)
+    assert sum(1 for line in lines if line == '# TYPE signal_processor_admission_signal gauge') == 1
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import pytest
+
+from news_cache import NewsCache
+from shared_state import SharedState
+
+class FakeScraper:
+    """News fetcher counting its calls, answering after a delay"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.articles: List[Dict[str, str]] = [{'title': 'EURUSD rallies'}]
+
+    async def __call__(self, instrument: str, max_articles: int) -> List[Dict[str, str]]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return list(self.articles)
+
+def make_cache(scraper: FakeScraper, ttl: float = 60, shared: Optional[SharedState] = None) -> NewsCache:
+    return NewsCache(scraper, ttl=ttl, max_entries=10, shared=shared or SharedState(':memory:'))
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_scrape():
+    scraper = FakeScraper()
+    cache = make_cache(scraper)
+
+    results = await asyncio.gather(*(cache.get('eurusd', 3) for _ in range(10)))
+    assert scraper.calls == 1
+    assert all(result == [{'title': 'EURUSD rallies'}] for result in results)
+    # Served from the cache afterwards
+    assert await cache.get('EURUSD', 3) == [{'title': 'EURUSD rallies'}]
+    assert scraper.calls == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_abort_the_shared_scrape():
+    scraper = FakeScraper()
+    cache = make_cache(scraper)
+
+    first = asyncio.ensure_future(cache.get('EURUSD', 3))
+    second = asyncio.ensure_future(cache.get('EURUSD', 3))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == [{'title': 'EURUSD rallies'}]
+    assert scraper.calls == 1
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_scraped_again():
+    scraper = FakeScraper(delay=0)
+    cache = make_cache(scraper, ttl=0.05)
+
+    await cache.get('EURUSD', 3)
+    await asyncio.sleep(0.1)
+    await cache.get('EURUSD', 3)
+    assert scraper.calls == 2
+
+@pytest.mark.asyncio
+async def test_stale_articles_are_served_when_a_scrape_comes_back_empty():
+    scraper = FakeScraper(delay=0)
+    cache = make_cache(scraper, ttl=0.05)
+
+    await cache.get('EURUSD', 3)
+    await asyncio.sleep(0.1)
+    scraper.articles = []
+    assert await cache.get('EURUSD', 3) == [{'title': 'EURUSD rallies'}]
+    assert scraper.calls == 2
+
+@pytest.mark.asyncio
+async def test_news_scraped_by_another_worker_is_reused(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    first, second = SharedState(path, publish_interval=60), SharedState(path, publish_interval=60)
+    await first.open()
+    await second.open()
+    try:
+        scraper = FakeScraper(delay=0)
+        await make_cache(scraper, shared=first).get('EURUSD', 3)
+        assert await make_cache(scraper, shared=second).get('EURUSD', 3) == [{'title': 'EURUSD rallies'}]
+        assert scraper.calls == 1
+    finally:
+        await first.close()
+        await second.close()
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from pipeline import Stage, StageGraph, StageResults
+
+def recorder(name: str, order: List[str], value: Any = None, delay: float = 0.0):
+    """Stage function appending its name to order when it runs"""
+    async def run(results: StageResults) -> Any:
+        await asyncio.sleep(delay)
+        order.append(name)
+        return value if value is not None else name
+    return run
+
+@pytest.mark.asyncio
+async def test_stages_run_after_their_dependencies():
+    order: List[str] = []
+    graph = StageGraph([
+        Stage('deliver', recorder('deliver', order), deps=('format', 'chart')),
+        Stage('format', recorder('format', order), deps=('analyze',)),
+        Stage('analyze', recorder('analyze', order, delay=0.02), deps=('news',)),
+        Stage('news', recorder('news', order)),
+        Stage('chart', recorder('chart', order))
+    ])
+    results, timings = await graph.run()
+
+    assert order.index('news') < order.index('analyze') < order.index('format') < order.index('deliver')
+    assert order.index('chart') < order.index('deliver')
+    # Independent stages do not wait for each other
+    assert order.index('chart') < order.index('analyze')
+    assert set(results) == set(timings) == {'deliver', 'format', 'analyze', 'news', 'chart'}
+
+def test_graph_rejects_unknown_dependencies_and_cycles():
+    async def noop(results: StageResults) -> None:
+        return None
+
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', noop, deps=('missing',))])
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', noop, deps=('b',)), Stage('b', noop, deps=('a',))])
+
+@pytest.mark.asyncio
+async def test_failed_stage_falls_back_and_its_dependents_still_run():
+    async def fail(results: StageResults) -> Any:
+        raise RuntimeError('news service down')
+
+    async def analyze(results: StageResults) -> Dict[str, Any]:
+        return {'articles': len(results['news'])}
+
+    statuses: List[Tuple[str, str]] = []
+    recorded: Dict[str, Any] = {}
+
+    async def on_result(stage: str, result: Any) -> None:
+        recorded[stage] = result
+
+    graph = StageGraph([
+        Stage('news', fail, fallback=[]),
+        Stage('analyze', analyze, deps=('news',))
+    ])
+    results, _ = await graph.run(lambda stage, status: statuses.append((stage, status)), on_result)
+
+    assert results == {'news': [], 'analyze': {'articles': 0}}
+    assert ('news', 'failed') in statuses
+    assert ('analyze', 'done') in statuses
+    # A fallback is not a result worth resuming from
+    assert recorded == {'analyze': {'articles': 0}}
+
+@pytest.mark.asyncio
+async def test_timed_out_stage_uses_a_fallback_built_from_earlier_results():
+    async def slow(results: StageResults) -> str:
+        await asyncio.sleep(1)
+        return 'late'
+
+    graph = StageGraph([
+        Stage('news', recorder('news', [], value=['article'])),
+        Stage('analyze', slow, deps=('news',), timeout=0.01, fallback=lambda results: f"{len(results['news'])} articles")
+    ])
+    results, _ = await graph.run()
+    assert results['analyze'] == '1 articles'
+
+@pytest.mark.asyncio
+async def test_only_persistent_stage_results_are_recorded():
+    recorded: Dict[str, Any] = {}
+
+    async def on_result(stage: str, result: Any) -> None:
+        recorded[stage] = result
+
+    graph = StageGraph([
+        Stage('chart', recorder('chart', [], value='blob-ref'), persist=False),
+        Stage('format', recorder('format', [], value='message'), deps=('chart',))
+    ])
+    results, _ = await graph.run(on_result=on_result)
+
+    assert results == {'chart': 'blob-ref', 'format': 'message'}
+    assert recorded == {'format': 'message'}
+
+@pytest.mark.asyncio
+async def test_restored_stages_are_not_run_again():
+    order: List[str] = []
+    statuses: List[Tuple[str, str]] = []
+    graph = StageGraph([
+        Stage('news', recorder('news', order)),
+        Stage('analyze', recorder('analyze', order), deps=('news',))
+    ])
+    results, timings = await graph.run(
+        lambda stage, status: statuses.append((stage, status)),
+        restored={'news': ['saved article'], 'unknown': 'ignored'}
+    )
+
+    assert order == ['analyze']
+    assert results == {'news': ['saved article'], 'analyze': 'analyze'}
+    assert ('news', 'restored') in statuses
+    assert 'news' not in timings
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from monitoring import monitor
+from shared_state import SharedState
+
+async def open_worker(path: str, worker: str, worker_ttl: float = 60.0) -> SharedState:
+    state = SharedState(path, publish_interval=60, worker_ttl=worker_ttl)
+    await state.open()
+    # Both workers run in this process, give the second its own identity and rows
+    await state._run(state._transaction, [
+        (f"DELETE FROM {table} WHERE worker = ?", (state.worker,)) for table in ('counters', 'histograms', 'workers')
+    ])
+    state.worker = worker
+    await state.publish()
+    return state
+
+@pytest.mark.asyncio
+async def test_cluster_counters_keep_the_totals_of_expired_workers(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    reader = await open_worker(path, 'reader', worker_ttl=0.2)
+    gone = await open_worker(path, 'gone', worker_ttl=0.2)
+    try:
+        local = monitor.get_counters()['signals_processed']
+        # The other worker processed 5 signals, then died without closing
+        await gone._run(gone._publish, {'signals_processed': 5}, {('stage', 'news'): ([1.0], [2, 0], 0.5, 2)})
+        gone._publisher.cancel()
+
+        snapshot = await reader.get_cluster_snapshot()
+        assert snapshot['counters']['signals_processed'] == local + 5
+        assert len(snapshot['workers']) == 2
+
+        await asyncio.sleep(0.3)
+        snapshot = await reader.get_cluster_snapshot()
+        assert snapshot['counters']['signals_processed'] == local + 5
+        assert [worker['worker'] for worker in snapshot['workers']] == []
+
+        # Publishing retires the expired worker without changing the totals
+        await reader.publish()
+        snapshot = await reader.get_cluster_snapshot()
+        assert snapshot['counters']['signals_processed'] == local + 5
+        assert [worker['worker'] for worker in snapshot['workers']] == ['reader']
+        rows = await reader._run(lambda: reader._connection.execute("SELECT DISTINCT worker FROM counters").fetchall())
+        assert sorted(row[0] for row in rows) == ['reader', 'retired']
+        assert snapshot['histograms']['stage']['news'].count >= 2
+    finally:
+        await gone._run(gone._connection.close)
+        gone._connection = None
+        await gone.close()
+        await reader.close()
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+import sqlite3
+from typing import List
+
+import pytest
+
+from pipeline import Stage, StageGraph, StageResults
+from signal_store import SignalStore
+
+async def open_store(path: str, claim_ttl: float = 60.0) -> SignalStore:
+    store = SignalStore(path, fsync=False, commit_interval_ms=0, claim_ttl=claim_ttl)
+    await store.open()
+    return store
+
+@pytest.mark.asyncio
+async def test_unfinished_signal_resumes_with_completed_stages(tmp_path):
+    path = str(tmp_path / 'signals.db')
+    store = await open_store(path, claim_ttl=0.05)
+    await store.record_signal('s1', {'instrument': 'EURUSD'})
+    await store.record_stage('s1', 'subscribers', ['chat-1'])
+    await store.record_signal('s2', {'instrument': 'GBPUSD'})
+    await store.mark_status('s2', 'completed')
+    await store.close()
+
+    # The previous process is gone and its claim has lapsed
+    await asyncio.sleep(0.1)
+    restarted = await open_store(path, claim_ttl=0.05)
+    try:
+        assert await restarted.claim_unfinished() == [('s1', {'instrument': 'EURUSD'}, {'subscribers': ['chat-1']})]
+        # Claimed once: the next sweep does not resume it again
+        assert await restarted.claim_unfinished() == []
+    finally:
+        await restarted.close()
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_database_do_not_resume_each_others_signals(tmp_path):
+    path = str(tmp_path / 'signals.db')
+    first = await open_store(path, claim_ttl=0.3)
+    second = await open_store(path, claim_ttl=0.3)
+    try:
+        await first.record_signal('s1', {'instrument': 'EURUSD'})
+        assert await second.claim_unfinished() == []
+
+        # The heartbeat keeps the running signal owned by the first worker past the claim TTL
+        await asyncio.sleep(0.5)
+        assert await second.claim_unfinished() == []
+        assert await first.claim_unfinished() == []
+    finally:
+        await second.close()
+
+    # Once the first worker stops refreshing its claims another worker takes over
+    await first.close()
+    third = await open_store(path, claim_ttl=0.3)
+    try:
+        await asyncio.sleep(0.35)
+        assert [signal_id for signal_id, _, _ in await third.claim_unfinished()] == ['s1']
+    finally:
+        await third.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_resume_each_signal_once(tmp_path):
+    path = str(tmp_path / 'signals.db')
+    # Rows written before signals had owners can be claimed at once
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE signals (id TEXT PRIMARY KEY, received_at REAL NOT NULL, payload TEXT NOT NULL, "
+        "status TEXT NOT NULL, error TEXT, updated_at REAL NOT NULL)"
+    )
+    connection.executemany(
+        "INSERT INTO signals VALUES (?, ?, '{}', 'accepted', NULL, ?)",
+        [(f"s{index}", index, index) for index in range(20)]
+    )
+    connection.commit()
+    connection.close()
+
+    stores = [await open_store(path) for _ in range(3)]
+    try:
+        claims = await asyncio.gather(*(store.claim_unfinished() for store in stores))
+        claimed = [signal_id for claim in claims for signal_id, _, _ in claim]
+        assert sorted(claimed) == sorted(f"s{index}" for index in range(20))
+    finally:
+        for store in stores:
+            await store.close()
+
+@pytest.mark.asyncio
+async def test_interrupted_pipeline_resumes_after_its_last_completed_stage(tmp_path):
+    path = str(tmp_path / 'signals.db')
+    runs: List[str] = []
+    news_started = asyncio.Event()
+
+    async def subscribers(results: StageResults) -> List[str]:
+        runs.append('subscribers')
+        return ['chat-1']
+
+    async def news(results: StageResults) -> List[str]:
+        runs.append('news')
+        news_started.set()
+        await asyncio.sleep(10)
+        return ['article']
+
+    graph = StageGraph([Stage('subscribers', subscribers), Stage('news', news, deps=('subscribers',))])
+    store = await open_store(path, claim_ttl=0.05)
+    await store.record_signal('s1', {'instrument': 'EURUSD'})
+    on_result = functools.partial(store.record_stage, 's1')
+
+    # The worker dies while the news stage is running
+    run = asyncio.ensure_future(graph.run(on_result=on_result))
+    await news_started.wait()
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+    await store.close()
+
+    await asyncio.sleep(0.1)
+    restarted = await open_store(path, claim_ttl=0.05)
+    try:
+        [(signal_id, payload, restored)] = await restarted.claim_unfinished()
+        assert restored == {'subscribers': ['chat-1']}
+
+        news_started.clear()
+        run = asyncio.ensure_future(graph.run(restored=restored))
+        await news_started.wait()
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        # Only the interrupted stage runs again
+        assert runs == ['subscribers', 'news', 'news']
+    finally:
+        await restarted.close()
+
+@pytest.mark.asyncio
+async def test_resume_dispatches_claimed_signals_with_their_stage_results(tmp_path, monkeypatch):
+    import main
+
+    store = await open_store(str(tmp_path / 'signals.db'))
+    dispatched = []
+    monkeypatch.setattr(main, 'signal_store', store)
+    monkeypatch.setattr(main, 'dispatch_signal', lambda signal, signal_id, restored: dispatched.append(
+        (signal.instrument, signal_id, restored)
+    ))
+    try:
+        payload = {'instrument': 'EURUSD', 'action': 'BUY', 'price': 1.1, 'stoploss': 1.09, 'takeprofit': 1.12}
+        await store.record_signal('s1', payload)
+        await store.record_stage('s1', 'subscribers', ['chat-1'])
+        # Claims taken by a worker that stopped long ago
+        await store._write([("UPDATE signals SET owner = 'gone', claimed_at = 0", ())])
+
+        await main.resume_unfinished_signals()
+        await main.resume_unfinished_signals()
+        assert dispatched == [('EURUSD', 's1', {'subscribers': ['chat-1']})]
+    finally:
+        await store.close()
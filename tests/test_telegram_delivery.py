@@ -0,0 +1,191 @@
+import time
+from typing import Any, Callable, Dict, List, Set
+
+import httpx
+import pytest
+
+import telegram_delivery
+from blob_store import blob_store
+from telegram_delivery import TelegramDelivery, TokenBucket
+
+class FakeTelegramClient:
+    """Records /send-signal calls, failing the first attempt of the chunks starting with a given chat"""
+
+    def __init__(self, fail_once: Set[str] = frozenset(), upload_status: int = 404):
+        self.fail_once = set(fail_once)
+        self.upload_status = upload_status
+        self.sends: List[Dict[str, Any]] = []
+        self.uploads = 0
+
+    async def post(self, path: str, json: Any = None, **kwargs: Any) -> httpx.Response:
+        request = httpx.Request('POST', f"http://telegram{path}")
+        if path != '/send-signal':
+            self.uploads += 1
+            return httpx.Response(self.upload_status, json={'chart_id': 'chart-1'}, request=request)
+
+        self.sends.append(json)
+        first = json['chat_ids'][0]
+        if first in self.fail_once:
+            self.fail_once.discard(first)
+            return httpx.Response(503, request=request)
+        return httpx.Response(200, json={'status': 'sent'}, request=request)
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(telegram_delivery, 'backoff_delay', lambda attempt: 0)
+
+def make_delivery(**overrides) -> TelegramDelivery:
+    options = dict(chunk_size=3, concurrency=2, rate=1000.0, burst=1000.0, retries=2)
+    options.update(overrides)
+    return TelegramDelivery(**options)
+
+def chats(count: int) -> List[str]:
+    return [f"chat-{index}" for index in range(count)]
+
+@pytest.mark.asyncio
+async def test_chat_ids_are_split_into_chunks():
+    client = FakeTelegramClient()
+    report = await make_delivery().deliver({'instrument': 'EURUSD'}, chats(7), client)
+
+    sent = [send['chat_ids'] for send in client.sends]
+    assert sorted(sent) == sorted([chats(7)[0:3], chats(7)[3:6], chats(7)[6:7]])
+    assert report['chunks'] == 3
+    assert report['delivered'] == 7
+    assert report['failed'] == 0
+
+@pytest.mark.asyncio
+async def test_full_chat_list_is_not_resent_with_each_chunk():
+    client = FakeTelegramClient()
+    # The pipeline stores the matched subscribers on the signal data
+    signal_data = {'instrument': 'EURUSD', 'chat_ids': chats(7)}
+    await make_delivery().deliver(signal_data, chats(7), client)
+
+    for send in client.sends:
+        assert send['signal_data']['chat_ids'] == send['chat_ids']
+        assert len(send['chat_ids']) <= 3
+    assert signal_data['chat_ids'] == chats(7)
+
+@pytest.mark.asyncio
+async def test_only_failed_chunks_are_retried():
+    client = FakeTelegramClient(fail_once={'chat-3'})
+    delivery = make_delivery()
+    report = await delivery.deliver({'instrument': 'EURUSD', 'chat_ids': chats(7)}, chats(7), client)
+
+    sent = [send['chat_ids'] for send in client.sends]
+    assert len(sent) == 4
+    assert sent.count(chats(7)[3:6]) == 2
+    # The retried chunk still reaches only its own chats
+    assert all(send['signal_data']['chat_ids'] == send['chat_ids'] for send in client.sends)
+    assert report['delivered'] == 7
+    assert delivery.get_stats()['chunk_retries'] == 1
+
+@pytest.mark.asyncio
+async def test_chunks_failing_every_attempt_are_reported():
+    client = FakeTelegramClient()
+    original_post = client.post
+
+    async def post(path: str, json: Any = None, **kwargs: Any) -> httpx.Response:
+        if path == '/send-signal' and json['chat_ids'][0] == 'chat-0':
+            client.sends.append(json)
+            return httpx.Response(503, request=httpx.Request('POST', 'http://telegram/send-signal'))
+        return await original_post(path, json=json, **kwargs)
+
+    client.post = post
+    report = await make_delivery(retries=1).deliver({'instrument': 'EURUSD'}, chats(5), client)
+    assert report['failed'] == 3
+    assert report['delivered'] == 2
+    assert report['failed_chunks'] == 1
+
+@pytest.mark.asyncio
+async def test_chart_is_uploaded_once_and_referenced():
+    client = FakeTelegramClient(upload_status=200)
+    delivery = make_delivery()
+    chart_ref = blob_store.put(b'png-bytes')
+
+    for _ in range(2):
+        await delivery.deliver({'instrument': 'EURUSD', 'chart_ref': chart_ref}, chats(4), client)
+
+    assert client.uploads == 1
+    for send in client.sends:
+        assert send['signal_data']['chart_id'] == 'chart-1'
+        assert 'chart_ref' not in send['signal_data']
+        assert 'chart_data' not in send['signal_data']
+
+@pytest.mark.asyncio
+async def test_chart_is_sent_inline_without_upload_support():
+    client = FakeTelegramClient(upload_status=404)
+    chart_ref = blob_store.put(b'png-bytes')
+    report = await make_delivery().deliver({'instrument': 'EURUSD', 'chart_ref': chart_ref}, chats(2), client)
+
+    assert report['chart'] == 'inline'
+    assert client.sends[0]['signal_data']['chart_data'] == 'cG5nLWJ5dGVz'
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_tokens():
+    bucket = TokenBucket(rate=100.0, capacity=2.0)
+    assert await bucket.acquire(2) == 0.0
+    waited = await bucket.acquire(1)
+    assert waited == pytest.approx(0.01, abs=0.005)
+
+def failing_first_send(failure: Callable[[httpx.Request], httpx.Response]) -> FakeTelegramClient:
+    """Client whose first /send-signal call ends with the given response or error"""
+    client = FakeTelegramClient()
+    original_post = client.post
+    failures = [failure]
+
+    async def post(path: str, json: Any = None, **kwargs: Any) -> httpx.Response:
+        if path == '/send-signal' and failures:
+            client.sends.append(json)
+            return failures.pop()(httpx.Request('POST', 'http://telegram/send-signal'))
+        return await original_post(path, json=json, **kwargs)
+
+    client.post = post
+    return client
+
+@pytest.mark.asyncio
+async def test_rejected_chunk_is_not_retried():
+    client = failing_first_send(lambda request: httpx.Response(400, json={'detail': 'chat not found'}, request=request))
+    delivery = make_delivery(chunk_size=10)
+    report = await delivery.deliver({'instrument': 'EURUSD'}, chats(2), client)
+
+    assert len(client.sends) == 1
+    assert report['failed'] == 2
+    assert delivery.get_stats()['chunks_rejected'] == 1
+    assert delivery.get_stats()['chunk_retries'] == 0
+
+@pytest.mark.asyncio
+async def test_read_timeout_is_not_retried():
+    def timeout(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout('no response', request=request)
+
+    client = failing_first_send(timeout)
+    report = await make_delivery(chunk_size=10).deliver({'instrument': 'EURUSD'}, chats(2), client)
+
+    # Telegram may have sent the messages before the response was lost
+    assert len(client.sends) == 1
+    assert report['failed_chunks'] == 1
+
+@pytest.mark.asyncio
+async def test_connection_error_is_retried():
+    def refused(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError('connection refused', request=request)
+
+    client = failing_first_send(refused)
+    report = await make_delivery(chunk_size=10).deliver({'instrument': 'EURUSD'}, chats(2), client)
+
+    assert len(client.sends) == 2
+    assert report['delivered'] == 2
+
+@pytest.mark.asyncio
+async def test_rate_limited_chunk_waits_for_retry_after():
+    client = failing_first_send(lambda request: httpx.Response(
+        429, json={'ok': False, 'error_code': 429, 'parameters': {'retry_after': 0.1}}, request=request
+    ))
+    delivery = make_delivery(chunk_size=10)
+    start = time.perf_counter()
+    report = await delivery.deliver({'instrument': 'EURUSD'}, chats(2), client)
+
+    assert time.perf_counter() - start >= 0.1
+    assert len(client.sends) == 2
+    assert report['delivered'] == 2
+    assert delivery.get_stats()['chunks_rate_limited'] == 1
@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import heapq
+import random
+import socket
+import logging
+import asyncio
+import itertools
+from collections import deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, trace: 'Trace', name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute on the span"""
+        self.attributes[key] = value
+
+class _NoopSpan:
+    """Stand-in returned outside of a trace, so untraced code pays almost nothing"""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """The spans recorded for one signal or request, rooted at a single span"""
+
+    def __init__(self, name: str, attributes: Dict[str, Any], max_spans: int):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.wall_start = time.time()
+        self.perf_start = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.finished = False
+        self.root = self.add(name, None, attributes)
+
+    def add(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Optional[Span]:
+        if self.finished or len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return None
+        span = Span(self, name, parent_id, attributes)
+        self.spans.append(span)
+        return span
+
+    @property
+    def duration(self) -> float:
+        return (self.root.end or time.perf_counter()) - self.root.start
+
+    def to_waterfall(self) -> Dict[str, Any]:
+        """Spans ordered by start with offsets from the trace start, in milliseconds"""
+        depths: Dict[Optional[str], int] = {None: -1}
+        spans = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            depth = depths.get(span.parent_id, 0) + 1
+            depths[span.span_id] = depth
+            spans.append({
+                'name': span.name,
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                'depth': depth,
+                'offset_ms': round((span.start - self.perf_start) * 1000, 2),
+                'duration_ms': round(((span.end or span.start) - span.start) * 1000, 2),
+                'unfinished': span.end is None,
+                'attributes': span.attributes,
+                'error': span.error
+            })
+        return {
+            'trace_id': self.trace_id,
+            'name': self.root.name,
+            'started_at': self.wall_start,
+            'duration_ms': round(self.duration * 1000, 2),
+            'attributes': self.root.attributes,
+            'dropped_spans': self.dropped,
+            'spans': spans
+        }
+
+    def to_otlp(self, service_name: str) -> Dict[str, Any]:
+        """Encode as an OTLP/JSON ExportTraceServiceRequest"""
+        def nanos(perf: float) -> str:
+            return str(int((self.wall_start + perf - self.perf_start) * 1e9))
+
+        def attribute(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {'key': key, 'value': {'boolValue': value}}
+            if isinstance(value, int):
+                return {'key': key, 'value': {'intValue': str(value)}}
+            if isinstance(value, float):
+                return {'key': key, 'value': {'doubleValue': value}}
+            return {'key': key, 'value': {'stringValue': str(value)}}
+
+        spans = []
+        for span in self.spans:
+            encoded = {
+                'traceId': self.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,
+                'startTimeUnixNano': nanos(span.start),
+                'endTimeUnixNano': nanos(span.end or span.start),
+                'attributes': [attribute(key, value) for key, value in span.attributes.items()],
+                'status': {'code': STATUS_ERROR, 'message': span.error} if span.error else {'code': STATUS_OK}
+            }
+            if span.parent_id:
+                encoded['parentSpanId'] = span.parent_id
+            spans.append(encoded)
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    attribute('service.name', service_name),
+                    attribute('host.name', socket.gethostname()),
+                    attribute('process.pid', os.getpid())
+                ]},
+                'scopeSpans': [{'scope': {'name': 'signal_processor.tracing'}, 'spans': spans}]
+            }]
+        }
+
+# Span of the code currently running; tasks inherit it when they are created
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+class _SpanScope:
+    """Context manager making a span current for its block and ending it on exit"""
+
+    __slots__ = ('tracer', 'span', 'token')
+
+    def __init__(self, tracer: 'Tracer', span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span = self.span
+        span.end = time.perf_counter()
+        if exc_type is not None:
+            span.error = f"{exc_type.__name__}: {exc}" if exc_type is not asyncio.CancelledError else 'cancelled'
+        _current_span.reset(self.token)
+        if span is span.trace.root:
+            self.tracer._finish(span.trace)
+
+class Tracer:
+    """Lightweight in-process tracer keeping the slowest and most recent traces.
+
+    Spans are created only inside a trace started with ``trace()``; elsewhere
+    ``span()`` returns a shared no-op, so instrumented code paths used outside
+    a signal cost a context variable lookup. Finished traces are optionally
+    appended to a file as OTLP/JSON lines on a background thread.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.TRACING_ENABLED,
+        buffer_size: int = settings.TRACE_BUFFER_SIZE,
+        max_spans: int = settings.TRACE_MAX_SPANS,
+        otlp_file: Optional[str] = settings.TRACE_OTLP_FILE,
+        service_name: str = settings.TRACE_SERVICE_NAME
+    ):
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.max_spans = max_spans
+        self.otlp_file = otlp_file
+        self.service_name = service_name
+
+        self._recent: Deque[Trace] = deque(maxlen=buffer_size)
+        # Min-heap of (duration, sequence, trace) holding the slowest traces
+        self._slowest: List[Tuple[float, int, Trace]] = []
+        self._sequence = itertools.count()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._traces = 0
+        self._spans = 0
+        self._dropped_spans = 0
+        self._exported = 0
+        self._export_errors = 0
+
+    def trace(self, name: str, **attributes: Any) -> Any:
+        """Start a new trace whose root span covers the block"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanScope(self, Trace(name, attributes, self.max_spans).root)
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Record a child span of the current span for the block, if a trace is active"""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        span = parent.trace.add(name, parent.span_id, attributes)
+        if span is None:
+            return NOOP_SPAN
+        return _SpanScope(self, span)
+
+    def current_trace_id(self) -> Optional[str]:
+        span = _current_span.get()
+        return span.trace.trace_id if span else None
+
+    def _finish(self, trace: Trace) -> None:
+        """Keep a finished trace in the buffers and export it"""
+        trace.finished = True
+        self._traces += 1
+        self._spans += len(trace.spans)
+        self._dropped_spans += trace.dropped
+
+        self._recent.append(trace)
+        entry = (trace.duration, next(self._sequence), trace)
+        if len(self._slowest) < self.buffer_size:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+        if self.otlp_file:
+            self._export(trace)
+
+    def _export(self, trace: Trace) -> None:
+        """Append the trace to the OTLP file without blocking the event loop"""
+        line = json.dumps(trace.to_otlp(self.service_name), default=str)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='trace-export')
+        self._executor.submit(self._write, line)
+
+    def _write(self, line: str) -> None:
+        try:
+            directory = os.path.dirname(self.otlp_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.otlp_file, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self._exported += 1
+        except Exception as e:
+            self._export_errors += 1
+            logger.error(f"Error exporting trace to {self.otlp_file}: {str(e)}")
+
+    def get_traces(self, order: str = 'slowest', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the slowest or most recent traces as waterfalls, slowest or newest first"""
+        if order == 'slowest':
+            traces = [trace for _, _, trace in sorted(self._slowest, reverse=True)]
+        else:
+            traces = list(reversed(self._recent))
+        return [trace.to_waterfall() for trace in traces[:limit]]
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """Get a buffered trace by id"""
+        for trace in itertools.chain(self._recent, (trace for _, _, trace in self._slowest)):
+            if trace.trace_id == trace_id:
+                return trace.to_waterfall()
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracing counters"""
+        return {
+            'enabled': self.enabled,
+            'traces': self._traces,
+            'spans': self._spans,
+            'dropped_spans': self._dropped_spans,
+            'exported': self._exported,
+            'export_errors': self._export_errors
+        }
+
+    def close(self) -> None:
+        """Wait for pending exports"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+# Create singleton instance
+tracer = Tracer()